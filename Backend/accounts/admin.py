@@ -29,6 +29,7 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'skin_type')
     list_filter = ('skin_type',)
     search_fields = ('user__email', 'user__first_name', 'user__last_name')
+    list_select_related = ('user',)
 
 
 @admin.register(OTPVerification)
@@ -38,4 +39,5 @@ class OTPVerificationAdmin(admin.ModelAdmin):
     list_display = ('user', 'otp_code', 'is_used', 'created_at', 'expires_at')
     list_filter = ('is_used', 'created_at')
     search_fields = ('user__email', 'otp_code')
+    list_select_related = ('user',)
     readonly_fields = ('created_at',)
@@ -0,0 +1,27 @@
+"""
+Delete used and expired OTP codes in bounded batches.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import OTPVerification
+from skincancer_backend.batching import delete_in_batches
+
+
+class Command(BaseCommand):
+    help = 'Delete used or expired OTP codes in batches. Meant to run periodically (e.g. from cron).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per statement (default: 1000)')
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Seconds to pause between batches to spread out load (default: 0)')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        deleted = sum(
+            delete_in_batches(queryset, options['batch_size'], options['sleep'])
+            for queryset in OTPVerification.purgeable()
+        )
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} OTP codes.'))
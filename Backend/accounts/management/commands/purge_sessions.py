@@ -0,0 +1,28 @@
+"""
+Delete expired sessions in bounded batches.
+"""
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from skincancer_backend.batching import delete_in_batches
+
+
+class Command(BaseCommand):
+    help = ('Delete expired rows from django_session in batches. Replaces clearsessions, '
+            'which deletes them in one statement. Meant to run periodically (e.g. from cron).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per statement (default: 1000)')
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Seconds to pause between batches to spread out load (default: 0)')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        # Cached entries expire on their own; only the database needs purging
+        expired = Session.objects.filter(expire_date__lt=timezone.now())
+        deleted = delete_in_batches(expired, options['batch_size'], options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired sessions.'))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='otpverification',
+            index=models.Index(fields=['user', 'otp_code', 'is_used', 'expires_at'], name='otp_verification_lookup_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:40
+
+import accounts.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_otpverification_lookup_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='timezone',
+            field=models.CharField(default='UTC', max_length=64, validators=[accounts.models.validate_timezone]),
+        ),
+    ]
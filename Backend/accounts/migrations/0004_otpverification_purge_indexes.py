@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_userprofile_timezone'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='otpverification',
+            index=models.Index(fields=['is_used'], name='otp_verification_used_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otpverification',
+            index=models.Index(fields=['expires_at'], name='otp_verification_expires_idx'),
+        ),
+    ]
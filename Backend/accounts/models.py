@@ -1,5 +1,16 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from datetime import timedelta
+import random
+import string
+import zoneinfo
+
+
+# How long an issued OTP code stays valid
+OTP_LIFETIME = timedelta(minutes=10)
 
 
 class User(AbstractUser):
@@ -24,6 +35,23 @@ class User(AbstractUser):
         return f"{self.first_name} {self.last_name} ({self.email})"
 
 
+def validate_timezone(value):
+    """Accept IANA time zone names such as ``Europe/Berlin``."""
+    try:
+        zoneinfo.ZoneInfo(value)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(f'Unknown time zone: {value}')
+
+
+def user_timezone(user):
+    """Return the ZoneInfo of ``user``'s profile, or UTC if they have no profile."""
+    try:
+        name = user.profile.timezone
+    except UserProfile.DoesNotExist:
+        name = 'UTC'
+    return zoneinfo.ZoneInfo(name)
+
+
 class UserProfile(models.Model):
     """Extended user profile for medical information."""
     
@@ -45,12 +73,20 @@ class UserProfile(models.Model):
     family_history = models.TextField(blank=True, null=True)
     emergency_contact = models.CharField(max_length=100, blank=True, null=True)
     emergency_phone = models.CharField(max_length=15, blank=True, null=True)
+    # Uploads are grouped into days, weeks and months in this zone
+    timezone = models.CharField(max_length=64, default='UTC', validators=[validate_timezone])
     
     class Meta:
         db_table = 'user_profiles'
     
     def __str__(self):
         return f"Profile for {self.user.email}"
+    
+    def set_timezone(self, name):
+        """Change the time zone and re-date the user's uploads in it."""
+        self.timezone = name
+        self.save(update_fields=['timezone'])
+        self.user.uploads.update(created_day=TruncDate('created_at', tzinfo=zoneinfo.ZoneInfo(name)))
 
 
 class OTPVerification(models.Model):
@@ -64,6 +100,44 @@ class OTPVerification(models.Model):
     
     class Meta:
         db_table = 'otp_verifications'
+        indexes = [
+            # Matches the verification lookup in OTPVerificationSerializer
+            models.Index(fields=['user', 'otp_code', 'is_used', 'expires_at'], name='otp_verification_lookup_idx'),
+            # One per purgeable() queryset, so purge batches do not scan the table
+            models.Index(fields=['is_used'], name='otp_verification_used_idx'),
+            models.Index(fields=['expires_at'], name='otp_verification_expires_idx'),
+        ]
     
     def __str__(self):
         return f"OTP for {self.user.email} - {self.otp_code}"
+    
+    @classmethod
+    def issue(cls, user):
+        """Invalidate the user's outstanding codes and create a new one."""
+        with transaction.atomic():
+            cls.objects.filter(user=user, is_used=False).update(is_used=True)
+            return cls.objects.create(
+                user=user,
+                otp_code=''.join(random.choices(string.digits, k=6)),
+                expires_at=timezone.now() + OTP_LIFETIME
+            )
+    
+    @classmethod
+    def find_valid(cls, user, otp_code):
+        """Return the unused, unexpired code matching ``otp_code`` or None."""
+        return cls.objects.filter(
+            user=user,
+            otp_code=otp_code,
+            is_used=False,
+            expires_at__gt=timezone.now()
+        ).first()
+    
+    @classmethod
+    def purgeable(cls):
+        """
+        Querysets of codes that can no longer be used and may be deleted.
+        
+        Used and expired codes are separate querysets rather than one OR
+        filter, so each can be read through its own index.
+        """
+        return cls.objects.filter(is_used=True), cls.objects.filter(expires_at__lte=timezone.now())
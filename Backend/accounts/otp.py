@@ -0,0 +1,124 @@
+"""
+One-time code issuing and verification.
+
+``OTP_MODE = 'table'`` stores a random code per issue in OTPVerification.
+``OTP_MODE = 'totp'`` derives the code from a per-user django_otp
+TOTPDevice: issuing is an HMAC computation with no database write once the
+device exists, and verification recomputes the code and only updates the
+device's replay counter.
+"""
+
+import time
+
+import django_otp
+from django.conf import settings
+from django_otp.oath import TOTP
+from django_otp.plugins.otp_totp.models import TOTPDevice
+
+from notifications.outbox import enqueue_email
+
+from .models import OTP_LIFETIME, OTPVerification
+
+# Name of the TOTPDevice used for emailed login codes
+OTP_DEVICE_NAME = 'email-otp'
+
+
+class TableOTP:
+    """Random codes stored in OTPVerification."""
+
+    def issue(self, user):
+        return OTPVerification.issue(user).otp_code
+
+    def verify(self, user, otp_code):
+        """Consume a matching code and return it, or return None."""
+        otp_verification = OTPVerification.find_valid(user, otp_code)
+        if otp_verification is None:
+            return None
+        # Conditional UPDATE so a code can only be used once
+        if not OTPVerification.objects.filter(pk=otp_verification.pk, is_used=False).update(is_used=True):
+            return None
+        return otp_verification
+
+    def login(self, request, match):
+        pass
+
+
+class TOTPOTP:
+    """
+    Codes derived from a per-user TOTPDevice.
+
+    Steps are one minute long and the tolerance spans OTP_LIFETIME, so a
+    code stays valid for OTP_LIFETIME after it is issued. verify_token()
+    rejects the last verified step and any before it, so issue() returns
+    the code for the first step after that one: logging in again within
+    the same minute gets a fresh code rather than one that would be refused.
+    """
+
+    step = 60
+    tolerance = int(OTP_LIFETIME.total_seconds()) // step
+
+    def get_device(self, user):
+        device, _ = TOTPDevice.objects.get_or_create(
+            user=user,
+            name=OTP_DEVICE_NAME,
+            defaults={'step': self.step, 'tolerance': self.tolerance, 'confirmed': True},
+        )
+        if (device.step, device.tolerance) != (self.step, self.tolerance):
+            # Devices created with an older step length
+            device.step, device.tolerance = self.step, self.tolerance
+            device.save(update_fields=['step', 'tolerance'])
+        return device
+
+    def issue(self, user):
+        device = self.get_device(user)
+        totp = TOTP(device.bin_key, device.step, device.t0, device.digits, device.drift)
+        totp.time = time.time()
+        # Move forward past the last verified step; verify_token() accepts up to `tolerance` steps ahead
+        totp.drift += max(0, device.last_t + 1 - totp.t())
+        return str(totp.token()).zfill(device.digits)
+
+    def verify(self, user, otp_code):
+        """Return the device if ``otp_code`` is an unused code it issued, else None."""
+        device = TOTPDevice.objects.filter(user=user, name=OTP_DEVICE_NAME, confirmed=True).first()
+        if device is None or not device.verify_token(otp_code):
+            return None
+        return device
+
+    def login(self, request, match):
+        """Mark the session as OTP-verified for django_otp's middleware."""
+        django_otp.login(request, match)
+
+
+OTP_BACKENDS = {
+    'table': TableOTP,
+    'totp': TOTPOTP,
+}
+
+
+def get_otp_backend():
+    return OTP_BACKENDS[settings.OTP_MODE]()
+
+
+def issue_otp(user):
+    """Issue a code for ``user`` and return it."""
+    return get_otp_backend().issue(user)
+
+
+def send_otp(user, otp_code):
+    """Queue ``otp_code`` for delivery to the user; call inside the issuing transaction."""
+    minutes = int(OTP_LIFETIME.total_seconds()) // 60
+    enqueue_email(
+        user.email,
+        f'Your {settings.OTP_TOTP_ISSUER} verification code',
+        f'Your verification code is {otp_code}. It expires in {minutes} minutes.',
+    )
+
+
+def verify_otp(user, otp_code):
+    """Verify and consume ``otp_code``; return the match or None."""
+    return get_otp_backend().verify(user, otp_code)
+
+
+def otp_login(request, match):
+    """Record a successful verification on the session where the mode supports it."""
+    get_otp_backend().login(request, match)
@@ -1,10 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
-from .models import User, UserProfile, OTPVerification
+from .models import User, UserProfile, OTPVerification, validate_timezone
+from .otp import verify_otp
 import random
 import string
-from datetime import datetime, timedelta
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -69,18 +69,13 @@ class OTPVerificationSerializer(serializers.Serializer):
         
         try:
             user = User.objects.get(email=email)
-            otp_verification = OTPVerification.objects.filter(
-                user=user,
-                otp_code=otp_code,
-                is_used=False,
-                expires_at__gt=datetime.now()
-            ).first()
+            otp_match = verify_otp(user, otp_code)
             
-            if not otp_verification:
+            if not otp_match:
                 raise serializers.ValidationError('Invalid or expired OTP code.')
             
             attrs['user'] = user
-            attrs['otp_verification'] = otp_verification
+            attrs['otp_match'] = otp_match
             
         except User.DoesNotExist:
             raise serializers.ValidationError('User not found.')
@@ -101,11 +96,24 @@ class UserSerializer(serializers.ModelSerializer):
     """Serializer for user data."""
     
     profile = UserProfileSerializer(read_only=True)
+    timezone = serializers.CharField(write_only=True, required=False, validators=[validate_timezone])
     
     class Meta:
         model = User
-        fields = ('id', 'email', 'username', 'first_name', 'last_name', 'is_verified', 'created_at', 'profile')
+        fields = ('id', 'email', 'username', 'first_name', 'last_name', 'is_verified', 'created_at', 'profile', 'timezone')
         read_only_fields = ('id', 'email', 'created_at', 'is_verified')
+    
+    def update(self, instance, validated_data):
+        timezone_name = validated_data.pop('timezone', None)
+        instance = super().update(instance, validated_data)
+        if timezone_name is not None:
+            try:
+                profile = instance.profile
+            except UserProfile.DoesNotExist:
+                profile = UserProfile.objects.create(user=instance)
+            if profile.timezone != timezone_name:
+                profile.set_timezone(timezone_name)
+        return instance
 
 
 class OTPSendSerializer(serializers.Serializer):
@@ -0,0 +1,231 @@
+import time
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django_otp.plugins.otp_totp.models import TOTPDevice
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+
+from skincancer_backend.throttling import LocalWindowStore, get_window_store, parse_rate, sliding_window
+from .models import OTP_LIFETIME, OTPVerification, User
+
+
+def throttle_rates(num_proxies=0, **rates):
+    return override_settings(REST_FRAMEWORK={
+        **api_settings.user_settings, 'DEFAULT_THROTTLE_RATES': rates, 'NUM_PROXIES': num_proxies,
+    })
+
+
+class SlidingWindowTests(TestCase):
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        # Halfway through the window, half of the previous 10 hits still count
+        self.assertEqual(sliding_window(4, 10, 30, 60, 10), (True, 0))
+        self.assertFalse(sliding_window(5, 10, 30, 60, 10)[0])
+
+    def test_local_store_limits_and_recovers(self):
+        store = LocalWindowStore()
+        results = [store.hit('k', 3, 60, 120 + i)[0] for i in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+        # Two windows later nothing from the burst is left
+        self.assertTrue(store.hit('k', 3, 60, 240)[0])
+
+    def test_rates_parse_like_drf(self):
+        self.assertEqual(parse_rate('10/hour'), (10, 3600))
+        self.assertEqual(parse_rate('5/min'), (5, 60))
+        self.assertEqual(parse_rate('1/s'), (1, 1))
+
+    def test_local_store_evicts_least_recent_keys(self):
+        store = LocalWindowStore(max_keys=2)
+        for key in ('a', 'b', 'c'):
+            store.hit(key, 1, 60, 0)
+        self.assertEqual(list(store._windows), ['b', 'c'])
+
+
+class LoginThrottleTests(TestCase):
+
+    def setUp(self):
+        get_window_store().clear()
+        self.client = APIClient()
+        User.objects.create_user(username='a@example.com', email='a@example.com', password='pass12345')
+
+    def login(self, email):
+        return self.client.post(reverse('user-login'), {'email': email, 'password': 'wrong'}, format='json')
+
+    @throttle_rates(login_ip='100/min', login_email='2/min')
+    def test_login_is_limited_per_account(self):
+        self.assertEqual([self.login('a@example.com').status_code for _ in range(3)], [400, 400, 429])
+        self.assertEqual(self.login('A@example.com ').status_code, 429)
+        self.assertEqual(self.login('b@example.com').status_code, 400)
+
+    @throttle_rates(login_ip='2/min', login_email='100/min')
+    def test_login_is_limited_per_ip(self):
+        responses = [self.login(f'user{i}@example.com') for i in range(3)]
+        self.assertEqual([response.status_code for response in responses], [400, 400, 429])
+        self.assertIn('Retry-After', responses[-1])
+
+    @throttle_rates(login_ip='2/min', login_email='100/min')
+    def test_spoofed_forwarded_for_does_not_reset_the_ip_budget(self):
+        statuses = [
+            self.client.post(reverse('user-login'), {'email': 'a@example.com', 'password': 'wrong'},
+                             format='json', HTTP_X_FORWARDED_FOR=f'10.0.0.{i}').status_code
+            for i in range(3)
+        ]
+        self.assertEqual(statuses, [400, 400, 429])
+
+    @throttle_rates(num_proxies=1, login_ip='1/min', login_email='100/min')
+    def test_forwarded_for_is_trusted_behind_configured_proxies(self):
+        def login(forwarded_for):
+            return self.client.post(reverse('user-login'), {'email': 'a@example.com', 'password': 'wrong'},
+                                    format='json', HTTP_X_FORWARDED_FOR=forwarded_for).status_code
+
+        # The proxy appends the real client address last; anything before it is client-supplied
+        self.assertEqual([login('1.1.1.1, 10.0.0.1'), login('2.2.2.2, 10.0.0.1')], [400, 429])
+        self.assertEqual(login('10.0.0.2'), 400)
+
+    @throttle_rates(login_ip='1/min', login_email='1/min')
+    @override_settings(THROTTLE_ENABLED=False)
+    def test_throttles_can_be_disabled_for_load_tests(self):
+        self.assertEqual([self.login('a@example.com').status_code for _ in range(3)], [400, 400, 400])
+
+
+@throttle_rates()
+class OTPFlowTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='a@example.com', email='a@example.com', password='pass12345')
+
+    def login(self):
+        response = self.client.post(reverse('user-login'), {'email': 'a@example.com', 'password': 'pass12345'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data['otp_code']
+
+    def verify(self, otp_code):
+        return self.client.post(reverse('verify-otp'), {'email': 'a@example.com', 'otp_code': otp_code}, format='json')
+
+    def test_table_mode_accepts_only_the_latest_code_once(self):
+        first, second = self.login(), self.login()
+        if first != second:
+            self.assertEqual(self.verify(first).status_code, 400)
+        self.assertEqual(self.verify(second).status_code, 200)
+        self.assertEqual(self.verify(second).status_code, 400)
+
+    @override_settings(OTP_MODE='totp')
+    def test_totp_mode_derives_codes_without_table_writes(self):
+        self.login()
+        # User and device lookups, the outbox insert and its savepoint pair
+        with self.assertNumQueries(5), CaptureQueriesContext(connection) as queries:
+            otp_code = self.login()
+        writes = [q['sql'].split('"')[1] for q in queries if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        self.assertEqual(writes, ['outbound_messages'])
+        self.assertEqual(OTPVerification.objects.count(), 0)
+        self.assertEqual(TOTPDevice.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(self.verify(otp_code).status_code, 200)
+        # A verified code cannot be replayed
+        self.assertEqual(self.verify(otp_code).status_code, 400)
+
+    @override_settings(OTP_MODE='totp')
+    def test_totp_mode_logs_in_again_within_one_step(self):
+        codes = []
+        for _ in range(3):
+            codes.append(self.login())
+            self.assertEqual(self.verify(codes[-1]).status_code, 200)
+        self.assertEqual(len(set(codes)), 3)
+
+    @override_settings(OTP_MODE='totp')
+    def test_totp_codes_expire_after_the_otp_lifetime(self):
+        otp_code = self.login()
+        later = time.time() + OTP_LIFETIME.total_seconds() + 60
+        with mock.patch('time.time', return_value=later):
+            self.assertEqual(self.verify(otp_code).status_code, 400)
+
+
+class OTPStorageTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='a@example.com', email='a@example.com', password='pass12345')
+
+    def test_issue_replaces_outstanding_codes(self):
+        first = OTPVerification.issue(self.user)
+        second = OTPVerification.issue(self.user)
+        first.refresh_from_db()
+        self.assertTrue(first.is_used)
+        self.assertFalse(second.is_used)
+        self.assertRegex(second.otp_code, r'^\d{6}$')
+        self.assertEqual(OTPVerification.find_valid(self.user, second.otp_code), second)
+
+    def test_issue_keeps_outstanding_code_when_insert_fails(self):
+        first = OTPVerification.issue(self.user)
+        with mock.patch.object(OTPVerification.objects, 'create', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                OTPVerification.issue(self.user)
+        self.assertEqual(OTPVerification.find_valid(self.user, first.otp_code), first)
+
+    def test_purge_otps_deletes_used_and_expired_codes(self):
+        now = timezone.now()
+        OTPVerification.objects.bulk_create(
+            [OTPVerification(user=self.user, otp_code='111111', is_used=True, expires_at=now + timedelta(minutes=5))
+             for _ in range(3)]
+            + [OTPVerification(user=self.user, otp_code='222222', expires_at=now - timedelta(minutes=1))
+               for _ in range(3)]
+            + [OTPVerification(user=self.user, otp_code='333333', expires_at=now + timedelta(minutes=5))]
+        )
+        out = StringIO()
+        call_command('purge_otps', batch_size=2, stdout=out)
+        self.assertEqual(list(OTPVerification.objects.values_list('otp_code', flat=True)), ['333333'])
+        self.assertIn('Deleted 6 OTP codes', out.getvalue())
+
+    def test_purge_batches_use_an_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('checks the SQLite query plan')
+        used, expired = OTPVerification.purgeable()
+        self.assertIn('otp_verification_used_idx', used.values('pk')[:100].explain())
+        self.assertIn('otp_verification_expires_idx', expired.values('pk')[:100].explain())
+
+
+class SessionStorageTests(TestCase):
+
+    def load_session_in_other_worker(self, session_key):
+        # Another process has its own LocMemCache, simulated by a separate location
+        other_worker = {**settings.CACHES, 'sessions': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'other-worker',
+        }}
+        with override_settings(CACHES=other_worker):
+            return import_module(settings.SESSION_ENGINE).SessionStore(session_key).load()
+
+    def test_logout_ends_the_session_in_other_workers(self):
+        user = User.objects.create_user(username='a@example.com', email='a@example.com', password='pass12345')
+        self.client.force_login(user)
+        session_key = self.client.session.session_key
+        self.assertEqual(self.load_session_in_other_worker(session_key)['_auth_user_id'], str(user.pk))
+
+        self.client.post(reverse('user-logout'))
+        self.assertEqual(self.load_session_in_other_worker(session_key), {})
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+    def test_session_requests_skip_the_session_table_on_cache_hits(self):
+        user = User.objects.create_user(username='a@example.com', email='a@example.com', password='pass12345')
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse('user-profile')).status_code, 200)
+        self.assertFalse([q['sql'] for q in queries if 'django_session' in q['sql']])
+
+    def test_purge_sessions_deletes_only_expired_rows(self):
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f'expired{i}', session_data='', expire_date=now - timedelta(days=1)) for i in range(5)]
+            + [Session(session_key='live', session_data='', expire_date=now + timedelta(days=1))]
+        )
+        call_command('purge_sessions', batch_size=2, stdout=StringIO())
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
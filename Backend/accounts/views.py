@@ -3,12 +3,12 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import login, logout
-from django.utils import timezone
-from datetime import datetime, timedelta
-import random
-import string
+from django.db import transaction
 
-from .models import User, UserProfile, OTPVerification
+from skincancer_backend.throttling import EmailRateThrottle, IPRateThrottle
+
+from .models import User, UserProfile
+from .otp import issue_otp, otp_login, send_otp
 from .serializers import (
     UserRegistrationSerializer, 
     UserLoginSerializer, 
@@ -24,24 +24,21 @@ class UserRegistrationView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserRegistrationSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = 'register'
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()
-        
-        # Generate OTP for email verification
-        otp_code = ''.join(random.choices(string.digits, k=6))
-        expires_at = timezone.now() + timedelta(minutes=10)
         
-        OTPVerification.objects.create(
-            user=user,
-            otp_code=otp_code,
-            expires_at=expires_at
-        )
+        # Generate OTP for email verification, queued in the same transaction
+        with transaction.atomic():
+            user = serializer.save()
+            otp_code = issue_otp(user)
+            send_otp(user, otp_code)
         
-        # In a real application, you would send this OTP via email/SMS
-        # For demo purposes, we'll return it in the response
+        # The send_outbox worker delivers the code by email
+        # For demo purposes, we'll also return it in the response
         return Response({
             'message': 'User registered successfully. Please verify your email with the OTP.',
             'otp_code': otp_code,  # Remove this in production
@@ -54,6 +51,8 @@ class UserLoginView(generics.GenericAPIView):
     
     serializer_class = UserLoginSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPRateThrottle, EmailRateThrottle]
+    throttle_scope = 'login'
     
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -62,17 +61,12 @@ class UserLoginView(generics.GenericAPIView):
         user = serializer.validated_data['user']
         
         # Generate OTP for 2FA
-        otp_code = ''.join(random.choices(string.digits, k=6))
-        expires_at = timezone.now() + timedelta(minutes=10)
-        
-        OTPVerification.objects.create(
-            user=user,
-            otp_code=otp_code,
-            expires_at=expires_at
-        )
+        with transaction.atomic():
+            otp_code = issue_otp(user)
+            send_otp(user, otp_code)
         
-        # In a real application, you would send this OTP via email/SMS
-        # For demo purposes, we'll return it in the response
+        # The send_outbox worker delivers the code by email
+        # For demo purposes, we'll also return it in the response
         return Response({
             'message': 'Please verify with OTP to complete login.',
             'otp_code': otp_code,  # Remove this in production
@@ -85,27 +79,27 @@ class OTPVerificationView(generics.GenericAPIView):
     
     serializer_class = OTPVerificationSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPRateThrottle, EmailRateThrottle]
+    throttle_scope = 'otp_verify'
     
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
+        # The serializer has already consumed the OTP code
         user = serializer.validated_data['user']
-        otp_verification = serializer.validated_data['otp_verification']
-        
-        # Mark OTP as used
-        otp_verification.is_used = True
-        otp_verification.save()
         
         # Mark user as verified
-        user.is_verified = True
-        user.save()
+        if not user.is_verified:
+            user.is_verified = True
+            user.save(update_fields=['is_verified'])
         
         # Create or get token
         token, created = Token.objects.get_or_create(user=user)
         
         # Login user
         login(request, user)
+        otp_login(request, serializer.validated_data['otp_match'])
         
         return Response({
             'message': 'OTP verified successfully.',
@@ -119,6 +113,8 @@ class ResendOTPView(generics.GenericAPIView):
     
     serializer_class = OTPSendSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPRateThrottle, EmailRateThrottle]
+    throttle_scope = 'otp_resend'
     
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -127,17 +123,12 @@ class ResendOTPView(generics.GenericAPIView):
         user = serializer.validated_data['user']
         
         # Generate new OTP
-        otp_code = ''.join(random.choices(string.digits, k=6))
-        expires_at = timezone.now() + timedelta(minutes=10)
-        
-        OTPVerification.objects.create(
-            user=user,
-            otp_code=otp_code,
-            expires_at=expires_at
-        )
+        with transaction.atomic():
+            otp_code = issue_otp(user)
+            send_otp(user, otp_code)
         
-        # In a real application, you would send this OTP via email/SMS
-        # For demo purposes, we'll return it in the response
+        # The send_outbox worker delivers the code by email
+        # For demo purposes, we'll also return it in the response
         return Response({
             'message': 'New OTP sent successfully.',
             'otp_code': otp_code,  # Remove this in production
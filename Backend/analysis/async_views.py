@@ -0,0 +1,94 @@
+"""
+Async variants of the read-only analysis endpoints.
+
+Served natively under an ASGI server (uvicorn), so a polling dashboard
+client waits on the event loop instead of holding a worker thread. The
+queries themselves still run one at a time in Django's thread-sensitive
+sync thread, so they are awaited in sequence.
+"""
+
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db.models import Avg
+from django.utils import timezone
+
+from accounts.models import user_timezone
+from skincancer_backend.async_api import async_api_view, json_response
+from skincancer_backend.conditional import etag_from_version
+from skincancer_backend.db_router import read_from_replica
+from uploads.models import ImageUpload
+
+from .views import (
+    NO_UPLOADS_RISK_ASSESSMENT,
+    TREND_BUCKETS,
+    build_dashboard_statistics,
+    build_risk_assessment,
+    build_trends,
+    dashboard_aggregates,
+    dashboard_version,
+    recent_uploads_queryset,
+    risk_assessment_version,
+    trend_bucket_starts,
+    trends_queryset,
+    trends_version,
+)
+
+
+async def _values_list(queryset):
+    return [row async for row in queryset]
+
+
+@async_api_view
+@read_from_replica
+@etag_from_version(dashboard_version)
+async def dashboard_statistics(request, user):
+    """Get comprehensive dashboard statistics for the user."""
+    
+    user_uploads = ImageUpload.objects.filter(user=user)
+    
+    stats = await user_uploads.aaggregate(**dashboard_aggregates(timezone.now()))
+    recent_uploads = await _values_list(recent_uploads_queryset(user_uploads))
+    
+    return json_response(build_dashboard_statistics(stats, recent_uploads))
+
+
+@async_api_view
+@read_from_replica
+@etag_from_version(trends_version)
+async def analysis_trends(request, user):
+    """Get analysis trends over time, grouped by ``?bucket=day|week|month`` in the user's time zone."""
+    
+    bucket = request.GET.get('bucket', 'day')
+    if bucket not in TREND_BUCKETS:
+        return json_response({
+            'error': f"Invalid bucket. Choose one of: {', '.join(TREND_BUCKETS)}."
+        }, status=400)
+    
+    today = timezone.localdate(timezone=await sync_to_async(user_timezone)(user))
+    starts = trend_bucket_starts(bucket, today)
+    rows = await _values_list(trends_queryset(user, bucket, starts, today))
+    
+    return json_response(build_trends(bucket, starts, rows))
+
+
+@async_api_view
+@read_from_replica
+@etag_from_version(risk_assessment_version)
+async def risk_assessment(request, user):
+    """Get comprehensive risk assessment for the user."""
+    
+    user_uploads = ImageUpload.objects.filter(user=user)
+    high_risk = user_uploads.filter(result__in=['suspicious', 'malignant'])
+    
+    total_uploads = await user_uploads.acount()
+    if not total_uploads:
+        return json_response(NO_UPLOADS_RISK_ASSESSMENT)
+    
+    high_risk_uploads = await high_risk.acount()
+    recent_high_risk = await high_risk.filter(created_at__gte=timezone.now() - timedelta(days=30)).acount()
+    confidence = await user_uploads.aaggregate(avg=Avg('confidence'))
+    
+    return json_response(build_risk_assessment(
+        total_uploads, high_risk_uploads, recent_high_risk, confidence['avg'] or 0
+    ))
@@ -0,0 +1,260 @@
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from asgiref.sync import sync_to_async
+
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from uploads.models import ImageUpload
+from uploads.tests import make_uploads, make_user
+from . import async_views
+from .views import trend_bucket_starts
+
+
+class DashboardStatisticsTests(TestCase):
+    """The dashboard is one version query, one aggregate and one recent-uploads query."""
+
+    def setUp(self):
+        self.user = make_user('owner@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        now = timezone.now()
+        self.uploads = make_uploads(self.user, 6)
+        changes = [
+            ('benign', 90.0, now - timedelta(days=1)),
+            ('suspicious', 70.0, now - timedelta(days=3)),
+            ('malignant', 80.0, now - timedelta(days=10)),
+            ('benign', 95.0, now - timedelta(days=20)),
+            ('suspicious', 60.0, now - timedelta(days=40)),
+            ('benign', 85.5, now - timedelta(days=90)),
+        ]
+        for upload, (result, confidence, created_at) in zip(self.uploads, changes):
+            ImageUpload.objects.filter(pk=upload.pk).update(
+                result=result, confidence=confidence, created_at=created_at
+            )
+        make_uploads(make_user('other@example.com'), 2)
+
+    def test_query_count_and_payload(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('dashboard-statistics'))
+        self.assertEqual(response.status_code, 200)
+
+        recent = ImageUpload.objects.filter(user=self.user).order_by('-created_at')[:5]
+        # The payload the per-counter queries used to build, key for key
+        expected = {
+            'total_uploads': 6,
+            'result_breakdown': {
+                'benign': 3,
+                'suspicious': 2,
+                'malignant': 1
+            },
+            'average_confidence': 80.1,
+            'high_risk_uploads': 3,
+            'risk_percentage': 50.0,
+            'recent_activity': {
+                'last_7_days': 2,
+                'last_30_days': 4
+            },
+            'recent_uploads': [{
+                'id': str(upload.id),
+                'filename': upload.filename,
+                'result': upload.result,
+                'confidence': upload.confidence,
+                'created_at': upload.created_at,
+                'should_consult_doctor': upload.should_consult_doctor,
+                'urgency_level': upload.urgency_level
+            } for upload in recent],
+        }
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+
+    def test_no_uploads(self):
+        ImageUpload.objects.filter(user=self.user).delete()
+        response = self.client.get(reverse('dashboard-statistics'))
+        self.assertEqual(response.data['total_uploads'], 0)
+        self.assertEqual((response.data['average_confidence'], response.data['risk_percentage']), (0, 0))
+        self.assertEqual(response.data['recent_uploads'], [])
+
+
+class TrendBucketTests(TestCase):
+    """Trends group the stored local day in one query, in the user's time zone."""
+
+    def setUp(self):
+        self.user = make_user('owner@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_bucket_starts(self):
+        today = datetime(2026, 3, 4).date()
+        self.assertEqual(len(trend_bucket_starts('day', today)), 30)
+        weeks = trend_bucket_starts('week', today)
+        self.assertEqual(weeks[:2], [datetime(2026, 3, 2).date(), datetime(2026, 2, 23).date()])
+        months = trend_bucket_starts('month', today)
+        self.assertEqual((months[0], months[-1]), (datetime(2026, 3, 1).date(), datetime(2025, 4, 1).date()))
+
+    def test_days_follow_the_user_time_zone(self):
+        zone = ZoneInfo('Pacific/Honolulu')
+        today = timezone.localdate(timezone=zone)
+        yesterday = today - timedelta(days=1)
+        late_evening, just_now = make_uploads(self.user, 2)
+        # Already "today" in UTC, but still yesterday evening in Honolulu
+        ImageUpload.objects.filter(pk=late_evening.pk).update(
+            created_at=datetime.combine(yesterday, time(23, 30), zone)
+        )
+
+        response = self.client.patch(reverse('user-profile'), {'timezone': 'Pacific/Honolulu'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ImageUpload.objects.get(pk=late_evening.pk).created_day, yesterday)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('analysis-trends'))
+        # At most the profile lookup plus one grouped query, however many days
+        self.assertLessEqual(len(queries), 2)
+        trends = response.data['daily_trends']
+        self.assertEqual(list(trends)[0], today.isoformat())
+        self.assertEqual(trends[yesterday.isoformat()]['total'], 1)
+        self.assertEqual(trends[today.isoformat()]['total'], 1)
+
+    def test_range_is_bounded_on_the_partition_key(self):
+        # UTC+14: the first bucket starts on the previous UTC day
+        self.client.patch(reverse('user-profile'), {'timezone': 'Pacific/Kiritimati'}, format='json')
+        zone = ZoneInfo('Pacific/Kiritimati')
+        first_day = trend_bucket_starts('day', timezone.localdate(timezone=zone))[-1]
+        earliest, too_early = make_uploads(self.user, 2)
+        ImageUpload.objects.filter(pk=earliest.pk).update(
+            created_at=datetime.combine(first_day, time(0, 30), zone), created_day=first_day,
+        )
+        ImageUpload.objects.filter(pk=too_early.pk).update(
+            created_at=datetime.combine(first_day, time(0, 30), zone) - timedelta(days=1),
+            created_day=first_day - timedelta(days=1),
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            trends = self.client.get(reverse('analysis-trends')).data['daily_trends']
+        self.assertIn('"created_at" >=', queries[-1]['sql'])
+        self.assertEqual(trends[first_day.isoformat()]['total'], 1)
+        self.assertEqual(sum(day['total'] for day in trends.values()), 1)
+
+    def test_week_and_month_buckets(self):
+        make_uploads(self.user, 3)
+        today = timezone.localdate(timezone=ZoneInfo('UTC'))
+
+        weekly = self.client.get(reverse('analysis-trends'), {'bucket': 'week'}).data
+        self.assertEqual(weekly['period'], '12_weeks')
+        self.assertEqual(weekly['weekly_trends'][(today - timedelta(days=today.weekday())).isoformat()]['total'], 3)
+
+        monthly = self.client.get(reverse('analysis-trends'), {'bucket': 'month'}).data
+        self.assertEqual(len(monthly['monthly_trends']), 12)
+        self.assertEqual(monthly['monthly_trends'][today.replace(day=1).isoformat()]['benign'], 3)
+
+        self.assertEqual(self.client.get(reverse('analysis-trends'), {'bucket': 'year'}).status_code, 400)
+
+    def test_unknown_time_zone_is_rejected(self):
+        response = self.client.patch(reverse('user-profile'), {'timezone': 'Mars/Olympus'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.user.profile.timezone, 'UTC')
+
+
+class ConditionalGetTests(TestCase):
+    """Unchanged dashboards are answered with 304 from one version query."""
+
+    def setUp(self):
+        self.user = make_user('owner@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.uploads = make_uploads(self.user, 3)
+
+    def revalidate(self, name, etag, **params):
+        return self.client.get(reverse(name), params, HTTP_IF_NONE_MATCH=etag)
+
+    def test_not_modified_skips_the_aggregation(self):
+        for name in ('dashboard-statistics', 'analysis-trends', 'risk-assessment'):
+            response = self.client.get(reverse(name))
+            etag = response['ETag']
+            self.assertTrue(etag.startswith('W/"'))
+            self.assertIn('no-cache', response['Cache-Control'])
+
+            with CaptureQueriesContext(connection) as queries:
+                response = self.revalidate(name, etag)
+            self.assertEqual(response.status_code, 304, name)
+            self.assertEqual(response['ETag'], etag)
+            self.assertEqual(response.content, b'')
+            # The version aggregate, plus the profile lookup for trends
+            self.assertLessEqual(len(queries), 2, name)
+
+    def test_changes_invalidate_the_etag(self):
+        etag = self.client.get(reverse('dashboard-statistics'))['ETag']
+        self.uploads[0].delete()
+        self.assertEqual(self.revalidate('dashboard-statistics', etag).status_code, 200)
+
+        etag = self.client.get(reverse('analysis-trends'))['ETag']
+        self.assertEqual(self.revalidate('analysis-trends', etag, bucket='week').status_code, 200)
+        self.user.profile.set_timezone('Asia/Tokyo')
+        self.assertEqual(self.revalidate('analysis-trends', etag).status_code, 200)
+
+        # Other users never match
+        other_user = make_user('other@example.com')
+        make_uploads(other_user, 2)
+        other = APIClient()
+        other.force_authenticate(other_user)
+        response = other.get(reverse('analysis-trends'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_uploads_ageing_out_of_a_window_invalidate_the_etag(self):
+        ImageUpload.objects.filter(pk=self.uploads[0].pk).update(result='malignant')
+        etag = self.client.get(reverse('risk-assessment'))['ETag']
+        self.assertEqual(self.revalidate('risk-assessment', etag).status_code, 304)
+        # Same rows, but the high-risk upload is now older than 30 days
+        ImageUpload.objects.filter(pk=self.uploads[0].pk).update(created_at=timezone.now() - timedelta(days=31))
+        response = self.revalidate('risk-assessment', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['metrics']['recent_high_risk'], 0)
+
+
+class AsyncViewTests(TestCase):
+    """The async endpoints authenticate, fail and answer exactly like the DRF views."""
+
+    def setUp(self):
+        self.user = make_user('owner@example.com')
+        self.token = Token.objects.create(user=self.user)
+        make_uploads(self.user, 3)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.factory = AsyncRequestFactory()
+
+    def get(self, view, path, **headers):
+        return view(self.factory.get(path, headers=headers))
+
+    async def test_responses_match_the_sync_views(self):
+        cases = [
+            (async_views.dashboard_statistics, 'dashboard-statistics', ''),
+            (async_views.analysis_trends, 'analysis-trends', '?bucket=week'),
+            (async_views.analysis_trends, 'analysis-trends', '?bucket=year'),
+            (async_views.risk_assessment, 'risk-assessment', ''),
+        ]
+        for view, name, query in cases:
+            path = reverse(name) + query
+            response = await self.get(view, path, Authorization=f'Token {self.token.key}')
+            expected = await sync_to_async(self.client.get)(path)
+            self.assertEqual(response.status_code, expected.status_code, path)
+            self.assertEqual(response.content, expected.content, path)
+
+    async def test_authentication_failures_match_the_sync_views(self):
+        anonymous = APIClient()
+        for headers in ({}, {'Authorization': 'Token not-a-token'}):
+            response = await self.get(async_views.dashboard_statistics, '/', **headers)
+            expected = await sync_to_async(anonymous.get)(reverse('dashboard-statistics'), headers=headers)
+            self.assertEqual(response.status_code, expected.status_code)
+            self.assertEqual(response.content, expected.content)
+            self.assertEqual(response.get('WWW-Authenticate'), expected.get('WWW-Authenticate'))
+
+    async def test_only_get_is_allowed(self):
+        request = self.factory.post('/', headers={'Authorization': f'Token {self.token.key}'})
+        response = await async_views.risk_assessment(request)
+        self.assertEqual(response.status_code, 405)
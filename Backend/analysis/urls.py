@@ -1,6 +1,10 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.ASYNC_ANALYSIS_VIEWS:
+    from . import async_views as views
+
 urlpatterns = [
     path('dashboard-stats/', views.dashboard_statistics, name='dashboard-statistics'),
     path('trends/', views.analysis_trends, name='analysis-trends'),
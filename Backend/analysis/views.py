@@ -2,44 +2,81 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count, Avg
+from django.db.models import Count, Avg, F, Min, Q
+from django.db.models.functions import TruncMonth, TruncWeek
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, time, timedelta, timezone as dt_timezone
 
+from accounts.models import user_timezone
+from skincancer_backend.conditional import etag_from_version, queryset_version
+from skincancer_backend.db_router import read_from_replica
 from uploads.models import ImageUpload
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def dashboard_statistics(request):
-    """Get comprehensive dashboard statistics for the user."""
-    
-    user = request.user
-    user_uploads = ImageUpload.objects.filter(user=user)
-    
-    # Basic statistics
-    total_uploads = user_uploads.count()
-    
-    # Result breakdown
-    result_stats = user_uploads.values('result').annotate(count=Count('id'))
-    benign_count = next((item['count'] for item in result_stats if item['result'] == 'benign'), 0)
-    suspicious_count = next((item['count'] for item in result_stats if item['result'] == 'suspicious'), 0)
-    malignant_count = next((item['count'] for item in result_stats if item['result'] == 'malignant'), 0)
-    
-    # Confidence statistics
-    avg_confidence = user_uploads.aggregate(avg_confidence=Avg('confidence'))['avg_confidence'] or 0
-    
-    # Time-based statistics
+NO_UPLOADS_RISK_ASSESSMENT = {
+    'risk_level': 'unknown',
+    'message': 'No uploads available for risk assessment.',
+    'recommendations': [
+        'Upload skin lesion images to get personalized risk assessment.',
+        'Regular skin self-examinations are recommended.',
+        'Consult a dermatologist for professional skin cancer screening.'
+    ]
+}
+
+
+RECENT_UPLOAD_FIELDS = (
+    'id', 'filename', 'result', 'confidence', 'created_at', 'should_consult_doctor', 'urgency_level'
+)
+
+
+def dashboard_aggregates(now):
+    """Aggregate expressions computing every dashboard counter in one query."""
+    return {
+        'total_uploads': Count('id'),
+        'benign_count': Count('id', filter=Q(result='benign')),
+        'suspicious_count': Count('id', filter=Q(result='suspicious')),
+        'malignant_count': Count('id', filter=Q(result='malignant')),
+        'avg_confidence': Avg('confidence'),
+        'last_7_days': Count('id', filter=Q(created_at__gte=now - timedelta(days=7))),
+        'last_30_days': Count('id', filter=Q(created_at__gte=now - timedelta(days=30))),
+    }
+
+
+def dashboard_version(request):
+    """
+    Changes whenever the dashboard statistics would.
+
+    The 7 and 30 day counts also change without writes, when their oldest
+    upload ages out of the window, so that upload's time is part of it.
+    """
     now = timezone.now()
-    last_7_days = user_uploads.filter(created_at__gte=now - timedelta(days=7)).count()
-    last_30_days = user_uploads.filter(created_at__gte=now - timedelta(days=30)).count()
+    return queryset_version(
+        ImageUpload.objects.filter(user=request.user),
+        oldest_last_7_days=Min('created_at', filter=Q(created_at__gte=now - timedelta(days=7))),
+        oldest_last_30_days=Min('created_at', filter=Q(created_at__gte=now - timedelta(days=30))),
+    )
+
+
+def recent_uploads_queryset(user_uploads):
+    """The five most recent uploads, loading only the columns the dashboard shows."""
+    return user_uploads.order_by('-created_at').only(*RECENT_UPLOAD_FIELDS)[:5]
+
+
+def build_dashboard_statistics(stats, recent_uploads):
+    """Build the dashboard statistics payload from dashboard_aggregates() results."""
+    
+    total_uploads = stats['total_uploads']
+    benign_count = stats['benign_count']
+    suspicious_count = stats['suspicious_count']
+    malignant_count = stats['malignant_count']
+    avg_confidence = stats['avg_confidence'] or 0
+    last_7_days = stats['last_7_days']
+    last_30_days = stats['last_30_days']
     
     # Risk statistics
     high_risk_uploads = suspicious_count + malignant_count
     risk_percentage = (high_risk_uploads / total_uploads * 100) if total_uploads > 0 else 0
     
-    # Recent uploads (last 5)
-    recent_uploads = user_uploads.order_by('-created_at')[:5]
     recent_uploads_data = []
     for upload in recent_uploads:
         recent_uploads_data.append({
@@ -52,7 +89,7 @@ def dashboard_statistics(request):
             'urgency_level': upload.urgency_level
         })
     
-    return Response({
+    return {
         'total_uploads': total_uploads,
         'result_breakdown': {
             'benign': benign_count,
@@ -67,73 +104,101 @@ def dashboard_statistics(request):
             'last_30_days': last_30_days
         },
         'recent_uploads': recent_uploads_data
-    })
+    }
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def analysis_trends(request):
-    """Get analysis trends over time."""
-    
-    user = request.user
-    user_uploads = ImageUpload.objects.filter(user=user)
-    
-    # Get uploads from last 30 days
-    now = timezone.now()
-    thirty_days_ago = now - timedelta(days=30)
-    recent_uploads = user_uploads.filter(created_at__gte=thirty_days_ago)
-    
-    # Group by day
-    daily_stats = {}
-    for i in range(30):
-        date = (now - timedelta(days=i)).date()
-        day_uploads = recent_uploads.filter(created_at__date=date)
-        
-        daily_stats[date.isoformat()] = {
-            'total': day_uploads.count(),
-            'benign': day_uploads.filter(result='benign').count(),
-            'suspicious': day_uploads.filter(result='suspicious').count(),
-            'malignant': day_uploads.filter(result='malignant').count(),
-            'avg_confidence': round(day_uploads.aggregate(avg=Avg('confidence'))['avg'] or 0, 1)
+# bucket -> (start of the bucket a local day falls in, buckets shown, payload key, period)
+TREND_BUCKETS = {
+    'day': (lambda day: day, 30, 'daily_trends', '30_days'),
+    'week': (lambda day: day - timedelta(days=day.weekday()), 12, 'weekly_trends', '12_weeks'),
+    'month': (lambda day: day.replace(day=1), 12, 'monthly_trends', '12_months'),
+}
+
+TREND_GROUPING = {
+    'day': F('created_day'),
+    'week': TruncWeek('created_day'),
+    'month': TruncMonth('created_day'),
+}
+
+
+def trend_bucket_starts(bucket, today):
+    """First local day of each bucket shown for ``bucket``, most recent first."""
+    bucket_start, count, _, _ = TREND_BUCKETS[bucket]
+    starts = [bucket_start(today)]
+    while len(starts) < count:
+        starts.append(bucket_start(starts[-1] - timedelta(days=1)))
+    return starts
+
+
+def trends_queryset(user, bucket, starts, today):
+    """
+    Per-bucket counts for ``user`` in one grouped query.
+
+    Filters and groups on the stored local ``created_day``, so the
+    ``(user, created_day)`` index serves the range. The looser ``created_at``
+    bound (a day before the first bucket, covering any UTC offset) lets
+    partitioned tables skip months outside the range.
+    """
+    earliest = datetime.combine(starts[-1] - timedelta(days=1), time.min, tzinfo=dt_timezone.utc)
+    return (
+        ImageUpload.objects.filter(
+            user=user, created_at__gte=earliest, created_day__gte=starts[-1], created_day__lte=today,
+        )
+        .order_by()
+        .values(bucket=TREND_GROUPING[bucket])
+        .annotate(
+            total=Count('id'),
+            benign=Count('id', filter=Q(result='benign')),
+            suspicious=Count('id', filter=Q(result='suspicious')),
+            malignant=Count('id', filter=Q(result='malignant')),
+            avg=Avg('confidence'),
+        )
+    )
+
+
+def trends_version(request):
+    """Changes when uploads change, or the user's time zone or local date does."""
+    zone = user_timezone(request.user)
+    return (
+        request.GET.get('bucket', 'day'),
+        str(zone),
+        timezone.localdate(timezone=zone),
+        queryset_version(ImageUpload.objects.filter(user=request.user)),
+    )
+
+
+def build_trends(bucket, starts, rows):
+    """Build the trends payload, with empty buckets reported as zeros."""
+    _, _, key, period = TREND_BUCKETS[bucket]
+    by_start = {row['bucket']: row for row in rows}
+    trends = {}
+    for start in starts:
+        row = by_start.get(start, {})
+        trends[start.isoformat()] = {
+            'total': row.get('total', 0),
+            'benign': row.get('benign', 0),
+            'suspicious': row.get('suspicious', 0),
+            'malignant': row.get('malignant', 0),
+            'avg_confidence': round(row.get('avg') or 0, 1)
         }
-    
-    return Response({
-        'daily_trends': daily_stats,
-        'period': '30_days'
-    })
+    return {
+        key: trends,
+        'period': period
+    }
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def risk_assessment(request):
-    """Get comprehensive risk assessment for the user."""
-    
-    user = request.user
-    user_uploads = ImageUpload.objects.filter(user=user)
-    
-    if not user_uploads.exists():
-        return Response({
-            'risk_level': 'unknown',
-            'message': 'No uploads available for risk assessment.',
-            'recommendations': [
-                'Upload skin lesion images to get personalized risk assessment.',
-                'Regular skin self-examinations are recommended.',
-                'Consult a dermatologist for professional skin cancer screening.'
-            ]
-        })
-    
-    # Calculate risk metrics
-    total_uploads = user_uploads.count()
-    high_risk_uploads = user_uploads.filter(
-        result__in=['suspicious', 'malignant']
-    ).count()
-    
-    recent_high_risk = user_uploads.filter(
-        result__in=['suspicious', 'malignant'],
-        created_at__gte=timezone.now() - timedelta(days=30)
-    ).count()
-    
-    avg_confidence = user_uploads.aggregate(avg=Avg('confidence'))['avg'] or 0
+def risk_assessment_version(request):
+    """Changes when uploads change or a high-risk upload leaves the 30 day window."""
+    return queryset_version(
+        ImageUpload.objects.filter(user=request.user),
+        oldest_recent_high_risk=Min('created_at', filter=Q(
+            result__in=['suspicious', 'malignant'], created_at__gte=timezone.now() - timedelta(days=30)
+        )),
+    )
+
+
+def build_risk_assessment(total_uploads, high_risk_uploads, recent_high_risk, avg_confidence):
+    """Build the risk assessment payload from precomputed aggregates."""
     
     # Determine overall risk level
     if high_risk_uploads == 0:
@@ -174,7 +239,7 @@ def risk_assessment(request):
             'Stay vigilant for any new or changing skin lesions.'
         ])
     
-    return Response({
+    return {
         'risk_level': risk_level,
         'message': message,
         'metrics': {
@@ -185,4 +250,72 @@ def risk_assessment(request):
             'risk_percentage': round((high_risk_uploads / total_uploads) * 100, 1)
         },
         'recommendations': recommendations
-    })
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@read_from_replica
+@etag_from_version(dashboard_version)
+def dashboard_statistics(request):
+    """Get comprehensive dashboard statistics for the user."""
+    
+    user_uploads = ImageUpload.objects.filter(user=request.user)
+    
+    # Totals, result breakdown, average confidence and time windows in one query
+    stats = user_uploads.aggregate(**dashboard_aggregates(timezone.now()))
+    
+    # Recent uploads (last 5)
+    recent_uploads = recent_uploads_queryset(user_uploads)
+    
+    return Response(build_dashboard_statistics(stats, recent_uploads))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@read_from_replica
+@etag_from_version(trends_version)
+def analysis_trends(request):
+    """Get analysis trends over time, grouped by ``?bucket=day|week|month`` in the user's time zone."""
+    
+    bucket = request.query_params.get('bucket', 'day')
+    if bucket not in TREND_BUCKETS:
+        return Response({
+            'error': f"Invalid bucket. Choose one of: {', '.join(TREND_BUCKETS)}."
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    today = timezone.localdate(timezone=user_timezone(request.user))
+    starts = trend_bucket_starts(bucket, today)
+    rows = trends_queryset(request.user, bucket, starts, today)
+    
+    return Response(build_trends(bucket, starts, rows))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@read_from_replica
+@etag_from_version(risk_assessment_version)
+def risk_assessment(request):
+    """Get comprehensive risk assessment for the user."""
+    
+    user = request.user
+    user_uploads = ImageUpload.objects.filter(user=user)
+    
+    if not user_uploads.exists():
+        return Response(NO_UPLOADS_RISK_ASSESSMENT)
+    
+    # Calculate risk metrics
+    total_uploads = user_uploads.count()
+    high_risk_uploads = user_uploads.filter(
+        result__in=['suspicious', 'malignant']
+    ).count()
+    
+    recent_high_risk = user_uploads.filter(
+        result__in=['suspicious', 'malignant'],
+        created_at__gte=timezone.now() - timedelta(days=30)
+    ).count()
+    
+    avg_confidence = user_uploads.aggregate(avg=Avg('confidence'))['avg'] or 0
+    
+    return Response(build_risk_assessment(total_uploads, high_risk_uploads, recent_high_risk, avg_confidence))
+
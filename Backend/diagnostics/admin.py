@@ -0,0 +1,47 @@
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from .models import RequestProfile
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """Admin for RequestProfile model."""
+
+    list_display = ('created_at', 'method', 'path', 'mode', 'status_code', 'duration_ms', 'user', 'download_link')
+    list_filter = ('mode', 'method', 'created_at')
+    search_fields = ('path', 'user__email')
+    list_select_related = ('user',)
+    readonly_fields = ('user', 'mode', 'method', 'path', 'status_code', 'duration_ms', 'artifact', 'created_at', 'download_link')
+    ordering = ('-created_at',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        urls = [
+            path(
+                '<int:pk>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='diagnostics_requestprofile_download',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def download_view(self, request, pk):
+        """Serve the stored profile artifact as an attachment."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        try:
+            return FileResponse(open(profile.artifact_path, 'rb'), as_attachment=True, filename=profile.artifact)
+        except FileNotFoundError:
+            raise Http404('Profile artifact no longer exists.')
+
+    @admin.display(description='Artifact')
+    def download_link(self, obj):
+        url = reverse('admin:diagnostics_requestprofile_download', args=[obj.pk])
+        return format_html('<a href="{}">{}</a>', url, obj.artifact)
@@ -0,0 +1,225 @@
+"""
+Non-blocking structured logging.
+
+Request threads only format a record's context and put it on a bounded
+queue; a background listener drains the queue in batches and writes JSON
+lines to a size-rotated file. When the queue is full new records are
+dropped and counted instead of blocking the request.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+
+
+# Per-request fields attached to every record logged while handling it
+request_context = contextvars.ContextVar('request_context', default={})
+
+CONTEXT_FIELDS = ('request_id', 'user_id', 'view', 'method', 'path', 'status', 'latency_ms', 'query_count')
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record):
+        payload = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exception'] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class BatchingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that writes a batch of records with one flush."""
+
+    def emit_batch(self, records):
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record) + self.terminator)
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        data = ''.join(lines)
+        size = len(data.encode(self.encoding or 'utf-8'))
+        with self.lock:
+            try:
+                if self.stream is None:
+                    self.stream = self._open()
+                if self.maxBytes > 0 and self.stream.tell() + size >= self.maxBytes:
+                    self.doRollover()
+                    # With delay=True the rollover leaves the new file closed
+                    if self.stream is None:
+                        self.stream = self._open()
+                self.stream.write(data)
+                self.stream.flush()
+            except Exception:
+                self.handleError(records[-1])
+
+
+class BatchingListener:
+    """
+    Background thread draining a queue into a handler in batches.
+
+    Like ``logging.handlers.QueueListener``, but it owns its thread and loop
+    instead of overriding the stdlib listener's internals.
+    """
+
+    _sentinel = None
+
+    def __init__(self, queue, handler, batch_size=256):
+        self.queue = queue
+        self.handler = handler
+        self.batch_size = batch_size
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Write everything queued so far, then stop the thread."""
+        if self._thread is None:
+            return
+        # Block rather than fail if the queue is full at shutdown
+        self.queue.put(self._sentinel)
+        self._thread.join()
+        self._thread = None
+
+    def next_batch(self):
+        """
+        Wait for one record, then take what else is queued, up to ``batch_size``.
+
+        Returns ``(records, stop)``; ``stop`` is set once the sentinel is read.
+        """
+        record = self.queue.get()
+        if record is self._sentinel:
+            return [], True
+        batch = [record]
+        while len(batch) < self.batch_size:
+            try:
+                record = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is self._sentinel:
+                return batch, True
+            batch.append(record)
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self.next_batch()
+            records = [record for record in batch if record.levelno >= self.handler.level]
+            if records:
+                self.handler.emit_batch(records)
+
+
+class AsyncJSONFileHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler writing JSON lines to a rotating file on a background thread.
+
+    Configured from ``LOGGING`` like any other handler class; it owns its
+    queue, file handler and listener thread. The thread is started by the
+    first record each process logs, so workers forked from a preloaded
+    master (``gunicorn --preload``) get a listener of their own.
+    """
+
+    def __init__(self, filename, max_bytes=10 * 1024 * 1024, backup_count=5,
+                 queue_size=10000, batch_size=256):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._dropped_lock = threading.Lock()
+
+        file_handler = BatchingRotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count, delay=True
+        )
+        file_handler.setFormatter(JSONFormatter())
+        self.listener = BatchingListener(self.queue, file_handler, batch_size=batch_size)
+        self._pid = None
+        self._start_lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _ensure_listener(self):
+        """Start the listener thread if this process has not started one yet."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            if self._pid is not None:
+                # Forked: the parent's thread is gone and its queued records are the parent's to write
+                self.queue = queue.Queue(maxsize=self.queue.maxsize)
+                self._dropped_lock = threading.Lock()
+                self.listener = BatchingListener(self.queue, self.listener.handler,
+                                                 batch_size=self.listener.batch_size)
+            self.listener.start()
+            self._pid = pid
+
+    def prepare(self, record):
+        """Attach request context, render the message and drop unpicklable state."""
+        for field, value in request_context.get().items():
+            if not hasattr(record, field):
+                setattr(record, field, value)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+            return
+        self._report_dropped()
+
+    def _report_dropped(self):
+        """Log how many records were dropped once the queue has room again."""
+        if self.dropped == self._reported_dropped:
+            return
+        with self._dropped_lock:
+            missed = self.dropped - self._reported_dropped
+            if not missed:
+                return
+            self._reported_dropped = self.dropped
+        warning = logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            'Log queue full: dropped %d records (%d total)', (missed, self.dropped), None,
+        )
+        try:
+            self.queue.put_nowait(self.prepare(warning))
+        except queue.Full:
+            pass
+
+    def close(self):
+        self.listener.stop()
+        self.listener.handler.close()
+        super().close()
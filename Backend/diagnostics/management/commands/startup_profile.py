@@ -0,0 +1,44 @@
+"""
+Report where worker startup time goes.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from diagnostics.startup import loaded_heavy_modules, measure_startup
+from skincancer_backend.lazy_imports import HEAVY_MODULES
+
+
+class Command(BaseCommand):
+    help = 'Import the WSGI application under -X importtime and report the slowest modules.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default=None,
+                            help='Module to import (default: the WSGI_APPLICATION module)')
+        parser.add_argument('--no-urlconf', action='store_true',
+                            help='Do not load the URLconf and view modules after the import')
+        parser.add_argument('--sort', choices=('cumulative', 'self'), default='cumulative',
+                            help='Order modules by cumulative or self time (default: cumulative)')
+        parser.add_argument('--limit', type=int, default=30, help='Modules to list (default: 30)')
+
+    def handle(self, *args, **options):
+        try:
+            report = measure_startup(options['module'], load_urlconf=not options['no_urlconf'])
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+
+        key = 'cumulative_us' if options['sort'] == 'cumulative' else 'self_us'
+        timings = sorted(report.timings, key=lambda timing: getattr(timing, key), reverse=True)
+
+        self.stdout.write(f"{'module':<60} {'self ms':>10} {'cumul. ms':>10}")
+        for timing in timings[:options['limit']]:
+            name = '  ' * timing.depth + timing.name
+            self.stdout.write(f'{name[:60]:<60} {timing.self_us / 1000:>10.1f} {timing.cumulative_us / 1000:>10.1f}')
+
+        budget = settings.STARTUP_IMPORT_BUDGET_MS
+        summary = f'{report.module} imported in {report.elapsed_ms:.0f} ms (budget {budget} ms)'
+        self.stdout.write(self.style.SUCCESS(summary) if report.elapsed_ms <= budget else self.style.ERROR(summary))
+
+        heavy = loaded_heavy_modules(report, HEAVY_MODULES)
+        if heavy:
+            self.stdout.write(self.style.WARNING(f"Heavy modules loaded at startup: {', '.join(heavy)}"))
@@ -0,0 +1,169 @@
+import logging
+import time
+import uuid
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from .logging_handlers import request_context
+from .models import RequestProfile
+from .profiling import PROFILERS
+
+logger = logging.getLogger(__name__)
+request_logger = logging.getLogger('diagnostics.requests')
+
+
+class QueryCounter:
+    """Database execute wrapper counting queries on a connection."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class RequestLogMiddleware:
+    """
+    Emit one structured log record per request.
+
+    Binds a request id to the logging context so every record logged while
+    handling the request carries it, and logs the user, view, latency and
+    query count once the response is ready. Supports both sync and async
+    request handling so it does not force a thread hop under ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token, counter, start = self._start(request)
+        try:
+            with self._count_queries(counter):
+                response = self.get_response(request)
+            return self._finish(request, response, counter, start)
+        finally:
+            request_context.reset(token)
+
+    async def __acall__(self, request):
+        token, counter, start = self._start(request)
+        try:
+            # Connections are per thread and the ORM runs in the request's
+            # thread-sensitive sync thread, so install the wrappers there
+            queries = await sync_to_async(self._count_queries)(counter)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(queries.close)()
+            return self._finish(request, response, counter, start)
+        finally:
+            request_context.reset(token)
+
+    def _start(self, request):
+        request.request_id = request.META.get('HTTP_X_REQUEST_ID') or uuid.uuid4().hex
+        token = request_context.set({'request_id': request.request_id})
+        return token, QueryCounter(), time.perf_counter()
+
+    def _count_queries(self, counter):
+        """Install ``counter`` on the calling thread's connections; close the returned stack to remove it."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        return stack
+
+    def _finish(self, request, response, counter, start):
+        user = getattr(request, 'user', None)
+        match = request.resolver_match
+        request_logger.info(
+            '%s %s %s', request.method, request.path, response.status_code,
+            extra={
+                'user_id': user.pk if user is not None and user.is_authenticated else None,
+                'view': match.view_name if match else None,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'latency_ms': round((time.perf_counter() - start) * 1000, 2),
+                'query_count': counter.count,
+            },
+        )
+        response['X-Request-ID'] = request.request_id
+        return response
+
+
+class RequestProfilingMiddleware:
+    """
+    Profile a single request on demand.
+
+    Staff users send ``X-Profile-Request: cprofile`` or ``X-Profile-Request:
+    sample`` and the request runs under that profiler. The artifact is stored
+    under PROFILING_ROOT and listed in the Django admin. When
+    PROFILING_ENABLED is off the middleware removes itself at startup, so it
+    costs nothing per request.
+    """
+
+    header = 'HTTP_X_PROFILE_REQUEST'
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = request.META.get(self.header)
+        if mode not in PROFILERS:
+            return self.get_response(request)
+
+        user = self._get_staff_user(request)
+        if user is None:
+            return self.get_response(request)
+
+        profiler = PROFILERS[mode]()
+        start = time.perf_counter()
+        with profiler:
+            response = self.get_response(request)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        try:
+            settings.PROFILING_ROOT.mkdir(parents=True, exist_ok=True)
+            artifact = f'{time.strftime("%Y%m%d-%H%M%S")}-{uuid.uuid4().hex[:8]}.{profiler.extension}'
+            profiler.save(settings.PROFILING_ROOT / artifact)
+            profile = RequestProfile.objects.create(
+                user=user,
+                mode=mode,
+                method=request.method,
+                path=request.get_full_path()[:500],
+                status_code=response.status_code,
+                duration_ms=duration_ms,
+                artifact=artifact,
+            )
+            response['X-Profile-Id'] = str(profile.pk)
+        except Exception:
+            logger.exception('Failed to store request profile for %s', request.path)
+
+        return response
+
+    def _get_staff_user(self, request):
+        """Return the staff user making the request, via session or token."""
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            try:
+                auth = TokenAuthentication().authenticate(request)
+            except AuthenticationFailed:
+                auth = None
+            user = auth[0] if auth else None
+        if user is not None and user.is_authenticated and user.is_staff:
+            return user
+        return None
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(choices=[('cprofile', 'cProfile'), ('sample', 'Stack Sampler')], max_length=10)),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=500)),
+                ('status_code', models.IntegerField(null=True)),
+                ('duration_ms', models.FloatField()),
+                ('artifact', models.CharField(help_text='File name under PROFILING_ROOT', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='request_profiles', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'request_profiles',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import models
+from django.conf import settings
+
+
+class RequestProfile(models.Model):
+    """Profile captured for a single request on demand."""
+
+    MODE_CHOICES = [
+        ('cprofile', 'cProfile'),
+        ('sample', 'Stack Sampler'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='request_profiles')
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    status_code = models.IntegerField(null=True)
+    duration_ms = models.FloatField()
+    artifact = models.CharField(max_length=255, help_text='File name under PROFILING_ROOT')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'request_profiles'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.mode}, {self.duration_ms:.0f} ms)"
+
+    @property
+    def artifact_path(self):
+        """Return the absolute path of the stored artifact."""
+        return settings.PROFILING_ROOT / self.artifact
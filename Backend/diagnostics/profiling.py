@@ -0,0 +1,78 @@
+"""
+Request profilers.
+cProfile capture and a lightweight stack sampler producing collapsed stacks.
+"""
+
+import cProfile
+import sys
+import threading
+from collections import Counter
+
+
+class CProfileCapture:
+    """Deterministic profile of the calling thread, saved as ``.pstats``."""
+
+    extension = 'pstats'
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def __enter__(self):
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.disable()
+
+    def save(self, path):
+        self.profiler.dump_stats(str(path))
+
+
+class StackSampler:
+    """
+    Sample the calling thread's stack from a background thread.
+
+    Saved in collapsed-stack format (``frame;frame;frame count`` per line),
+    which flamegraph.pl and speedscope read directly. Overhead is bounded by
+    the sampling interval rather than the number of calls.
+    """
+
+    extension = 'folded'
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._target_id = None
+
+    def __enter__(self):
+        self._target_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._sample, name='request-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target_id)
+            stack = []
+            while frame is not None:
+                stack.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def save(self, path):
+        with open(path, 'w') as fh:
+            for stack, count in self.samples.most_common():
+                fh.write(f'{stack} {count}\n')
+
+
+PROFILERS = {
+    'cprofile': CProfileCapture,
+    'sample': StackSampler,
+}
@@ -0,0 +1,98 @@
+"""
+Worker startup measurement.
+
+Imports the WSGI application in a fresh interpreter under ``-X importtime``,
+the way a web worker boots, and parses the per-module timings.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+
+from django.conf import settings
+
+# Runs in the child interpreter; prints the wall time and loaded modules as JSON
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+if {load_urlconf}:
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{'elapsed_ms': elapsed_ms, 'modules': sorted(sys.modules)}}))
+'''
+
+
+@dataclass
+class ImportTiming:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class StartupReport:
+    module: str
+    elapsed_ms: float
+    modules: list
+    timings: list
+
+
+def wsgi_module():
+    """Module holding the WSGI application named by ``WSGI_APPLICATION``."""
+    return settings.WSGI_APPLICATION.rsplit('.', 1)[0]
+
+
+def parse_importtime(output):
+    """Parse ``-X importtime`` stderr into ImportTiming records."""
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        timings.append(ImportTiming(
+            name=stripped,
+            self_us=int(fields[0]),
+            cumulative_us=int(fields[1]),
+            depth=(len(name) - len(stripped) - 1) // 2,
+        ))
+    return timings
+
+
+def measure_startup(module=None, load_urlconf=True):
+    """
+    Import ``module`` (the WSGI module by default) in a child interpreter.
+
+    With ``load_urlconf`` the URLconf, and so every view module, is loaded
+    too, as it is before a worker answers its first request.
+    """
+    module = module or wsgi_module()
+    probe = _PROBE.format(module=module, load_urlconf=bool(load_urlconf))
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'skincancer_backend.settings')}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', probe],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'Importing {module} failed:\n{result.stderr[-2000:]}')
+    probe_output = json.loads(result.stdout.strip().splitlines()[-1])
+    return StartupReport(
+        module=module,
+        elapsed_ms=probe_output['elapsed_ms'],
+        modules=probe_output['modules'],
+        timings=parse_importtime(result.stderr),
+    )
+
+
+def loaded_heavy_modules(report, heavy_modules):
+    """Top-level packages from ``heavy_modules`` that the import loaded."""
+    loaded = {name.split('.', 1)[0] for name in report.modules}
+    return [name for name in heavy_modules if name in loaded]
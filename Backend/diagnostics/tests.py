@@ -0,0 +1,243 @@
+import json
+import logging
+import queue
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from accounts.models import User
+
+from skincancer_backend.lazy_imports import HEAVY_MODULES
+from .logging_handlers import (
+    AsyncJSONFileHandler, BatchingListener, BatchingRotatingFileHandler, JSONFormatter, request_context,
+)
+from .middleware import RequestLogMiddleware, RequestProfilingMiddleware
+from .models import RequestProfile
+from .startup import loaded_heavy_modules, measure_startup, parse_importtime
+
+
+class StartupBudgetTests(SimpleTestCase):
+    """Booting a web worker must stay fast and must not load the heavy libraries."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.report = measure_startup()
+
+    def test_wsgi_import_within_budget(self):
+        self.assertLessEqual(
+            self.report.elapsed_ms, settings.STARTUP_IMPORT_BUDGET_MS,
+            f'{self.report.module} took {self.report.elapsed_ms:.0f} ms to import; '
+            f'run "manage.py startup_profile" to see which modules are slow',
+        )
+
+    def test_heavy_modules_are_not_imported(self):
+        self.assertEqual(loaded_heavy_modules(self.report, HEAVY_MODULES), [])
+
+    def test_parse_importtime(self):
+        timings = parse_importtime(
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |   uploads.search\n'
+            'import time:      4718 |       5000 | uploads.views\n'
+        )
+        self.assertEqual([(t.name, t.self_us, t.cumulative_us, t.depth) for t in timings], [
+            ('uploads.search', 120, 120, 1),
+            ('uploads.views', 4718, 5000, 0),
+        ])
+
+
+class RequestProfilingTests(TestCase):
+    """Only staff requests are profiled, and only staff can download the artifacts."""
+
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        override = override_settings(PROFILING_ENABLED=True, PROFILING_ROOT=Path(root.name))
+        override.enable()
+        self.addCleanup(override.disable)
+        self.staff = User.objects.create_user(
+            username='staff@example.com', email='staff@example.com', password='pass12345', is_staff=True,
+        )
+        self.member = User.objects.create_user(username='m@example.com', email='m@example.com', password='pass12345')
+        self.middleware = RequestProfilingMiddleware(lambda request: HttpResponse('ok'))
+
+    def profiled_request(self, user, mode='cprofile'):
+        token = Token.objects.create(user=user)
+        request = RequestFactory().get(
+            '/api/uploads/list/?page=2', HTTP_X_PROFILE_REQUEST=mode, HTTP_AUTHORIZATION=f'Token {token.key}',
+        )
+        return self.middleware(request)
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled_middleware_removes_itself(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            RequestProfilingMiddleware(lambda request: HttpResponse())
+
+    def test_staff_request_is_profiled(self):
+        response = self.profiled_request(self.staff)
+        profile = RequestProfile.objects.get(pk=response['X-Profile-Id'])
+        self.assertEqual((profile.user, profile.mode, profile.path, profile.status_code),
+                         (self.staff, 'cprofile', '/api/uploads/list/?page=2', 200))
+        self.assertTrue(profile.artifact_path.exists())
+
+    def test_other_requests_are_not_profiled(self):
+        response = self.profiled_request(self.member)
+        self.assertEqual(response.content, b'ok')
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        response = self.middleware(RequestFactory().get('/', HTTP_X_PROFILE_REQUEST='unknown'))
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_artifact_download_is_staff_only(self):
+        profile = RequestProfile.objects.get(pk=self.profiled_request(self.staff)['X-Profile-Id'])
+        url = reverse('admin:diagnostics_requestprofile_download', args=[profile.pk])
+
+        self.client.force_login(self.member)
+        self.assertEqual(self.client.get(url).status_code, 302)  # to the admin login
+
+        # Staff without the view permission
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.staff.is_superuser = True
+        self.staff.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(profile.artifact, response['Content-Disposition'])
+        self.assertEqual(b''.join(response.streaming_content), profile.artifact_path.read_bytes())
+
+
+def log_record(message, level=logging.INFO):
+    return logging.LogRecord('test', level, __file__, 0, message, None, None)
+
+
+class AsyncLoggingTests(SimpleTestCase):
+    """Records are written in batches off the request thread, and dropped rather than blocking."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'app.log'
+
+    def test_full_queue_drops_and_reports_the_count(self):
+        handler = AsyncJSONFileHandler(self.path, queue_size=2)
+        self.addCleanup(handler.close)
+        # Keep the listener from draining the queue
+        patcher = mock.patch.object(BatchingListener, 'start')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for index in range(5):
+            handler.emit(log_record(f'record {index}'))
+        self.assertEqual(handler.dropped, 3)
+
+        handler.queue.get_nowait(), handler.queue.get_nowait()
+        handler.emit(log_record('after'))
+        messages = [handler.queue.get_nowait().getMessage() for _ in range(2)]
+        self.assertEqual(messages, ['after', 'Log queue full: dropped 3 records (3 total)'])
+
+    def test_listener_hands_over_batches(self):
+        batches = []
+
+        class Recorder(logging.Handler):
+            def emit_batch(self, records):
+                batches.append([record.getMessage() for record in records])
+
+        records = queue.Queue()
+        for index in range(5):
+            records.put(log_record(str(index)))
+        records.put(log_record('debug', logging.DEBUG))
+        listener = BatchingListener(records, Recorder(level=logging.INFO), batch_size=2)
+        listener.start()
+        listener.stop()
+        self.assertFalse(listener.running)
+        self.assertEqual(batches, [['0', '1'], ['2', '3'], ['4']])
+
+    def test_file_rotates_and_holds_json_lines(self):
+        handler = BatchingRotatingFileHandler(self.path, maxBytes=400, backupCount=2, delay=True)
+        handler.setFormatter(JSONFormatter())
+        self.addCleanup(handler.close)
+        for batch in range(4):
+            handler.emit_batch([log_record(f'batch {batch} line {line}') for line in range(2)])
+        self.assertTrue(Path(f'{self.path}.1').exists())
+        self.assertFalse(Path(f'{self.path}.3').exists())
+        lines = self.path.read_text().splitlines()
+        self.assertEqual(json.loads(lines[-1])['message'], 'batch 3 line 1')
+
+    def test_rollover_counts_encoded_bytes(self):
+        handler = BatchingRotatingFileHandler(self.path, maxBytes=10, backupCount=1, delay=True, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self.addCleanup(handler.close)
+        handler.emit_batch([log_record('aaaa')])
+        # 3 characters but 5 bytes: together with the first line it reaches maxBytes
+        handler.emit_batch([log_record('éé')])
+        self.assertEqual(Path(f'{self.path}.1').read_text(encoding='utf-8'), 'aaaa\n')
+        self.assertEqual(self.path.read_text(encoding='utf-8'), 'éé\n')
+
+    def test_listener_starts_on_first_record_in_each_process(self):
+        handler = AsyncJSONFileHandler(self.path)
+        self.assertFalse(handler.listener.running)
+        handler.emit(log_record('parent'))
+        parent_listener = handler.listener
+        self.assertTrue(parent_listener.running)
+
+        # A forked worker inherits the handler but not the parent's thread
+        with mock.patch('diagnostics.logging_handlers.os.getpid', return_value=-1):
+            handler.emit(log_record('child'))
+            self.assertIsNot(handler.listener, parent_listener)
+            self.assertTrue(handler.listener.running)
+            handler.close()
+        parent_listener.stop()
+        messages = [json.loads(line)['message'] for line in self.path.read_text().splitlines()]
+        self.assertCountEqual(messages, ['parent', 'child'])
+
+    def test_records_carry_the_request_context(self):
+        handler = AsyncJSONFileHandler(self.path)
+        token = request_context.set({'request_id': 'abc'})
+        try:
+            handler.emit(log_record('hello'))
+        finally:
+            request_context.reset(token)
+        handler.close()
+        entry = json.loads(self.path.read_text())
+        self.assertEqual((entry['message'], entry['request_id']), ('hello', 'abc'))
+
+
+def run_queries(count):
+    with connection.cursor() as cursor:
+        for _ in range(count):
+            cursor.execute('SELECT 1')
+
+
+class RequestLogTests(SimpleTestCase):
+    databases = {'default'}
+
+    async def test_async_requests_count_queries_in_the_sync_thread(self):
+        async def view(request):
+            await sync_to_async(run_queries)(3)
+            return HttpResponse()
+
+        middleware = RequestLogMiddleware(view)
+        with self.assertLogs('diagnostics.requests') as logs:
+            # As under ASGIHandler, the ORM runs in a per-request thread, not the event loop's
+            async with ThreadSensitiveContext():
+                await middleware(AsyncRequestFactory().get('/'))
+        self.assertEqual(logs.records[-1].query_count, 3)
+
+    def test_sync_requests_count_queries(self):
+        def view(request):
+            run_queries(2)
+            return HttpResponse()
+
+        with self.assertLogs('diagnostics.requests') as logs:
+            response = RequestLogMiddleware(view)(RequestFactory().get('/', HTTP_X_REQUEST_ID='abc'))
+        self.assertEqual(response['X-Request-ID'], 'abc')
+        self.assertEqual(logs.records[-1].query_count, 2)
@@ -0,0 +1,13 @@
+from django.contrib import admin
+from .models import OutboundMessage
+
+
+@admin.register(OutboundMessage)
+class OutboundMessageAdmin(admin.ModelAdmin):
+    """Admin for OutboundMessage model."""
+
+    list_display = ('created_at', 'channel', 'recipient', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('channel', 'status', 'created_at')
+    search_fields = ('recipient', 'subject')
+    readonly_fields = ('created_at', 'sent_at', 'attempts', 'last_error')
+    ordering = ('-created_at',)
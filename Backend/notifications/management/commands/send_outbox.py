@@ -0,0 +1,41 @@
+"""
+Deliver queued email and SMS from the outbox.
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notifications.outbox import claim_batch, deliver, purge_sent
+
+
+class Command(BaseCommand):
+    help = 'Send due outbox messages in batches, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Messages claimed per batch (default: 100)')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait when nothing is due (default: 1)')
+        parser.add_argument('--once', action='store_true', help='Drain due messages once and exit')
+        parser.add_argument('--keep-sent-hours', type=int, default=24,
+                            help='Delete sent messages older than this while idle (default: 24)')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            messages = claim_batch(options['batch_size'])
+            if messages:
+                sent, failed = deliver(messages)
+                total_sent += sent
+                total_failed += failed
+                self.stdout.write(f'Batch of {len(messages)}: {sent} sent, {failed} failed')
+                continue
+
+            purge_sent(timezone.now() - timedelta(hours=options['keep_sent_hours']))
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'{total_sent} sent, {total_failed} failed'))
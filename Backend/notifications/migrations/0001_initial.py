@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:24
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(choices=[('email', 'Email'), ('sms', 'SMS')], max_length=10)),
+                ('recipient', models.CharField(max_length=254)),
+                ('subject', models.CharField(blank=True, max_length=255)),
+                ('body', models.TextField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'outbound_messages',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outbound_due_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboundMessage(models.Model):
+    """Email or SMS waiting in the outbox for the send_outbox worker."""
+
+    CHANNEL_CHOICES = [
+        ('email', 'Email'),
+        ('sms', 'SMS'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    recipient = models.CharField(max_length=254)
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'outbound_messages'
+        ordering = ['-created_at']
+        indexes = [
+            # The worker's claim query
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} to {self.recipient} ({self.status})"
@@ -0,0 +1,110 @@
+"""
+Transactional outbox for outbound email and SMS.
+
+Request code only inserts an OutboundMessage, in the same transaction as the
+change that triggered it, so nothing is sent for a rolled-back request and
+no request waits on a mail server. The send_outbox worker claims due
+messages in batches, hands them to the channel's transport and retries
+failures with exponential backoff.
+"""
+
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboundMessage
+
+
+def enqueue(channel, recipient, body, subject=''):
+    """Add a message to the outbox; call inside the caller's transaction."""
+    return OutboundMessage.objects.create(channel=channel, recipient=recipient, subject=subject, body=body)
+
+
+def enqueue_email(recipient, subject, body):
+    return enqueue('email', recipient, body, subject=subject)
+
+
+def get_transport(channel):
+    return import_string(settings.NOTIFICATION_TRANSPORTS[channel])()
+
+
+def backoff_delay(attempts):
+    """Exponential backoff with jitter after ``attempts`` failed sends."""
+    delay = min(settings.NOTIFICATION_BACKOFF_SECONDS * 2 ** (attempts - 1), settings.NOTIFICATION_MAX_BACKOFF_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim_batch(batch_size, lease=timedelta(minutes=5)):
+    """
+    Claim up to ``batch_size`` due messages for this worker.
+
+    Claimed rows move to 'sending' with ``next_attempt_at`` pushed out by
+    ``lease``, so a worker that dies mid-batch has its messages picked up
+    again once the lease expires. ``skip_locked`` lets several workers claim
+    concurrently on databases that support it.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        messages = list(
+            OutboundMessage.objects
+            .select_for_update(skip_locked=True)
+            .filter(status__in=['pending', 'sending'], next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if messages:
+            OutboundMessage.objects.filter(pk__in=[message.pk for message in messages]).update(
+                status='sending', next_attempt_at=now + lease,
+            )
+    return messages
+
+
+def deliver(messages):
+    """Send claimed messages and record the outcome; return (sent, failed) counts."""
+    sent = failed = 0
+    by_channel = {}
+    for message in messages:
+        by_channel.setdefault(message.channel, []).append(message)
+
+    for channel, channel_messages in by_channel.items():
+        try:
+            errors = get_transport(channel).send(channel_messages)
+        except Exception as exc:
+            errors = [f'{type(exc).__name__}: {exc}'] * len(channel_messages)
+
+        now = timezone.now()
+        delivered = [message.pk for message, error in zip(channel_messages, errors) if error is None]
+        if delivered:
+            OutboundMessage.objects.filter(pk__in=delivered).update(
+                status='sent', sent_at=now, last_error='', attempts=F('attempts') + 1,
+            )
+            sent += len(delivered)
+
+        for message, error in zip(channel_messages, errors):
+            if error is None:
+                continue
+            attempts = message.attempts + 1
+            exhausted = attempts >= settings.NOTIFICATION_MAX_ATTEMPTS
+            OutboundMessage.objects.filter(pk=message.pk).update(
+                status='failed' if exhausted else 'pending',
+                attempts=attempts,
+                next_attempt_at=now + backoff_delay(attempts),
+                last_error=error[:2000],
+            )
+            failed += 1
+    return sent, failed
+
+
+def purge_sent(older_than, batch_size=1000):
+    """Delete one batch of messages sent before ``older_than``; return the count."""
+    pks = list(
+        OutboundMessage.objects.filter(status='sent', sent_at__lt=older_than)
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    if not pks:
+        return 0
+    return OutboundMessage.objects.filter(pk__in=pks).delete()[0]
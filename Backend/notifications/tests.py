@@ -0,0 +1,56 @@
+from django.core import mail
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from .models import OutboundMessage
+from .outbox import claim_batch, deliver, enqueue_email
+
+
+class FailingTransport:
+    def send(self, messages):
+        return ['SMTPServerDisconnected: gone'] * len(messages)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxTests(TestCase):
+
+    def test_rolled_back_transaction_leaves_no_message(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            enqueue_email('a@example.com', 'Code', '123456')
+            raise RuntimeError
+        self.assertFalse(OutboundMessage.objects.exists())
+
+    def test_login_queues_the_code_instead_of_sending_it(self):
+        User.objects.create_user(username='a@example.com', email='a@example.com', password='pass12345')
+        with override_settings(REST_FRAMEWORK={'DEFAULT_THROTTLE_RATES': {}}):
+            response = APIClient().post(reverse('user-login'), {'email': 'a@example.com', 'password': 'pass12345'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+
+        sent, failed = deliver(claim_batch(10))
+        self.assertEqual((sent, failed), (1, 0))
+        self.assertIn(response.data['otp_code'], mail.outbox[0].body)
+        self.assertEqual(OutboundMessage.objects.get().status, 'sent')
+
+    @override_settings(
+        NOTIFICATION_TRANSPORTS={'email': 'notifications.tests.FailingTransport'},
+        NOTIFICATION_MAX_ATTEMPTS=2,
+    )
+    def test_failures_back_off_then_give_up(self):
+        message = enqueue_email('a@example.com', 'Code', '123456')
+
+        deliver(claim_batch(10))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('pending', 1))
+        self.assertGreater(message.next_attempt_at, timezone.now())
+        self.assertEqual(claim_batch(10), [])
+
+        OutboundMessage.objects.update(next_attempt_at=timezone.now())
+        deliver(claim_batch(10))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('failed', 2))
+        self.assertIn('SMTPServerDisconnected', message.last_error)
@@ -0,0 +1,66 @@
+"""
+Delivery transports for the outbox.
+
+A transport receives a batch of OutboundMessage rows for one channel and
+returns the error for each message, or None when it was delivered. It is
+opened once per batch so connections are reused across messages.
+"""
+
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+
+class EmailTransport:
+    """Send email through Django's ``EMAIL_BACKEND`` over one connection per batch."""
+
+    def send(self, messages):
+        errors = []
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+            for message in messages:
+                email = EmailMessage(
+                    subject=message.subject,
+                    body=message.body,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[message.recipient],
+                    connection=connection,
+                )
+                try:
+                    email.send()
+                except Exception as exc:
+                    errors.append(f'{type(exc).__name__}: {exc}')
+                else:
+                    errors.append(None)
+        except Exception as exc:
+            # Could not connect: every message not yet attempted fails
+            errors.extend([f'{type(exc).__name__}: {exc}'] * (len(messages) - len(errors)))
+        finally:
+            connection.close()
+        return errors
+
+
+class FileTransport:
+    """
+    Append messages as JSON lines to ``NOTIFICATION_FILE_PATH``.
+
+    Stand-in for an SMS gateway (or for email) in development and tests.
+    """
+
+    def send(self, messages):
+        path = Path(settings.NOTIFICATION_FILE_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a') as fh:
+            for message in messages:
+                fh.write(json.dumps({
+                    'channel': message.channel,
+                    'recipient': message.recipient,
+                    'subject': message.subject,
+                    'body': message.body,
+                    'sent_at': timezone.now().isoformat(),
+                }) + '\n')
+        return [None] * len(messages)
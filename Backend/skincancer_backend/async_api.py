@@ -0,0 +1,93 @@
+"""
+Helpers for native async API views.
+
+DRF views are synchronous, so the async endpoints are plain Django views.
+They authenticate with the same DRF authentication classes and render with
+the same JSON encoder, so their responses match the sync views.
+"""
+
+import functools
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def json_response(data, status=200):
+    """Render ``data`` the way DRF's JSONRenderer does."""
+    content = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+    return HttpResponse(content.encode('utf-8'), status=status, content_type='application/json')
+
+
+def _error(exc):
+    return json_response({'detail': str(exc.detail)}, status=exc.status_code)
+
+
+def _auth_error(exc, request):
+    """
+    Answer an authentication failure like DRF's APIView.
+
+    DRF replies 401 with a WWW-Authenticate header when the first
+    authenticator supplies one and 403 otherwise.
+    """
+    authenticator = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]()
+    auth_header = authenticator.authenticate_header(_AuthRequest(request))
+    if not auth_header:
+        exc.status_code = 403
+    response = _error(exc)
+    if auth_header:
+        response['WWW-Authenticate'] = auth_header
+    return response
+
+
+def _authenticate(request):
+    """Run the configured DRF authenticators and return the user or None."""
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        result = authentication_class().authenticate(_AuthRequest(request))
+        if result is not None:
+            return result[0]
+    return None
+
+
+class _AuthRequest:
+    """
+    Minimal stand-in for a DRF Request that authenticators can read from.
+
+    SessionAuthentication looks at ``request._request.user`` and
+    TokenAuthentication at ``request.META``.
+    """
+
+    def __init__(self, request):
+        self._request = request
+        self.META = request.META
+        self.method = request.method
+
+    def __getattr__(self, name):
+        return getattr(self._request, name)
+
+
+def async_api_view(view):
+    """
+    Wrap an async view taking ``(request, user)`` with GET-only, authenticated access.
+
+    Authentication failures produce the same status codes and bodies as the
+    DRF views with IsAuthenticated.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return _error(exceptions.MethodNotAllowed(request.method))
+        try:
+            user = await sync_to_async(_authenticate)(request)
+        except exceptions.AuthenticationFailed as exc:
+            return _auth_error(exc, request)
+        if user is None:
+            return _auth_error(exceptions.NotAuthenticated(), request)
+        # Like DRF, expose the authenticated user on the underlying request
+        request.user = user
+        return await view(request, user, *args, **kwargs)
+
+    return wrapper
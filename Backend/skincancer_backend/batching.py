@@ -0,0 +1,24 @@
+"""
+Helpers for bulk maintenance queries.
+"""
+
+import time
+
+
+def delete_in_batches(queryset, batch_size=1000, sleep=0.0):
+    """
+    Delete the rows of ``queryset`` by primary key, ``batch_size`` at a time.
+
+    Each batch is its own short statement, so a large purge never holds
+    locks on more than ``batch_size`` rows or builds one huge transaction.
+    Returns the number of rows deleted.
+    """
+    model = queryset.model
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        deleted += model._base_manager.filter(pk__in=pks).delete()[0]
+        if sleep:
+            time.sleep(sleep)
@@ -0,0 +1,81 @@
+"""
+Conditional GET for per-user API responses.
+
+Polling clients send back the ETag of their last response in
+``If-None-Match``. Views decorated with ``etag_from_version`` first compute a
+cheap version of the data their response is built from and answer
+``304 Not Modified`` before running the full aggregation.
+
+A version is usually ``queryset_version()``: the row count and latest
+``updated_at`` of the user's rows in one aggregate query, so creates, edits
+and deletes all change it. Views add whatever else their output depends on,
+such as the query string or the current date. Responses are marked private
+and must be revalidated, so clients reuse a body only after a 304.
+"""
+
+import functools
+import hashlib
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+
+def queryset_version(queryset, **aggregates):
+    """Count and latest ``updated_at`` of ``queryset``, plus ``aggregates``, in one query."""
+    version = queryset.aggregate(version_count=Count('pk'), version_updated=Max('updated_at'), **aggregates)
+    return tuple(sorted(version.items()))
+
+
+def make_etag(parts):
+    """Weak ETag for ``parts``; weak because compression changes the bytes, not the data."""
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _current_etag(version, request):
+    # Include the user: clients switching accounts keep the other account's ETag
+    return make_etag((request.user.pk, version(request)))
+
+
+def _finish(response, etag):
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Authorization',))
+    return response
+
+
+def etag_from_version(version):
+    """
+    Answer ``If-None-Match`` with 304 while ``version(request)`` is unchanged.
+
+    ``version`` takes the authenticated request and returns a value whose
+    ``repr()`` changes whenever the response would. Apply the decorator inside
+    ``read_from_replica`` so the version is read from the same database as
+    the response. Works on sync and async views; for async views
+    ``version`` runs in a worker thread.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                etag = await sync_to_async(_current_etag)(version, request)
+                response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _finish(response, etag)
+
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            etag = _current_etag(version, request)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _finish(response, etag)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,95 @@
+"""
+Read-replica routing.
+
+Views decorated with ``read_from_replica`` send their reads to a replica
+from ``DATABASE_REPLICAS``; every other read and all writes go to
+``default``. A user who just wrote is pinned to ``default`` for
+``REPLICA_PIN_SECONDS`` so they read their own writes despite replica lag.
+Pins are stored in the default cache, so settings only enable replicas
+when that cache is shared between workers (``REDIS_URL``).
+"""
+
+import contextvars
+import functools
+import random
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+
+# True while a replica-eligible view is running
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+def _pin_key(user_id):
+    return f'db-pin:{user_id}'
+
+
+def pin_to_primary(user):
+    """Route ``user``'s replica-eligible reads to the primary for a short while."""
+    if settings.DATABASE_REPLICAS:
+        cache.set(_pin_key(user.pk), True, timeout=settings.REPLICA_PIN_SECONDS)
+
+
+def _user_id(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+    return None
+
+
+def read_from_replica(view):
+    """
+    Let ``view`` read from a replica unless its user is pinned to the primary.
+
+    Apply it inside DRF's ``api_view`` (or to a view method via
+    ``method_decorator``) so ``request.user`` is already authenticated.
+    Works on sync and async views.
+    """
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if not settings.DATABASE_REPLICAS:
+                return await view(request, *args, **kwargs)
+            user_id = _user_id(request)
+            pinned = user_id is not None and await cache.aget(_pin_key(user_id))
+            token = _replica_reads.set(not pinned)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _replica_reads.reset(token)
+
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not settings.DATABASE_REPLICAS:
+            return view(request, *args, **kwargs)
+        user_id = _user_id(request)
+        pinned = user_id is not None and cache.get(_pin_key(user_id))
+        token = _replica_reads.set(not pinned)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    """Send reads inside ``read_from_replica`` views to a random replica."""
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
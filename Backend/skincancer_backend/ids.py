@@ -0,0 +1,85 @@
+"""
+Primary keys for high-volume tables.
+
+``uuid7()`` returns time-ordered UUIDs (RFC 9562), so new rows are appended
+at the right edge of the primary-key index instead of landing on a random
+page. ``CompactUUIDField`` stores UUIDs as ``binary(16)`` on MySQL, where
+Django's ``UUIDField`` uses ``char(32)``; other databases keep their native
+UUID column.
+"""
+
+import os
+import threading
+import time
+import uuid
+
+from django.db import models
+
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def uuid7():
+    """
+    Return a version 7 UUID.
+
+    Layout: 48-bit Unix time in milliseconds, version, a 12-bit counter
+    (seeded randomly each millisecond) so ids from one process stay ordered
+    within a millisecond, variant and 62 random bits.
+    """
+    global _uuid7_last_ms, _uuid7_counter
+    with _uuid7_lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _uuid7_last_ms:
+            _uuid7_last_ms = now_ms
+            _uuid7_counter = int.from_bytes(os.urandom(2), 'big') & 0x7FF
+        else:
+            # Same millisecond (or the clock went back): keep counting
+            _uuid7_counter += 1
+            if _uuid7_counter > 0xFFF:
+                _uuid7_last_ms += 1
+                _uuid7_counter = 0
+        timestamp, counter = _uuid7_last_ms, _uuid7_counter
+
+    value = (timestamp & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= int.from_bytes(os.urandom(8), 'big') & 0x3FFFFFFFFFFFFFFF
+    return uuid.UUID(int=value)
+
+
+class CompactUUIDField(models.UUIDField):
+    """
+    UUIDField stored as 16 raw bytes on MySQL.
+
+    The internal type is ``BinaryField`` so backends do not apply their
+    ``UUIDField`` converters, which expect hex strings; ``from_db_value``
+    builds the UUID from whatever the column returns instead.
+    """
+
+    def get_internal_type(self):
+        return 'BinaryField'
+
+    def db_type(self, connection):
+        if connection.vendor == 'mysql':
+            return 'binary(16)'
+        return connection.data_types['UUIDField']
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if connection.vendor != 'mysql':
+            return super().get_db_prep_value(value, connection, prepared)
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = self.to_python(value)
+        return value.bytes
+
+    def from_db_value(self, value, expression, connection):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return uuid.UUID(bytes=bytes(value))
+        if isinstance(value, str):
+            # char(32) hex on databases without a native UUID type
+            return uuid.UUID(value)
+        return value
@@ -0,0 +1,35 @@
+"""
+Lazy accessors for heavy libraries.
+
+Every view module is imported when the URLconf loads, so a module-level
+import of an imaging or ML library slows down the boot of every worker even
+though few requests need it. Code should import such libraries through these
+accessors at the point of use.
+"""
+
+import importlib
+import importlib.util
+
+# Libraries that must not be imported while a web worker boots
+HEAVY_MODULES = ('numpy', 'PIL', 'pyarrow', 'cv2', 'sklearn', 'tensorflow', 'qrcode')
+
+
+def is_installed(name):
+    """Return whether ``name`` can be imported, without importing it."""
+    return importlib.util.find_spec(name) is not None
+
+
+def pil_image():
+    """Return the ``PIL.Image`` module."""
+    return importlib.import_module('PIL.Image')
+
+
+def pyarrow():
+    """Return ``pyarrow`` with its parquet module loaded."""
+    importlib.import_module('pyarrow.parquet')
+    return importlib.import_module('pyarrow')
+
+
+def brotli():
+    """Return the optional ``brotli`` module."""
+    return importlib.import_module('brotli')
@@ -27,15 +27,19 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'rest_framework.authtoken',
     'corsheaders',
     'django_otp',
     'django_otp.plugins.otp_totp',
     'accounts',
     'uploads',
     'analysis',
+    'diagnostics',
+    'notifications',
 ]
 
 MIDDLEWARE = [
+    'diagnostics.middleware.RequestLogMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -44,6 +48,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django_otp.middleware.OTPMiddleware',
+    'diagnostics.middleware.RequestProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -68,6 +73,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'skincancer_backend.wsgi.application'
 
+# Serve the read-only dashboard/statistics endpoints with native async views.
+# Intended for ASGI deployments: uvicorn skincancer_backend.asgi:application
+ASYNC_ANALYSIS_VIEWS = config('ASYNC_ANALYSIS_VIEWS', default=False, cast=bool)
+
 # Database
 # Use DATABASE_URL for production (Render.com) or fallback to local MySQL
 DATABASE_URL = config('DATABASE_URL', default='')
@@ -93,6 +102,25 @@ else:
         }
     }
 
+# Read replicas: comma-separated DATABASE_URL-style URLs. Views decorated with
+# read_from_replica read from them; other reads and all writes use default.
+DATABASE_REPLICAS = []
+for index, replica_url in enumerate(url.strip() for url in config('DATABASE_REPLICA_URLS', default='').split(',')):
+    if replica_url:
+        alias = f'replica_{index}'
+        DATABASES[alias] = {**dj_database_url.parse(replica_url), 'TEST': {'MIRROR': 'default'}}
+        DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['skincancer_backend.db_router.ReplicaRouter']
+
+# After an upload or delete, read the user's data from default for this long
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
+# Monthly partitions of image_uploads (PostgreSQL, see uploads/partitioning.py).
+# A retention of 0 keeps every partition attached.
+UPLOAD_PARTITION_AHEAD_MONTHS = config('UPLOAD_PARTITION_AHEAD_MONTHS', default=3, cast=int)
+UPLOAD_PARTITION_RETENTION_MONTHS = config('UPLOAD_PARTITION_RETENTION_MONTHS', default=0, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -140,8 +168,72 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Trusted proxies in front of the app; per-IP throttles read the client IP from
+    # X-Forwarded-For only when this is above 0
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+    # Sliding-window budgets for skincancer_backend.throttling, keyed '<throttle_scope>_<ip|user|email>'
+    'DEFAULT_THROTTLE_RATES': {
+        'register_ip': config('THROTTLE_REGISTER_IP', default='10/hour'),
+        'login_ip': config('THROTTLE_LOGIN_IP', default='20/min'),
+        'login_email': config('THROTTLE_LOGIN_EMAIL', default='5/min'),
+        'otp_verify_ip': config('THROTTLE_OTP_VERIFY_IP', default='30/min'),
+        'otp_verify_email': config('THROTTLE_OTP_VERIFY_EMAIL', default='5/min'),
+        'otp_resend_ip': config('THROTTLE_OTP_RESEND_IP', default='10/hour'),
+        'otp_resend_email': config('THROTTLE_OTP_RESEND_EMAIL', default='3/hour'),
+        'upload_user': config('THROTTLE_UPLOAD_USER', default='30/min'),
+        'upload_ip': config('THROTTLE_UPLOAD_IP', default='60/min'),
+    },
 }
 
+# Turn every rate limit off, e.g. for `manage.py loadtest` runs
+THROTTLE_ENABLED = config('THROTTLE_ENABLED', default=True, cast=bool)
+
+# Where throttle counters live: 'local' (per process) or 'cache' (shared via CACHES['default'])
+THROTTLE_BACKEND = config('THROTTLE_BACKEND', default='local')
+
+# Cache: Redis when REDIS_URL is set, otherwise per-process memory
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+        'sessions': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'sessions',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'sessions': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'sessions',
+        },
+    }
+
+# With a shared cache, sessions are read from it and only fall back to django_session
+# on a miss. A per-process LocMemCache would keep serving logged-out or rotated sessions
+# in other workers, so without REDIS_URL sessions are read from the database.
+# API clients that do not need server-side sessions can use
+# SESSION_ENGINE=django.contrib.sessions.backends.signed_cookies instead.
+SESSION_ENGINE = config(
+    'SESSION_ENGINE',
+    default='django.contrib.sessions.backends.cached_db' if REDIS_URL else 'django.contrib.sessions.backends.db',
+)
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Replica pins (see skincancer_backend/db_router.py) live in the default cache. In a
+# per-process LocMemCache a pin set by one worker is invisible to the others, which
+# would then read a user's stale data from a replica, so without REDIS_URL every
+# read stays on the primary.
+if not REDIS_URL:
+    DATABASE_REPLICAS = []
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS', 
@@ -151,13 +243,28 @@ CORS_ALLOWED_ORIGINS = config(
 CORS_ALLOW_CREDENTIALS = True
 
 # Email settings (for 2FA)
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
-EMAIL_HOST = 'localhost'
-EMAIL_PORT = 587
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = True
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='no-reply@skincancer.local')
+
+# Outbox delivery (notifications app, sent by `manage.py send_outbox`)
+NOTIFICATION_TRANSPORTS = {
+    'email': config('NOTIFICATION_EMAIL_TRANSPORT', default='notifications.transports.EmailTransport'),
+    'sms': config('NOTIFICATION_SMS_TRANSPORT', default='notifications.transports.FileTransport'),
+}
+NOTIFICATION_FILE_PATH = BASE_DIR / 'logs' / 'outbox.jsonl'
+NOTIFICATION_MAX_ATTEMPTS = config('NOTIFICATION_MAX_ATTEMPTS', default=5, cast=int)
+NOTIFICATION_BACKOFF_SECONDS = 30
+NOTIFICATION_MAX_BACKOFF_SECONDS = 3600
 
 # OTP settings
 OTP_TOTP_ISSUER = 'Skin Cancer Detection'
+# 'table' stores a random code per issue; 'totp' derives codes from a per-user TOTPDevice
+OTP_MODE = config('OTP_MODE', default='table')
+# Emailed codes come from the server clock, so never shift a device's drift
+OTP_TOTP_SYNC = False
 
 # Celery settings (for background tasks)
 CELERY_BROKER_URL = 'redis://localhost:6379'
@@ -176,15 +283,28 @@ SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
 X_FRAME_OPTIONS = 'DENY'
 
+# On-demand request profiling (staff only, via the X-Profile-Request header)
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_ROOT = BASE_DIR / 'logs' / 'profiles'
+
+# Import-time budget for the WSGI application and URLconf (startup_profile, diagnostics tests)
+STARTUP_IMPORT_BUDGET_MS = config('STARTUP_IMPORT_BUDGET_MS', default=2000, cast=int)
+
 # Logging
+# Records are queued and written as JSON lines by a background thread; when
+# the queue is full new records are dropped and counted instead of blocking.
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'handlers': {
         'file': {
             'level': 'INFO',
-            'class': 'logging.FileHandler',
+            'class': 'diagnostics.logging_handlers.AsyncJSONFileHandler',
             'filename': BASE_DIR / 'logs' / 'django.log',
+            'max_bytes': config('LOG_MAX_BYTES', default=10 * 1024 * 1024, cast=int),
+            'backup_count': config('LOG_BACKUP_COUNT', default=5, cast=int),
+            'queue_size': config('LOG_QUEUE_SIZE', default=10000, cast=int),
+            'batch_size': 256,
         },
     },
     'loggers': {
@@ -193,5 +313,10 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        'diagnostics': {
+            'handlers': ['file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
@@ -0,0 +1,218 @@
+"""
+Sliding-window rate limiting for the expensive endpoints.
+
+Each budget counts hits in the current fixed window and weights the previous
+window's count by how much of it still overlaps the sliding window, so a
+key costs two integers instead of a timestamp per request. Counters live in
+process memory by default; set ``THROTTLE_BACKEND = 'cache'`` to share them
+between workers through the default Django cache (e.g. Redis).
+
+The throttles run in DRF's ``initial()``, after authentication and before
+the handler, so rejected requests never reach password hashing, OTP writes
+or image decoding.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Parse a ``'<count>/<sec|min|hour|day>'`` rate into ``(limit, duration)``."""
+    count, period = rate.split('/')
+    return int(count), RATE_PERIODS[period[0]]
+
+
+def sliding_window(current, previous, elapsed, duration, limit):
+    """
+    Decide one hit given the counts of the current and previous windows.
+
+    Returns ``(allowed, wait)`` where ``wait`` is the number of seconds until
+    a request would be allowed again.
+    """
+    weight = 1 - elapsed / duration
+    estimate = previous * weight + current
+    if estimate < limit:
+        return True, 0
+    if current >= limit or not previous:
+        return False, duration - elapsed
+    # The previous window's share decays linearly over the rest of this one
+    return False, min(duration - elapsed, (estimate - limit + 1) * duration / previous)
+
+
+class LocalWindowStore:
+    """
+    Process-local counters, bounded to ``max_keys`` entries.
+
+    The least recently hit keys are evicted first, so a flood of distinct
+    clients cannot grow memory without limit.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, duration, now):
+        window = int(now // duration)
+        elapsed = now - window * duration
+        with self._lock:
+            start, current, previous = self._windows.get(key, (window, 0, 0))
+            if start == window - 1:
+                current, previous = 0, current
+            elif start != window:
+                current, previous = 0, 0
+            allowed, wait = sliding_window(current, previous, elapsed, duration, limit)
+            self._windows[key] = (window, current + allowed, previous)
+            self._windows.move_to_end(key)
+            if len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+        return allowed, wait
+
+    def clear(self):
+        with self._lock:
+            self._windows.clear()
+
+
+class CacheWindowStore:
+    """
+    Counters shared through a Django cache.
+
+    Reads and increments are separate cache calls, so concurrent workers
+    can overshoot a budget by a few requests; the budgets are coarse limits
+    and that trade buys one round trip fewer per request.
+    """
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    def hit(self, key, limit, duration, now):
+        cache = caches[self.alias]
+        window = int(now // duration)
+        current_key, previous_key = f'throttle:{key}:{window}', f'throttle:{key}:{window - 1}'
+        counts = cache.get_many([current_key, previous_key])
+        allowed, wait = sliding_window(
+            counts.get(current_key, 0), counts.get(previous_key, 0),
+            now - window * duration, duration, limit,
+        )
+        if allowed and not cache.add(current_key, 1, timeout=int(duration * 2) + 1):
+            try:
+                cache.incr(current_key)
+            except ValueError:
+                # Expired between add() and incr()
+                cache.set(current_key, 1, timeout=int(duration * 2) + 1)
+        return allowed, wait
+
+    def clear(self):
+        caches[self.alias].clear()
+
+
+WINDOW_STORES = {
+    'local': LocalWindowStore,
+    'cache': CacheWindowStore,
+}
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_window_store():
+    """Return the configured store, created once per process."""
+    name = settings.THROTTLE_BACKEND
+    with _stores_lock:
+        if name not in _stores:
+            _stores[name] = WINDOW_STORES[name]()
+        return _stores[name]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Base sliding-window throttle.
+
+    The view names its budget with ``throttle_scope``; the rate is read from
+    ``DEFAULT_THROTTLE_RATES['<throttle_scope>_<kind>']``, so each endpoint
+    gets separate per-IP, per-user or per-account budgets. A missing rate
+    disables that throttle, and ``THROTTLE_ENABLED = False`` disables them
+    all (for load tests).
+    """
+
+    kind = None
+
+    def get_ident_key(self, request):
+        """Return the identity to count hits against, or None to skip."""
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        if not settings.THROTTLE_ENABLED:
+            return True
+        scope = getattr(view, 'throttle_scope', None)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(f'{scope}_{self.kind}') if scope else None
+        if rate is None:
+            return True
+        ident = self.get_ident_key(request)
+        if ident is None:
+            return True
+        limit, duration = parse_rate(rate)
+        allowed, self._wait = get_window_store().hit(
+            f'{scope}:{self.kind}:{ident}', limit, duration, time.time()
+        )
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class IPRateThrottle(SlidingWindowThrottle):
+    """
+    Budget per client IP.
+
+    Keyed on ``REMOTE_ADDR`` unless ``NUM_PROXIES`` says how many trusted
+    proxies append to ``X-Forwarded-For``; with it unset DRF would trust
+    whatever header the client sends, which it can change on every request.
+    """
+
+    kind = 'ip'
+
+    def get_ident_key(self, request):
+        if api_settings.NUM_PROXIES is None:
+            return request.META.get('REMOTE_ADDR')
+        return self.get_ident(request)
+
+
+class UserRateThrottle(SlidingWindowThrottle):
+    """Budget per authenticated user."""
+
+    kind = 'user'
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return None
+
+
+class EmailRateThrottle(SlidingWindowThrottle):
+    """
+    Budget per target account, keyed by the ``email`` in the request body.
+
+    Stops one account from being hammered from many IPs. Only the small
+    JSON or form body is parsed here; nothing is hashed or looked up.
+    """
+
+    kind = 'email'
+
+    def get_ident_key(self, request):
+        try:
+            email = request.data.get('email')
+        except AttributeError:
+            return None
+        if not isinstance(email, str) or not email:
+            return None
+        return email.strip().lower()[:254]
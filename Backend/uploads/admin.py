@@ -7,8 +7,9 @@ class ImageUploadAdmin(admin.ModelAdmin):
     """Admin for ImageUpload model."""
     
     list_display = ('user', 'filename', 'result', 'confidence', 'urgency_level', 'created_at')
-    list_filter = ('result', 'urgency_level', 'should_consult_doctor', 'created_at')
+    list_filter = ('result', 'urgency_level', 'should_consult_doctor', 'resolution_quality', 'file_quality', 'created_at')
     search_fields = ('user__email', 'filename', 'result')
+    list_select_related = ('user',)
     readonly_fields = ('id', 'created_at', 'updated_at', 'image_url', 'confidence_percentage')
     ordering = ('-created_at',)
     
@@ -26,7 +27,9 @@ class ImageUploadAdmin(admin.ModelAdmin):
             'fields': ('should_consult_doctor', 'urgency_level', 'recommendation_message')
         }),
         ('Analysis Factors', {
-            'fields': ('analysis_factors',),
+            'fields': ('aspect_ratio', 'resolution_quality', 'file_quality',
+                       'asymmetry_score', 'border_score', 'color_score', 'diameter_score',
+                       'analysis_factors'),
             'classes': ('collapse',)
         }),
     )
@@ -39,5 +42,6 @@ class AnalysisHistoryAdmin(admin.ModelAdmin):
     list_display = ('user', 'search_query', 'filter_type', 'results_count', 'created_at')
     list_filter = ('filter_type', 'created_at')
     search_fields = ('user__email', 'search_query')
+    list_select_related = ('user',)
     readonly_fields = ('created_at',)
     ordering = ('-created_at',)
@@ -5,8 +5,8 @@ Provides sophisticated image analysis for skin cancer detection.
 
 import random
 import math
-from PIL import Image
-import numpy as np
+
+from .models import ANALYSIS_FACTORS_VERSION
 
 
 class SkinCancerAnalysisService:
@@ -63,7 +63,11 @@ class SkinCancerAnalysisService:
             'should_consult_doctor': recommendations['should_consult'],
             'urgency_level': recommendations['urgency'],
             'recommendation_message': recommendations['message'],
-            'analysis_factors': self.analysis_factors
+            'aspect_ratio': self.analysis_factors['aspect_ratio'],
+            'resolution_quality': self.analysis_factors['resolution_quality'],
+            'file_quality': self.analysis_factors['file_quality'],
+            # Stable factors are returned above; the rest are versioned extras
+            'analysis_factors': {'version': ANALYSIS_FACTORS_VERSION}
         }
     
     def _assess_resolution_quality(self, width, height):
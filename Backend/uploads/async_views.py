@@ -0,0 +1,36 @@
+"""
+Async variant of the upload statistics endpoint for ASGI deployments.
+
+Its queries run one at a time in Django's thread-sensitive sync thread.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Avg
+from django.utils import timezone
+
+from skincancer_backend.async_api import async_api_view, json_response
+from skincancer_backend.db_router import read_from_replica
+
+from .models import ImageUpload
+from .views import build_upload_statistics
+
+
+@async_api_view
+@read_from_replica
+async def upload_statistics(request, user):
+    """Get upload statistics for the user."""
+    
+    user_uploads = ImageUpload.objects.filter(user=user)
+    
+    total_uploads = await user_uploads.acount()
+    benign_count = await user_uploads.filter(result='benign').acount()
+    suspicious_count = await user_uploads.filter(result='suspicious').acount()
+    malignant_count = await user_uploads.filter(result='malignant').acount()
+    confidence = await user_uploads.aaggregate(avg_confidence=Avg('confidence'))
+    recent_uploads = await user_uploads.filter(created_at__gte=timezone.now() - timedelta(days=30)).acount()
+    
+    return json_response(build_upload_statistics(
+        total_uploads, benign_count, suspicious_count, malignant_count,
+        confidence['avg_confidence'] or 0, recent_uploads
+    ))
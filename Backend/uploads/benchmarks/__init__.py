@@ -0,0 +1,97 @@
+"""
+Benchmark harness for the uploads app.
+Times callables, records peak allocations and compares runs against JSON baselines.
+"""
+
+import json
+import statistics
+import timeit
+import tracemalloc
+from importlib import import_module
+
+
+# suite name -> module exposing run(repeat, **options) -> {case: measurement}
+SUITES = {
+    'analysis': 'uploads.benchmarks.analysis_service',
+    'serializers': 'uploads.benchmarks.serializers',
+    'inserts': 'uploads.benchmarks.inserts',
+}
+
+
+def get_suite(name):
+    """Import and return the benchmark module registered as ``name``."""
+    return import_module(SUITES[name])
+
+
+# Absolute slack so sub-microsecond jitter and tiny allocations are not flagged
+MIN_TIME_DELTA_MS = 0.002
+MIN_ALLOC_DELTA_KIB = 1.0
+
+
+def measure(func, repeat=5):
+    """
+    Time ``func`` and record its peak allocation.
+
+    Each timing runs ``func`` enough times to last at least 0.2s (as
+    ``timeit`` does) so fast helpers get stable per-call numbers. Timing
+    runs happen without tracemalloc so allocation tracking does not skew
+    them; one extra traced call records the peak.
+
+    Returns:
+        dict: median/min per-call time in milliseconds and peak allocation in KiB
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    timings = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'median_ms': round(statistics.median(timings) * 1000, 4),
+        'min_ms': round(min(timings) * 1000, 4),
+        'peak_alloc_kib': round(peak / 1024, 1),
+    }
+
+
+def load_baseline(path):
+    """Load a baseline file, returning an empty dict if it does not exist."""
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, results):
+    """Write results as the new baseline."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as fh:
+        json.dump(results, fh, indent=2, sort_keys=True)
+
+
+def find_regressions(results, baseline, threshold):
+    """
+    Compare results with a baseline.
+
+    A case regresses when its median time or peak allocation grows by more
+    than ``threshold`` (a fraction, e.g. 0.2 for 20%) over the baseline and
+    by more than a small absolute slack.
+
+    Returns:
+        list: (case, metric, baseline value, current value) tuples
+    """
+    regressions = []
+    for case, current in results.items():
+        previous = baseline.get(case)
+        if not previous:
+            continue
+        for metric, slack in (('median_ms', MIN_TIME_DELTA_MS), ('peak_alloc_kib', MIN_ALLOC_DELTA_KIB)):
+            before, after = previous.get(metric), current.get(metric)
+            if before is not None and after > before * (1 + threshold) and after - before > slack:
+                regressions.append((case, metric, before, after))
+    return regressions
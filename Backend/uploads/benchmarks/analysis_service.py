@@ -0,0 +1,83 @@
+"""
+Benchmarks for SkinCancerAnalysisService.
+Times each analysis stage separately across image sizes and formats.
+"""
+
+import io
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+
+from uploads.analysis_service import SkinCancerAnalysisService
+from uploads.serializers import ImageUploadCreateSerializer
+from uploads.synthetic import generate_lesion_image
+
+from . import measure
+
+
+DEFAULT_SIZES = [64, 256, 1024, 4096]
+DEFAULT_FORMATS = ['jpeg', 'png', 'tiff', 'bmp']
+
+
+def _stages(content, content_type, ext, size):
+    """
+    Build the stage callables for one synthetic image.
+
+    Raises ValidationError if the upload validator would reject the image.
+    """
+    filename = f'benchmark_lesion.{ext}'
+    upload = SimpleUploadedFile(filename, content, content_type=content_type)
+    serializer = ImageUploadCreateSerializer()
+    serializer.validate_image(upload)
+    service = SkinCancerAnalysisService()
+
+    # Prime the service so the helpers can run in isolation
+    service.analyze_image(upload, filename, size, size, len(content))
+    risk_score = service._calculate_risk_score()
+    cancer_type_info = service._detect_cancer_type(risk_score)
+
+    def decode():
+        with Image.open(io.BytesIO(content)) as img:
+            img.load()
+
+    def analyze():
+        upload.seek(0)
+        service.analyze_image(upload, filename, size, size, len(content))
+
+    return {
+        'validate_image': lambda: serializer.validate_image(upload),
+        'decode': decode,
+        'analyze_image': analyze,
+        'calculate_risk_score': service._calculate_risk_score,
+        'detect_cancer_type': lambda: service._detect_cancer_type(risk_score),
+        'medical_recommendations': lambda: service._get_medical_recommendations(
+            'suspicious', 80.0, cancer_type_info
+        ),
+    }
+
+
+def run(repeat=5, sizes=None, formats=None, stdout=None, **options):
+    """
+    Run the analysis service benchmarks.
+
+    Returns:
+        dict: measurements keyed by ``stage/format/size``
+    """
+    results = {}
+    for size in sizes or DEFAULT_SIZES:
+        for fmt in formats or DEFAULT_FORMATS:
+            content, content_type, ext = generate_lesion_image(size, fmt, seed=size)
+            try:
+                stages = _stages(content, content_type, ext, size)
+            except ValidationError:
+                if stdout:
+                    stdout.write(f'{fmt}/{size}: skipped, rejected by validate_image')
+                continue
+            for stage, func in stages.items():
+                key = f'{stage}/{fmt}/{size}'
+                results[key] = measure(func, repeat=repeat)
+                if stdout:
+                    stdout.write(f"{key:<42}{results[key]['median_ms']:>12.4f} ms"
+                                 f"{results[key]['peak_alloc_kib']:>12.1f} KiB")
+    return results
@@ -0,0 +1,88 @@
+"""
+Benchmarks for ImageUpload primary keys.
+Compares generating and inserting random (v4) and time-ordered (v7) UUID keys.
+
+Insert cases write to the configured database inside a transaction that is
+rolled back. Each case first fills the table with ``rows`` uploads keyed the
+same way, so later inserts land in an index of realistic size; the gap
+between the cases grows with the table and is largest on MySQL, where
+InnoDB clusters rows by primary key.
+"""
+
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from skincancer_backend.ids import uuid7
+from uploads.models import ImageUpload
+
+from . import measure
+
+
+DEFAULT_ROWS = 20000
+INSERT_BATCH = 2000
+BULK_BATCH_SIZE = 1000
+
+KEY_FACTORIES = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+
+def build_uploads(user, count, make_id):
+    return [
+        ImageUpload(
+            id=make_id(),
+            user=user,
+            image=f'uploads/images/bench_{i}.jpg',
+            filename=f'bench_{i}.jpg',
+            file_size=250000,
+            image_width=600,
+            image_height=450,
+            result='benign',
+            confidence=90.0,
+            risk_score=0.1,
+            recommendation_message='Benchmark row',
+        )
+        for i in range(count)
+    ]
+
+
+def insert_case(user, make_id):
+    """Insert INSERT_BATCH uploads and roll them back."""
+    def insert():
+        with transaction.atomic():
+            ImageUpload.objects.bulk_create(build_uploads(user, INSERT_BATCH, make_id), batch_size=BULK_BATCH_SIZE)
+            transaction.set_rollback(True)
+    return insert
+
+
+def run(repeat=5, rows=None, stdout=None, **options):
+    """
+    Run the primary-key benchmarks.
+
+    Returns:
+        dict: measurements keyed by ``case/rows``
+    """
+    rows = rows or DEFAULT_ROWS
+    results = {}
+
+    def record(key, func):
+        results[key] = measure(func, repeat=repeat)
+        if stdout:
+            stdout.write(f"{key:<52}{results[key]['median_ms']:>12.2f} ms"
+                         f"{results[key]['peak_alloc_kib']:>12.1f} KiB")
+
+    for name, make_id in KEY_FACTORIES.items():
+        record(f'generate_{name}/{INSERT_BATCH}', lambda make_id=make_id: [make_id() for _ in range(INSERT_BATCH)])
+
+    with transaction.atomic():
+        user = get_user_model().objects.create_user(username='benchmark-inserts', email='benchmark-inserts@example.com')
+        for name, make_id in KEY_FACTORIES.items():
+            with transaction.atomic():
+                ImageUpload.objects.bulk_create(build_uploads(user, rows, make_id), batch_size=BULK_BATCH_SIZE)
+                record(f'insert_{name}/{rows}+{INSERT_BATCH}', insert_case(user, make_id))
+                transaction.set_rollback(True)
+        transaction.set_rollback(True)
+    return results
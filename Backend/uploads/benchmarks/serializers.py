@@ -0,0 +1,114 @@
+"""
+Benchmarks for upload list serialization.
+Compares list serializer paths on in-memory rows, without database access.
+"""
+
+import random
+import uuid
+from datetime import timedelta
+
+from django.utils import timezone
+
+from uploads.models import ImageUpload
+from uploads.serializers import ImageUploadListSerializer, ImageUploadRowSerializer
+
+from . import measure
+
+
+DEFAULT_ROWS = 10000
+
+
+def legacy_doctor_recommendation(obj):
+    """The per-row recommendation builder the lookup table replaced, kept as the reference."""
+    if obj.result == 'malignant':
+        return {
+            'should_consult': True,
+            'urgency': 'high',
+            'message': '⚠️ URGENT: Consult a dermatologist immediately',
+            'color': '#F44336'
+        }
+    elif obj.result == 'suspicious':
+        return {
+            'should_consult': True,
+            'urgency': 'medium',
+            'message': '🔍 RECOMMENDED: Schedule a dermatologist appointment within 1-2 weeks',
+            'color': '#FF9800'
+        }
+    elif obj.result == 'benign' and obj.confidence < 80:
+        return {
+            'should_consult': True,
+            'urgency': 'low',
+            'message': '💡 SUGGESTED: Consider a routine check-up for peace of mind',
+            'color': '#2196F3'
+        }
+    else:
+        return {
+            'should_consult': False,
+            'urgency': 'none',
+            'message': '✅ No immediate concern, but regular skin checks are always recommended',
+            'color': '#4CAF50'
+        }
+
+
+class LegacyImageUploadListSerializer(ImageUploadListSerializer):
+    """List serializer building a fresh recommendation dict per row instead of sharing the table's entries."""
+
+    def get_doctor_recommendation(self, obj):
+        return legacy_doctor_recommendation(obj)
+
+
+def make_uploads(count, seed=0):
+    """Build unsaved ImageUpload instances with realistic field values."""
+    rng = random.Random(seed)
+    now = timezone.now()
+    uploads = []
+    for i in range(count):
+        result = rng.choice(['benign', 'benign', 'suspicious', 'malignant'])
+        uploads.append(ImageUpload(
+            id=uuid.UUID(int=rng.getrandbits(128), version=4),
+            image=f'uploads/images/{uuid.UUID(int=rng.getrandbits(128), version=4)}.jpg',
+            filename=f'lesion_{i}.jpg',
+            result=result,
+            confidence=round(rng.uniform(65, 95), 1),
+            cancer_type='melanoma',
+            cancer_type_name='Melanoma',
+            cancer_type_confidence=round(rng.uniform(60, 95), 1),
+            risk_level='high',
+            should_consult_doctor=result != 'benign',
+            urgency_level='high',
+            created_at=now - timedelta(minutes=i),
+        ))
+    return uploads
+
+
+def run(repeat=5, rows=None, stdout=None, **options):
+    """
+    Run the serializer benchmarks.
+
+    Returns:
+        dict: measurements keyed by ``path/rows``
+    """
+    rows = rows or DEFAULT_ROWS
+    uploads = make_uploads(rows)
+    value_rows = [
+        tuple(getattr(upload, column) for column in ImageUploadRowSerializer.list_columns)
+        for upload in uploads
+    ]
+    # FieldFile values come back from values_list() as plain names
+    image_index = ImageUploadRowSerializer.list_columns.index('image')
+    value_rows = [row[:image_index] + (row[image_index].name,) + row[image_index + 1:] for row in value_rows]
+
+    cases = {
+        'list_serializer_legacy_recommendation': lambda: LegacyImageUploadListSerializer(uploads, many=True).data,
+        'list_serializer': lambda: ImageUploadListSerializer(uploads, many=True).data,
+        'row_serializer': lambda: ImageUploadRowSerializer().list_data(value_rows),
+    }
+
+    results = {}
+    for name, func in cases.items():
+        key = f'{name}/{rows}'
+        results[key] = measure(func, repeat=repeat)
+        if stdout:
+            stdout.write(f"{key:<52}{results[key]['median_ms']:>12.2f} ms"
+                         f"{results[key]['peak_alloc_kib']:>12.1f} KiB")
+    return results
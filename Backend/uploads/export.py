@@ -0,0 +1,208 @@
+"""
+Streaming export of a user's analysis history.
+
+Rows are read with ``values_list().iterator()`` so they come off a
+server-side cursor (where the database supports one) in chunks, and each
+writer yields encoded bytes as it goes. Memory use depends on the chunk
+size, not on how many uploads the user has.
+"""
+
+import csv
+import json
+import logging
+import os
+import zipfile
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from skincancer_backend import lazy_imports
+
+from .models import analysis_factors_payload
+from .serializers import ImageUploadRowSerializer
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 2000
+IMAGE_CHUNK_SIZE = 64 * 1024
+
+EXPORT_COLUMNS = ImageUploadRowSerializer.detail_columns
+EXPORT_FIELDS = [
+    'id', 'image_url', 'filename', 'file_size', 'image_width', 'image_height',
+    'result', 'confidence', 'risk_score', 'cancer_type', 'cancer_type_confidence',
+    'cancer_type_name', 'risk_level', 'should_consult_doctor', 'urgency_level',
+    'recommendation_message', 'aspect_ratio', 'resolution_quality', 'file_quality',
+    'asymmetry_score', 'border_score', 'color_score', 'diameter_score',
+    'analysis_factors', 'created_at', 'updated_at'
+]
+
+
+class StreamBuffer:
+    """Write-only file object whose contents are drained after each write."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        else:
+            data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def export_rows(queryset, row_serializer):
+    """Yield one ``EXPORT_FIELDS`` tuple per upload with JSON-friendly values."""
+    image_url = row_serializer.image_url
+    format_datetime = row_serializer.format_datetime
+    rows = queryset.values_list(*EXPORT_COLUMNS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for (pk, image, filename, file_size, image_width, image_height, result, confidence,
+         risk_score, cancer_type, cancer_type_confidence, cancer_type_name, risk_level,
+         should_consult_doctor, urgency_level, recommendation_message, aspect_ratio,
+         resolution_quality, file_quality, asymmetry_score, border_score, color_score,
+         diameter_score, analysis_factors, created_at, updated_at) in rows:
+        yield (
+            str(pk), image_url(image), filename, file_size, image_width, image_height,
+            result, confidence, risk_score, cancer_type, cancer_type_confidence,
+            cancer_type_name, risk_level, should_consult_doctor, urgency_level,
+            recommendation_message, aspect_ratio, resolution_quality, file_quality,
+            asymmetry_score, border_score, color_score, diameter_score,
+            analysis_factors_payload(filename, file_size, image_width, image_height, aspect_ratio,
+                                     resolution_quality, file_quality, analysis_factors),
+            format_datetime(created_at), format_datetime(updated_at),
+        )
+
+
+def _batches(rows, size=EXPORT_CHUNK_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_csv(rows):
+    buffer = StreamBuffer()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    factors = EXPORT_FIELDS.index('analysis_factors')
+    for batch in _batches(rows):
+        for row in batch:
+            row = list(row)
+            row[factors] = json.dumps(row[factors], cls=DjangoJSONEncoder)
+            writer.writerow(row)
+        yield buffer.drain()
+
+
+def write_ndjson(rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for batch in _batches(rows):
+        yield ''.join(
+            encoder.encode(dict(zip(EXPORT_FIELDS, row))) + '\n' for row in batch
+        ).encode('utf-8')
+
+
+def _parquet_schema(pyarrow):
+    string, double = pyarrow.string(), pyarrow.float64()
+    types = {
+        'file_size': pyarrow.int64(),
+        'image_width': pyarrow.int32(),
+        'image_height': pyarrow.int32(),
+        'confidence': double,
+        'risk_score': double,
+        'cancer_type_confidence': double,
+        'should_consult_doctor': pyarrow.bool_(),
+        'aspect_ratio': double,
+        'asymmetry_score': double,
+        'border_score': double,
+        'color_score': double,
+        'diameter_score': double,
+    }
+    return pyarrow.schema([(field, types.get(field, string)) for field in EXPORT_FIELDS])
+
+
+def write_parquet(rows):
+    """Write one parquet row group per batch of rows."""
+    pyarrow = lazy_imports.pyarrow()
+    schema = _parquet_schema(pyarrow)
+    factors = EXPORT_FIELDS.index('analysis_factors')
+    buffer = StreamBuffer()
+    with pyarrow.parquet.ParquetWriter(buffer, schema, compression='snappy') as writer:
+        for batch in _batches(rows):
+            columns = [list(column) for column in zip(*batch)]
+            columns[factors] = [json.dumps(value, cls=DjangoJSONEncoder) for value in columns[factors]]
+            writer.write_table(pyarrow.Table.from_arrays(columns, schema=schema))
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', write_csv),
+    'ndjson': ('application/x-ndjson', write_ndjson),
+    'parquet': ('application/vnd.apache.parquet', write_parquet),
+}
+
+
+def available_formats():
+    # parquet export is optional and needs pyarrow
+    return [name for name in EXPORT_FORMATS if name != 'parquet' or lazy_imports.is_installed('pyarrow')]
+
+
+def stream_export(queryset, export_format, row_serializer):
+    """Yield the export file for ``queryset`` in ``export_format``."""
+    writer = EXPORT_FORMATS[export_format][1]
+    return writer(export_rows(queryset, row_serializer))
+
+
+def stream_export_zip(queryset, export_format, row_serializer, basename):
+    """
+    Yield a zip archive holding the export file and the original images.
+
+    Images are stored without recompression and copied in chunks, and the
+    archive is written with data descriptors so it never needs seeking.
+    """
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        with archive.open(f'{basename}.{export_format}', 'w', force_zip64=True) as data_file:
+            for chunk in stream_export(queryset, export_format, row_serializer):
+                data_file.write(chunk)
+                yield buffer.drain()
+
+        storage = row_serializer.storage
+        images = queryset.values_list('id', 'image').iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        for pk, name in images:
+            if not name:
+                continue
+            arcname = f'images/{pk}{os.path.splitext(name)[1].lower()}'
+            try:
+                image = storage.open(name, 'rb')
+            except OSError:
+                logger.warning('Skipping missing image %s in export', name)
+                continue
+            with image, archive.open(
+                zipfile.ZipInfo(arcname), 'w', force_zip64=True
+            ) as image_file:
+                for chunk in image.chunks(IMAGE_CHUNK_SIZE):
+                    image_file.write(chunk)
+                    yield buffer.drain()
+    yield buffer.drain()
@@ -0,0 +1,52 @@
+"""
+Run a benchmark suite and compare it with the stored baseline.
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from uploads.benchmarks import SUITES, find_regressions, get_suite, load_baseline, save_baseline
+
+
+class Command(BaseCommand):
+    help = 'Run a benchmark suite, compare it with its JSON baseline and flag regressions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('suite', choices=sorted(SUITES), help='Benchmark suite to run')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case')
+        parser.add_argument('--sizes', type=int, nargs='+', default=None, help='Image sizes in pixels')
+        parser.add_argument('--formats', nargs='+', default=None, help='Image formats (jpeg, png, tiff, bmp)')
+        parser.add_argument('--rows', type=int, default=None, help='Rows to serialize (serializers suite) or pre-fill (inserts suite)')
+        parser.add_argument('--baseline', default=None,
+                            help='Baseline JSON path (default: benchmarks/<suite>.json)')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Allowed slowdown as a fraction of the baseline (default: 0.2)')
+        parser.add_argument('--update-baseline', action='store_true',
+                            help='Store this run as the new baseline')
+
+    def handle(self, *args, **options):
+        suite = options['suite']
+        baseline_path = Path(options['baseline'] or settings.BASE_DIR / 'benchmarks' / f'{suite}.json')
+
+        # call_command() passes its own stdout/stderr through options
+        options.pop('stdout', None)
+        options.pop('stderr', None)
+        results = get_suite(suite).run(stdout=self.stdout, **options)
+
+        baseline = load_baseline(baseline_path)
+        if not baseline or options['update_baseline']:
+            save_baseline(baseline_path, results)
+            self.stdout.write(self.style.SUCCESS(f'Baseline written to {baseline_path}'))
+            return
+
+        regressions = find_regressions(results, baseline, options['threshold'])
+        if regressions:
+            for case, metric, before, after in regressions:
+                self.stderr.write(f'REGRESSION {case} {metric}: {before} -> {after}')
+            raise CommandError(
+                f"{len(regressions)} case(s) regressed by more than {options['threshold']:.0%} "
+                f"against {baseline_path}"
+            )
+        self.stdout.write(self.style.SUCCESS(f'No regressions against {baseline_path}'))
@@ -0,0 +1,238 @@
+"""
+Load test the API with synthetic lesion images.
+
+Registers throwaway users through the public auth endpoints, completes the
+OTP flow and then drives a weighted mix of upload, list, dashboard and
+trends requests at a fixed concurrency against a running server.
+
+The server's rate limits would turn most of a sizeable run into ``429``
+responses, so start it with ``THROTTLE_ENABLED=False`` for load tests.
+Throttled responses are reported separately from errors either way.
+"""
+
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from uploads.synthetic import IMAGE_FORMATS, generate_lesion_image
+
+
+ENDPOINTS = {
+    'upload': ('POST', '/api/uploads/'),
+    'list': ('GET', '/api/uploads/list/'),
+    'dashboard': ('GET', '/api/analysis/dashboard-stats/'),
+    'trends': ('GET', '/api/analysis/trends/'),
+}
+
+DEFAULT_MIX = 'upload=1,list=4,dashboard=3,trends=2'
+
+PASSWORD = 'Load-Test-Pass-2024!'
+
+THROTTLED_HINT = 'Start the server with THROTTLE_ENABLED=False (or higher THROTTLE_* budgets) for load tests.'
+
+
+def parse_mix(value):
+    """Parse an ``endpoint=weight`` list into a dict of weights."""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise CommandError(f"Unknown endpoint '{name}'. Choose from: {', '.join(ENDPOINTS)}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise CommandError(f"Invalid weight for '{name}': {weight!r}")
+    if not any(mix.values()):
+        raise CommandError('At least one endpoint needs a positive weight.')
+    return mix
+
+
+def encode_multipart(field, filename, content, content_type):
+    """Encode a single file field as multipart/form-data."""
+    boundary = uuid.uuid4().hex
+    body = b''.join([
+        f'--{boundary}\r\n'.encode(),
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'.encode(),
+        f'Content-Type: {content_type}\r\n\r\n'.encode(),
+        content,
+        f'\r\n--{boundary}--\r\n'.encode(),
+    ])
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+class Command(BaseCommand):
+    help = 'Drive a mixed upload/list/dashboard/trends workload and report latency percentiles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server to load test')
+        parser.add_argument('--users', type=int, default=4, help='Number of users to register')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent client threads')
+        parser.add_argument('--duration', type=float, default=30.0, help='Load phase length in seconds')
+        parser.add_argument('--mix', default=DEFAULT_MIX, help='Weighted endpoint mix, e.g. "upload=1,list=4"')
+        parser.add_argument('--image-size', type=int, default=512, help='Synthetic image size in pixels')
+        parser.add_argument('--image-format', choices=sorted(IMAGE_FORMATS), default='jpeg')
+        parser.add_argument('--image-pool', type=int, default=8, help='Number of distinct images to upload')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+        parser.add_argument('--seed', type=int, default=None, help='Seed for images and endpoint choice')
+        parser.add_argument('--output', default=None, help='JSON report path')
+
+    def handle(self, *args, **options):
+        self.base_url = options['base_url'].rstrip('/')
+        self.timeout = options['timeout']
+        mix = parse_mix(options['mix'])
+        rng = random.Random(options['seed'])
+
+        self.stdout.write(f"Generating {options['image_pool']} synthetic "
+                          f"{options['image_format'].upper()} images ({options['image_size']}px)...")
+        images = [
+            generate_lesion_image(options['image_size'], options['image_format'], seed=rng.randrange(2 ** 32))
+            for _ in range(options['image_pool'])
+        ]
+
+        self.stdout.write(f"Registering {options['users']} users...")
+        tokens = [self._register_user() for _ in range(options['users'])]
+
+        self.stdout.write(f"Running for {options['duration']:.0f}s at concurrency {options['concurrency']}...")
+        samples, elapsed = self._run(tokens, images, mix, rng, options['concurrency'], options['duration'])
+
+        report = self._build_report(samples, elapsed, options)
+        self._print_report(report)
+
+        output = options['output'] or f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json"
+        with open(output, 'w') as fh:
+            json.dump(report, fh, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Report written to {output}'))
+
+    def _request(self, method, path, token=None, body=None, content_type=None):
+        """Send a request and return (status, parsed JSON or None)."""
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        if token:
+            req.add_header('Authorization', f'Token {token}')
+        if content_type:
+            req.add_header('Content-Type', content_type)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                status, payload = resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            status, payload = e.code, e.read()
+        try:
+            return status, json.loads(payload) if payload else None
+        except ValueError:
+            return status, None
+
+    def _post_json(self, path, data):
+        return self._request('POST', path, body=json.dumps(data).encode(), content_type='application/json')
+
+    def _register_user(self):
+        """Register a user and complete the OTP flow; return its API token."""
+        email = f'loadtest-{uuid.uuid4().hex[:12]}@example.com'
+        status, data = self._post_json('/api/auth/register/', {
+            'email': email,
+            'first_name': 'Load',
+            'last_name': 'Test',
+            'password': PASSWORD,
+            'password_confirm': PASSWORD,
+        })
+        if status == 429:
+            raise CommandError(f'Registration was throttled. {THROTTLED_HINT}')
+        if status != 201:
+            raise CommandError(f'Registration failed ({status}): {data}')
+
+        status, data = self._post_json('/api/auth/verify-otp/', {
+            'email': email,
+            'otp_code': data['otp_code'],
+        })
+        if status != 200:
+            raise CommandError(f'OTP verification failed ({status}): {data}')
+        return data['token']
+
+    def _run(self, tokens, images, mix, rng, concurrency, duration):
+        """Run the load phase and return per-endpoint samples and wall time."""
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        samples = defaultdict(list)
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def worker(worker_id):
+            local_rng = random.Random(rng.randrange(2 ** 32))
+            token = tokens[worker_id % len(tokens)]
+            local = defaultdict(list)
+            while time.perf_counter() < deadline:
+                name = local_rng.choices(names, weights)[0]
+                method, path = ENDPOINTS[name]
+                body = content_type = None
+                if name == 'upload':
+                    content, image_type, ext = local_rng.choice(images)
+                    body, content_type = encode_multipart(
+                        'image', f'loadtest_lesion.{ext}', content, image_type
+                    )
+                start = time.perf_counter()
+                try:
+                    status, _ = self._request(method, path, token, body, content_type)
+                except OSError:
+                    status = 0
+                local[name].append((time.perf_counter() - start, status))
+            with lock:
+                for name, values in local.items():
+                    samples[name].extend(values)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(worker, range(concurrency)))
+        return samples, time.perf_counter() - start
+
+    def _build_report(self, samples, elapsed, options):
+        """Summarise samples into RPS and latency percentiles per endpoint."""
+        def summarise(values):
+            latencies = np.array([latency for latency, _ in values]) * 1000
+            throttled = sum(1 for _, status in values if status == 429)
+            errors = sum(1 for _, status in values if not 200 <= status < 300) - throttled
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0, 0, 0)
+            return {
+                'requests': len(values),
+                'errors': errors,
+                'throttled': throttled,
+                'rps': round(len(values) / elapsed, 2),
+                'p50_ms': round(float(p50), 2),
+                'p95_ms': round(float(p95), 2),
+                'p99_ms': round(float(p99), 2),
+            }
+
+        all_samples = [sample for values in samples.values() for sample in values]
+        return {
+            'started_at': datetime.now().isoformat(),
+            'config': {
+                key: options[key] for key in (
+                    'base_url', 'users', 'concurrency', 'duration', 'mix',
+                    'image_size', 'image_format', 'image_pool', 'seed'
+                )
+            },
+            'elapsed_seconds': round(elapsed, 2),
+            'overall': summarise(all_samples),
+            'endpoints': {name: summarise(values) for name, values in sorted(samples.items())},
+        }
+
+    def _print_report(self, report):
+        self.stdout.write('')
+        self.stdout.write(f"{'endpoint':<12}{'requests':>10}{'errors':>8}{'429s':>8}{'rps':>10}"
+                          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        rows = list(report['endpoints'].items()) + [('overall', report['overall'])]
+        for name, stats in rows:
+            self.stdout.write(f"{name:<12}{stats['requests']:>10}{stats['errors']:>8}{stats['throttled']:>8}{stats['rps']:>10}"
+                              f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+        if report['overall']['throttled']:
+            self.stdout.write(self.style.WARNING(
+                f"{report['overall']['throttled']} requests were throttled (429). {THROTTLED_HINT}"
+            ))
@@ -0,0 +1,62 @@
+"""
+Manage monthly partitions of the image_uploads table (PostgreSQL only).
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from uploads import partitioning
+
+
+class Command(BaseCommand):
+    help = ('Partition image_uploads by month on created_at. "convert" rebuilds the table once; '
+            '"create" adds partitions ahead and "archive" detaches expired ones (run both periodically, '
+            'e.g. daily from cron); "status" lists the partitions. Does nothing on SQLite or MySQL.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['convert', 'create', 'archive', 'status'])
+        parser.add_argument('--ahead', type=int, default=settings.UPLOAD_PARTITION_AHEAD_MONTHS,
+                            help='Months of partitions to keep ready after the current one '
+                                 f'(default: {settings.UPLOAD_PARTITION_AHEAD_MONTHS})')
+        parser.add_argument('--retention-months', type=int, default=settings.UPLOAD_PARTITION_RETENTION_MONTHS,
+                            help='Months kept attached before "archive" detaches a partition '
+                                 f'(default: {settings.UPLOAD_PARTITION_RETENTION_MONTHS}, 0 keeps everything)')
+        parser.add_argument('--archive-schema', default='archive',
+                            help='Schema detached partitions are moved to (default: archive)')
+        parser.add_argument('--drop', action='store_true', help='Drop detached partitions instead of archiving them')
+
+    def handle(self, *args, **options):
+        if not partitioning.partitioning_supported(connection):
+            self.stdout.write(f'Partitioning needs PostgreSQL; {partitioning.TABLE} stays a plain table '
+                              f'on {connection.vendor}.')
+            return
+        if options['ahead'] < 0:
+            raise CommandError('--ahead cannot be negative.')
+
+        action = options['action']
+        if action == 'convert':
+            if partitioning.is_partitioned(connection):
+                self.stdout.write(f'{partitioning.TABLE} is already partitioned.')
+                return
+            copied = partitioning.convert_to_partitioned(options['ahead'], connection)
+            self.stdout.write(self.style.SUCCESS(f'Partitioned {partitioning.TABLE}; copied {copied} rows.'))
+            return
+
+        if not partitioning.is_partitioned(connection):
+            raise CommandError(f'{partitioning.TABLE} is not partitioned; run "partition_uploads convert" first.')
+
+        if action == 'create':
+            created = partitioning.create_partitions(options['ahead'], connection)
+            self.stdout.write(self.style.SUCCESS(f"Created {len(created)} partitions: {', '.join(created) or '-'}"))
+        elif action == 'archive':
+            if options['retention_months'] < 1:
+                raise CommandError('Set --retention-months (or UPLOAD_PARTITION_RETENTION_MONTHS) to archive.')
+            detached = partitioning.archive_partitions(
+                options['retention_months'], options['archive_schema'], options['drop'], connection,
+            )
+            verb = 'Dropped' if options['drop'] else f"Moved to schema {options['archive_schema']}"
+            self.stdout.write(self.style.SUCCESS(f"{verb}: {', '.join(detached) or '-'}"))
+        else:
+            for partition in partitioning.list_partitions(connection):
+                self.stdout.write(f'{partition.name:<32}{partition.month:%Y-%m}{partition.estimated_rows:>14} rows (est.)')
@@ -0,0 +1,89 @@
+"""
+Fill the database with synthetic users, uploads and search history for benchmarks.
+"""
+
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from uploads import partitioning, seeding
+
+
+class Command(BaseCommand):
+    help = ('Generate --users users with --per-user uploads each (realistic result, risk and image size '
+            'distributions, placeholder images, no files on disk). Uses COPY on PostgreSQL, LOAD DATA LOCAL '
+            'INFILE on MySQL with local_infile enabled, and multi-row INSERTs otherwise.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Users to create (default: 100)')
+        parser.add_argument('--per-user', type=int, default=100, help='Uploads per user (default: 100)')
+        parser.add_argument('--history-per-user', type=int, default=5,
+                            help='Search history rows per user (default: 5)')
+        parser.add_argument('--days', type=int, default=365,
+                            help='Spread uploads over this many past days (default: 365)')
+        parser.add_argument('--batch-size', type=int, default=50000, help='Uploads per batch (default: 50000)')
+        parser.add_argument('--method', choices=['auto', *seeding.UPLOAD_WRITERS], default='auto',
+                            help='How uploads are written (default: auto, the fastest the database supports)')
+        parser.add_argument('--prefix', default='seed', help='Username prefix (default: seed)')
+        parser.add_argument('--seed', type=int, help='Random seed for reproducible data')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias (default: default)')
+
+    def handle(self, *args, **options):
+        users, per_user = options['users'], options['per_user']
+        if users < 1 or per_user < 1 or options['history_per_user'] < 0:
+            raise CommandError('--users and --per-user must be positive; --history-per-user cannot be negative.')
+        if options['days'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--days and --batch-size must be positive.')
+
+        connection = connections[options['database']]
+        method = options['method']
+        if method == 'auto':
+            method = seeding.default_method(connection)
+        vendor = seeding.UPLOAD_WRITERS[method][0]
+        if vendor is not None and connection.vendor != vendor:
+            raise CommandError(f'--method {method} needs {vendor}; this database is {connection.vendor}.')
+
+        rng = np.random.default_rng(options['seed'])
+        end_ms = int(timezone.now().timestamp() * 1000)
+        start_ms = end_ms - options['days'] * 86400000
+
+        started = time.perf_counter()
+        months = partitioning.create_partitions_between(
+            timezone.now() - timedelta(days=options['days']), partitioning.month_start(timezone.now()),
+            connection,
+        )
+        if months:
+            self.stdout.write(f'Created {len(months)} monthly partitions.')
+        user_ids = seeding.create_users(users, options['prefix'], connection.alias)
+        self.stdout.write(f'Created {len(user_ids)} users.')
+
+        # Shuffled owners, written in time order so keys and partitions only append
+        owners = rng.permutation(np.repeat(user_ids, per_user))
+        total = len(owners)
+        batches = max(1, -(-total // options['batch_size']))
+        window = (end_ms - start_ms) / batches
+        written = 0
+        for index in range(batches):
+            batch_owners = owners[written:written + options['batch_size']]
+            batch = seeding.generate_uploads(
+                rng, batch_owners,
+                int(start_ms + index * window), int(start_ms + (index + 1) * window), first_number=written,
+            )
+            seeding.write_uploads(connection, batch, method)
+            written += len(batch_owners)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'  {written:,}/{total:,} uploads ({written / elapsed:,.0f} rows/s)')
+
+        history = seeding.create_history(
+            rng, user_ids, options['history_per_user'], start_ms, end_ms, connection.alias,
+        )
+        seeding.analyze_tables(connection)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {written:,} uploads and {history:,} history rows for {len(user_ids):,} users '
+            f'with {method} in {elapsed:.1f}s.'
+        ))
@@ -0,0 +1,46 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+# Copied from uploads.search at the time of this migration. The PostgreSQL
+# index expression must stay equal to uploads.search.search_vector() to be used.
+SEARCH_FIELDS = ('filename', 'result', 'cancer_type_name')
+SEARCH_INDEX_NAME = 'image_uploads_search_idx'
+
+
+def _gin_index():
+    return GinIndex(SearchVector(*SEARCH_FIELDS, config='simple'), name=SEARCH_INDEX_NAME)
+
+
+def create_index(apps, schema_editor):
+    ImageUpload = apps.get_model('uploads', 'ImageUpload')
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.add_index(ImageUpload, _gin_index())
+    elif vendor == 'mysql':
+        quote = schema_editor.quote_name
+        columns = ', '.join(quote(ImageUpload._meta.get_field(name).column) for name in SEARCH_FIELDS)
+        schema_editor.execute(
+            f'CREATE FULLTEXT INDEX {quote(SEARCH_INDEX_NAME)} ON {quote(ImageUpload._meta.db_table)} ({columns})'
+        )
+
+
+def drop_index(apps, schema_editor):
+    ImageUpload = apps.get_model('uploads', 'ImageUpload')
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.remove_index(ImageUpload, _gin_index())
+    elif vendor == 'mysql':
+        quote = schema_editor.quote_name
+        schema_editor.execute(f'DROP INDEX {quote(SEARCH_INDEX_NAME)} ON {quote(ImageUpload._meta.db_table)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0002_imageupload_cancer_type_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations
+
+import skincancer_backend.ids
+
+
+# Existing ids keep their value; only the MySQL column changes from the hex
+# char(32) Django uses for UUIDField to 16 raw bytes. Other databases already
+# store UUIDs natively, so only the model state changes there.
+TO_BINARY = [
+    'ALTER TABLE image_uploads ADD COLUMN id_bin BINARY(16) NULL',
+    'UPDATE image_uploads SET id_bin = UNHEX(id)',
+    'ALTER TABLE image_uploads DROP PRIMARY KEY, DROP COLUMN id, '
+    'CHANGE id_bin id BINARY(16) NOT NULL FIRST, ADD PRIMARY KEY (id)',
+]
+
+TO_HEX = [
+    'ALTER TABLE image_uploads ADD COLUMN id_hex CHAR(32) NULL',
+    'UPDATE image_uploads SET id_hex = LOWER(HEX(id))',
+    'ALTER TABLE image_uploads DROP PRIMARY KEY, DROP COLUMN id, '
+    'CHANGE id_hex id CHAR(32) NOT NULL FIRST, ADD PRIMARY KEY (id)',
+]
+
+
+def _run_on_mysql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'mysql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0003_imageupload_search_index'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(_run_on_mysql(TO_BINARY), _run_on_mysql(TO_HEX)),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='imageupload',
+                    name='id',
+                    field=skincancer_backend.ids.CompactUUIDField(default=skincancer_backend.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
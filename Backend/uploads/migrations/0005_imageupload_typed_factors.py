@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0004_imageupload_uuid7_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageupload',
+            name='aspect_ratio',
+            field=models.FloatField(default=1.0),
+        ),
+        migrations.AddField(
+            model_name='imageupload',
+            name='asymmetry_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='imageupload',
+            name='border_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='imageupload',
+            name='color_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='imageupload',
+            name='diameter_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='imageupload',
+            name='file_quality',
+            field=models.CharField(blank=True, choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('very_high', 'Very High')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='imageupload',
+            name='resolution_quality',
+            field=models.CharField(blank=True, choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('very_high', 'Very High')], default='', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='imageupload',
+            index=models.Index(fields=['resolution_quality'], name='upload_resolution_quality_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imageupload',
+            index=models.Index(fields=['file_quality'], name='upload_file_quality_idx'),
+        ),
+    ]
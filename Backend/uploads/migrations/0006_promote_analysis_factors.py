@@ -0,0 +1,90 @@
+from django.db import migrations
+
+# Keys now stored in columns; image_size, filename and file_size duplicate
+# image_width * image_height, filename and file_size
+MOVED_KEYS = ('image_size', 'filename', 'file_size', 'aspect_ratio', 'resolution_quality', 'file_quality')
+FACTORS_VERSION = 2
+BATCH_SIZE = 1000
+
+# Quality thresholds at the time of this migration, copied so later changes
+# to the analysis service cannot change what it writes
+RESOLUTION_PIXEL_THRESHOLDS = ((50000, 'low'), (200000, 'medium'), (1000000, 'high'))
+FILE_BYTES_PER_PIXEL_THRESHOLDS = ((0.5, 'low'), (1.0, 'medium'), (2.0, 'high'))
+
+
+def _quality(value, thresholds):
+    for limit, quality in thresholds:
+        if value < limit:
+            return quality
+    return 'very_high'
+
+
+def _resolution_quality(width, height):
+    return _quality(width * height, RESOLUTION_PIXEL_THRESHOLDS)
+
+
+def _file_quality(file_size, width, height):
+    pixels = width * height
+    return _quality(file_size / pixels if pixels > 0 else 0, FILE_BYTES_PER_PIXEL_THRESHOLDS)
+
+
+def _batches(ImageUpload, fields):
+    """Yield uploads in primary-key order, BATCH_SIZE at a time."""
+    queryset = ImageUpload.objects.order_by('pk').only(*fields)
+    batch = list(queryset[:BATCH_SIZE])
+    while batch:
+        yield batch
+        batch = list(queryset.filter(pk__gt=batch[-1].pk)[:BATCH_SIZE])
+
+
+def promote_factors(apps, schema_editor):
+    ImageUpload = apps.get_model('uploads', 'ImageUpload')
+    fields = ['file_size', 'image_width', 'image_height', 'analysis_factors']
+    for batch in _batches(ImageUpload, fields):
+        for upload in batch:
+            factors = upload.analysis_factors if isinstance(upload.analysis_factors, dict) else {}
+            width, height = upload.image_width, upload.image_height
+            upload.aspect_ratio = factors.get('aspect_ratio', width / height if height > 0 else 1)
+            upload.resolution_quality = (
+                factors.get('resolution_quality') or _resolution_quality(width, height)
+            )
+            upload.file_quality = (
+                factors.get('file_quality') or _file_quality(upload.file_size, width, height)
+            )
+            extras = {key: value for key, value in factors.items() if key not in MOVED_KEYS}
+            upload.analysis_factors = {**extras, 'version': FACTORS_VERSION}
+        ImageUpload.objects.bulk_update(
+            batch, ['aspect_ratio', 'resolution_quality', 'file_quality', 'analysis_factors']
+        )
+
+
+def restore_factors(apps, schema_editor):
+    ImageUpload = apps.get_model('uploads', 'ImageUpload')
+    fields = [
+        'filename', 'file_size', 'image_width', 'image_height',
+        'aspect_ratio', 'resolution_quality', 'file_quality', 'analysis_factors',
+    ]
+    for batch in _batches(ImageUpload, fields):
+        for upload in batch:
+            extras = upload.analysis_factors if isinstance(upload.analysis_factors, dict) else {}
+            upload.analysis_factors = {
+                'image_size': upload.image_width * upload.image_height,
+                'filename': upload.filename.lower(),
+                'file_size': upload.file_size,
+                'aspect_ratio': upload.aspect_ratio,
+                'resolution_quality': upload.resolution_quality,
+                'file_quality': upload.file_quality,
+                **{key: value for key, value in extras.items() if key != 'version'},
+            }
+        ImageUpload.objects.bulk_update(batch, ['analysis_factors'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0005_imageupload_typed_factors'),
+    ]
+
+    operations = [
+        migrations.RunPython(promote_factors, restore_factors),
+    ]
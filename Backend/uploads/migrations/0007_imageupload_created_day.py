@@ -0,0 +1,29 @@
+import datetime
+
+from django.db import migrations
+from django.db.models.functions import TruncDate
+
+import uploads.models
+
+
+def fill_created_day(apps, schema_editor):
+    # Every profile starts out in UTC
+    ImageUpload = apps.get_model('uploads', 'ImageUpload')
+    ImageUpload.objects.update(created_day=TruncDate('created_at', tzinfo=datetime.timezone.utc))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_userprofile_timezone'),
+        ('uploads', '0006_promote_analysis_factors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageupload',
+            name='created_day',
+            field=uploads.models.LocalDayField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_created_day, migrations.RunPython.noop),
+    ]
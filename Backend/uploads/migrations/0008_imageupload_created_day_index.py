@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+import uploads.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0007_imageupload_created_day'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='imageupload',
+            name='created_day',
+            field=uploads.models.LocalDayField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='imageupload',
+            index=models.Index(fields=['user', 'created_day'], name='upload_user_day_idx'),
+        ),
+    ]
@@ -1,7 +1,139 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 import uuid
 import os
+from types import MappingProxyType
+
+from accounts.models import user_timezone
+from skincancer_backend.ids import CompactUUIDField, uuid7
+
+
+_CONSULT_IMMEDIATELY = MappingProxyType({
+    'should_consult': True,
+    'urgency': 'high',
+    'message': '⚠️ URGENT: Consult a dermatologist immediately',
+    'color': '#F44336'
+})
+_CONSULT_SOON = MappingProxyType({
+    'should_consult': True,
+    'urgency': 'medium',
+    'message': '🔍 RECOMMENDED: Schedule a dermatologist appointment within 1-2 weeks',
+    'color': '#FF9800'
+})
+_ROUTINE_CHECKUP = MappingProxyType({
+    'should_consult': True,
+    'urgency': 'low',
+    'message': '💡 SUGGESTED: Consider a routine check-up for peace of mind',
+    'color': '#2196F3'
+})
+_NO_CONCERN = MappingProxyType({
+    'should_consult': False,
+    'urgency': 'none',
+    'message': '✅ No immediate concern, but regular skin checks are always recommended',
+    'color': '#4CAF50'
+})
+
+# Below this confidence even a benign result suggests a check-up
+LOW_CONFIDENCE_THRESHOLD = 80
+
+# Doctor recommendations keyed by (result, confidence bucket). Entries are
+# shared between rows, so they are read-only; doctor_recommendation() copies them.
+DOCTOR_RECOMMENDATIONS = MappingProxyType({
+    ('malignant', 'low'): _CONSULT_IMMEDIATELY,
+    ('malignant', 'high'): _CONSULT_IMMEDIATELY,
+    ('suspicious', 'low'): _CONSULT_SOON,
+    ('suspicious', 'high'): _CONSULT_SOON,
+    ('benign', 'low'): _ROUTINE_CHECKUP,
+    ('benign', 'high'): _NO_CONCERN,
+})
+
+
+def doctor_recommendation(result, confidence):
+    """
+    Return the shared, read-only doctor recommendation for a result and confidence.
+
+    DRF's JSON encoder renders the mapping like a dict; callers that need to
+    change it must copy it first.
+    """
+    bucket = 'low' if confidence < LOW_CONFIDENCE_THRESHOLD else 'high'
+    return DOCTOR_RECOMMENDATIONS.get((result, bucket), _NO_CONCERN)
+
+
+# Bump when the keys kept in ImageUpload.analysis_factors change
+ANALYSIS_FACTORS_VERSION = 2
+
+
+def analysis_factors_payload(filename, file_size, image_width, image_height,
+                             aspect_ratio, resolution_quality, file_quality, extras):
+    """
+    Build the ``analysis_factors`` object the API returns.
+
+    Stable factors live in typed columns and ``extras`` holds only the
+    versioned leftovers, so the legacy keys are rebuilt from the columns.
+    The storage ``version`` is internal and left out, so clients see the
+    same keys as before the columns existed.
+    """
+    return {
+        'image_size': image_width * image_height,
+        'filename': filename.lower(),
+        'file_size': file_size,
+        'aspect_ratio': aspect_ratio,
+        'resolution_quality': resolution_quality,
+        'file_quality': file_quality,
+        **{key: value for key, value in (extras or {}).items() if key != 'version'},
+    }
+
+
+def risk_by_quality(queryset, factor='resolution_quality'):
+    """Average risk score and upload count per ``factor`` level, grouped in SQL."""
+    return (
+        queryset.order_by()
+        .values(factor)
+        .annotate(uploads=models.Count('id'), avg_risk_score=models.Avg('risk_score'))
+        .order_by(factor)
+    )
+
+
+class LocalDayField(models.DateField):
+    """
+    Calendar day of ``created_at`` in the owner's time zone, set on insert.
+
+    Must be declared after ``created_at`` so auto_now_add has already filled
+    it in; save() and bulk_create() both call pre_save(). Callers that know
+    the day can set it and skip the owner's profile lookup.
+    """
+    
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.attname)
+        if value is None and model_instance.created_at is not None:
+            local = timezone.localtime(model_instance.created_at, user_timezone(model_instance.user))
+            value = local.date()
+            setattr(model_instance, self.attname, value)
+        return value
+
+
+class ImageUploadQuerySet(models.QuerySet):
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Insert uploads, loading each owner and their profile once.
+        
+        LocalDayField reads the owner's time zone for every row without a
+        ``created_day``; rows built with ``user_id`` would otherwise fetch
+        the user and profile one row at a time.
+        """
+        objs = list(objs)
+        owner_field = self.model._meta.get_field('user')
+        pending = [obj for obj in objs if obj.created_day is None and not owner_field.is_cached(obj)]
+        if pending:
+            owners = owner_field.related_model._base_manager.using(self.db).select_related('profile').in_bulk(
+                {obj.user_id for obj in pending}
+            )
+            for obj in pending:
+                if obj.user_id in owners:
+                    obj.user = owners[obj.user_id]
+        return super().bulk_create(objs, *args, **kwargs)
 
 
 def upload_to(instance, filename):
@@ -47,7 +179,15 @@ class ImageUpload(models.Model):
         ('very_high', 'Very High'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    QUALITY_CHOICES = [
+        ('low', 'Low'),
+        ('medium', 'Medium'),
+        ('high', 'High'),
+        ('very_high', 'Very High'),
+    ]
+    
+    # Time-ordered keys append to the primary-key index instead of splitting random pages
+    id = CompactUUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='uploads')
     image = models.ImageField(upload_to=upload_to)
     filename = models.CharField(max_length=255)
@@ -71,14 +211,34 @@ class ImageUpload(models.Model):
     urgency_level = models.CharField(max_length=15, choices=URGENCY_CHOICES, default='none')
     recommendation_message = models.TextField()
     
-    # Metadata
+    # Image quality factors
+    aspect_ratio = models.FloatField(default=1.0)
+    resolution_quality = models.CharField(max_length=10, choices=QUALITY_CHOICES, blank=True, default='')
+    file_quality = models.CharField(max_length=10, choices=QUALITY_CHOICES, blank=True, default='')
+    
+    # Per-feature ABCD scores (0-1), empty until the analysis produces them
+    asymmetry_score = models.FloatField(blank=True, null=True)
+    border_score = models.FloatField(blank=True, null=True)
+    color_score = models.FloatField(blank=True, null=True)
+    diameter_score = models.FloatField(blank=True, null=True)
+    
+    # Metadata: versioned extras only; stable factors have their own columns
     analysis_factors = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # created_at's date in the owner's time zone, for index-backed day/week/month grouping
+    created_day = LocalDayField(editable=False)
+    
+    objects = ImageUploadQuerySet.as_manager()
     
     class Meta:
         db_table = 'image_uploads'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_day'], name='upload_user_day_idx'),
+            models.Index(fields=['resolution_quality'], name='upload_resolution_quality_idx'),
+            models.Index(fields=['file_quality'], name='upload_file_quality_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.filename} ({self.result})"
@@ -95,36 +255,16 @@ class ImageUpload(models.Model):
         """Return confidence as percentage."""
         return f"{self.confidence:.1f}%"
     
+    def get_analysis_factors(self):
+        """Return the API ``analysis_factors`` object for this upload."""
+        return analysis_factors_payload(
+            self.filename, self.file_size, self.image_width, self.image_height,
+            self.aspect_ratio, self.resolution_quality, self.file_quality, self.analysis_factors,
+        )
+    
     def get_doctor_recommendation(self):
         """Get doctor recommendation based on result and confidence."""
-        if self.result == 'malignant':
-            return {
-                'should_consult': True,
-                'urgency': 'high',
-                'message': '⚠️ URGENT: Consult a dermatologist immediately',
-                'color': '#F44336'
-            }
-        elif self.result == 'suspicious':
-            return {
-                'should_consult': True,
-                'urgency': 'medium',
-                'message': '🔍 RECOMMENDED: Schedule a dermatologist appointment within 1-2 weeks',
-                'color': '#FF9800'
-            }
-        elif self.result == 'benign' and self.confidence < 80:
-            return {
-                'should_consult': True,
-                'urgency': 'low',
-                'message': '💡 SUGGESTED: Consider a routine check-up for peace of mind',
-                'color': '#2196F3'
-            }
-        else:
-            return {
-                'should_consult': False,
-                'urgency': 'none',
-                'message': '✅ No immediate concern, but regular skin checks are always recommended',
-                'color': '#4CAF50'
-            }
+        return doctor_recommendation(self.result, self.confidence)
 
 
 class AnalysisHistory(models.Model):
@@ -0,0 +1,259 @@
+"""
+Monthly range partitioning of ``image_uploads`` on ``created_at``.
+
+PostgreSQL only. ``convert_to_partitioned`` rebuilds the table as a
+partitioned parent with one partition per month plus a default partition
+that catches rows outside every range. ``create_partitions`` adds months
+ahead of time, and ``archive_partitions`` detaches months past the retention
+window. Queries filtering on ``created_at`` (the 7 and 30 day analytics
+windows) then only scan the matching partitions.
+
+PostgreSQL requires the primary key of a partitioned table to include the
+partition column, so the table's key becomes ``(id, created_at)``. The model
+still treats ``id`` as the primary key; UUIDv7 ids are unique on their own.
+
+On other databases every function here is a no-op and the table stays a
+plain table.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date, timezone as dt_timezone
+
+from django.db import connection as default_connection, transaction
+from django.utils import timezone
+
+from .models import ImageUpload
+
+TABLE = ImageUpload._meta.db_table
+DEFAULT_PARTITION = f'{TABLE}_default'
+LEGACY_TABLE = f'{TABLE}_legacy'
+PARTITION_COLUMN = ImageUpload._meta.get_field('created_at').column
+
+_PARTITION_NAME = re.compile(rf'^{TABLE}_p(\d{{4}})_(\d{{2}})$')
+
+
+@dataclass
+class Partition:
+    name: str
+    month: date
+    estimated_rows: int = 0
+
+
+def partitioning_supported(connection=default_connection):
+    return connection.vendor == 'postgresql'
+
+
+def add_months(month, count):
+    """First day of the month ``count`` months after ``month``."""
+    years, month_index = divmod(month.month - 1 + count, 12)
+    return date(month.year + years, month_index + 1, 1)
+
+
+def month_start(value):
+    """First day of the month containing the date or datetime ``value`` (in UTC)."""
+    if hasattr(value, 'tzinfo') and value.tzinfo is not None:
+        value = value.astimezone(dt_timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y_%m}'
+
+
+def partition_month(name):
+    """Month covered by the partition called ``name``, or None for other tables."""
+    match = _PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def _bound(month):
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def is_partitioned(connection=default_connection):
+    if not partitioning_supported(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)', [TABLE])
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def list_partitions(connection=default_connection):
+    """Monthly partitions attached to ``image_uploads``, oldest first."""
+    if not is_partitioned(connection):
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname, child.reltuples FROM pg_inherits '
+            'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+            'WHERE pg_inherits.inhparent = to_regclass(%s)',
+            [TABLE],
+        )
+        rows = cursor.fetchall()
+    partitions = [
+        Partition(name, partition_month(name), max(int(estimate), 0))
+        for name, estimate in rows
+        if partition_month(name) is not None
+    ]
+    return sorted(partitions, key=lambda partition: partition.month)
+
+
+def _create_partition(cursor, quote, month):
+    """Create the partition for ``month``, moving any of its rows out of the default partition."""
+    name, lower, upper = partition_name(month), _bound(month), _bound(add_months(month, 1))
+    cursor.execute(
+        f'SELECT EXISTS (SELECT 1 FROM {quote(DEFAULT_PARTITION)} '
+        f'WHERE {quote(PARTITION_COLUMN)} >= {lower} AND {quote(PARTITION_COLUMN)} < {upper})'
+    )
+    if not cursor.fetchone()[0]:
+        cursor.execute(
+            f'CREATE TABLE {quote(name)} PARTITION OF {quote(TABLE)} FOR VALUES FROM ({lower}) TO ({upper})'
+        )
+        return
+
+    # Attaching a range the default partition already holds rows for is an error
+    cursor.execute(f'ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(DEFAULT_PARTITION)}')
+    cursor.execute(
+        f'CREATE TABLE {quote(name)} PARTITION OF {quote(TABLE)} FOR VALUES FROM ({lower}) TO ({upper})'
+    )
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM {quote(DEFAULT_PARTITION)} '
+        f'WHERE {quote(PARTITION_COLUMN)} >= {lower} AND {quote(PARTITION_COLUMN)} < {upper} RETURNING *) '
+        f'INSERT INTO {quote(TABLE)} SELECT * FROM moved'
+    )
+    cursor.execute(f'ALTER TABLE {quote(TABLE)} ATTACH PARTITION {quote(DEFAULT_PARTITION)} DEFAULT')
+
+
+def create_partitions(ahead=3, connection=default_connection):
+    """
+    Make sure partitions exist from the current month through ``ahead`` months later.
+
+    Returns the names of the partitions created.
+    """
+    current = month_start(timezone.now())
+    return create_partitions_between(current, add_months(current, ahead), connection)
+
+
+def create_partitions_between(first, last, connection=default_connection):
+    """
+    Make sure partitions exist for every month from ``first`` through ``last``.
+
+    Returns the names of the partitions created.
+    """
+    if not is_partitioned(connection):
+        return []
+    existing = {partition.month for partition in list_partitions(connection)}
+    month = month_start(first)
+    created = []
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        while month <= last:
+            if month not in existing:
+                _create_partition(cursor, connection.ops.quote_name, month)
+                created.append(partition_name(month))
+            month = add_months(month, 1)
+    return created
+
+
+def archive_partitions(retention_months, archive_schema='archive', drop=False, connection=default_connection):
+    """
+    Detach monthly partitions that end before the retention window.
+
+    Detached partitions are moved to ``archive_schema`` (or dropped when
+    ``drop`` is set). Their rows leave every ORM query, including the upload
+    export, and can only be read from the archive schema with SQL. Returns
+    the names of the partitions detached.
+    """
+    if not is_partitioned(connection):
+        return []
+    cutoff = add_months(month_start(timezone.now()), -retention_months)
+    expired = [partition for partition in list_partitions(connection) if add_months(partition.month, 1) <= cutoff]
+    quote = connection.ops.quote_name
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if expired and not drop:
+            cursor.execute(f'CREATE SCHEMA IF NOT EXISTS {quote(archive_schema)}')
+        for partition in expired:
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(partition.name)}')
+            if drop:
+                cursor.execute(f'DROP TABLE {quote(partition.name)}')
+            else:
+                cursor.execute(f'ALTER TABLE {quote(partition.name)} SET SCHEMA {quote(archive_schema)}')
+    return [partition.name for partition in expired]
+
+
+def convert_to_partitioned(ahead=3, connection=default_connection):
+    """
+    Rebuild ``image_uploads`` as a partitioned table and copy every row into it.
+
+    Runs in one transaction holding an exclusive lock on the table, so
+    schedule it in a maintenance window. Secondary indexes and foreign keys
+    are recreated from the original table's definitions. Returns the number
+    of rows copied.
+    """
+    if not partitioning_supported(connection) or is_partitioned(connection):
+        return 0
+    quote = connection.ops.quote_name
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = to_regclass(%s) AND NOT indisprimary',
+            [TABLE],
+        )
+        index_definitions = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [TABLE],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p'",
+            [TABLE],
+        )
+        primary_key_name = cursor.fetchone()[0]
+        cursor.execute(f'SELECT MIN({quote(PARTITION_COLUMN)}) FROM {quote(TABLE)}')
+        oldest = cursor.fetchone()[0]
+
+        # Free the table, index and key names for the new parent
+        cursor.execute(f'ALTER TABLE {quote(TABLE)} RENAME TO {quote(LEGACY_TABLE)}')
+        for name, _ in constraints:
+            cursor.execute(f'ALTER TABLE {quote(LEGACY_TABLE)} DROP CONSTRAINT {quote(name)}')
+        cursor.execute(
+            'SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = to_regclass(%s) AND NOT indisprimary',
+            [LEGACY_TABLE],
+        )
+        for (index_name,) in cursor.fetchall():
+            cursor.execute(f'DROP INDEX {index_name}')
+        cursor.execute(
+            f'ALTER TABLE {quote(LEGACY_TABLE)} RENAME CONSTRAINT {quote(primary_key_name)} '
+            f'TO {quote(LEGACY_TABLE + "_pkey")}'
+        )
+
+        cursor.execute(
+            f'CREATE TABLE {quote(TABLE)} (LIKE {quote(LEGACY_TABLE)} INCLUDING DEFAULTS '
+            f'INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS) '
+            f'PARTITION BY RANGE ({quote(PARTITION_COLUMN)})'
+        )
+        cursor.execute(
+            f'ALTER TABLE {quote(TABLE)} ADD CONSTRAINT {quote(primary_key_name)} '
+            f'PRIMARY KEY ({quote(ImageUpload._meta.pk.column)}, {quote(PARTITION_COLUMN)})'
+        )
+        cursor.execute(f'CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {quote(TABLE)} DEFAULT')
+        current = month_start(timezone.now())
+        month = month_start(oldest) if oldest is not None else current
+        while month <= add_months(current, ahead):
+            _create_partition(cursor, quote, month)
+            month = add_months(month, 1)
+
+        cursor.execute(f'INSERT INTO {quote(TABLE)} SELECT * FROM {quote(LEGACY_TABLE)}')
+        copied = cursor.rowcount
+        cursor.execute(f'DROP TABLE {quote(LEGACY_TABLE)}')
+
+        # Indexes on the parent cascade to every partition, current and future
+        for definition in index_definitions:
+            cursor.execute(definition)
+        for name, definition in constraints:
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} ADD CONSTRAINT {quote(name)} {definition}')
+    return copied
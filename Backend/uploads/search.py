@@ -0,0 +1,106 @@
+"""
+Upload history search.
+
+Matches every search term as a word prefix in the filename, result or
+cancer type name, using the best index the database offers: a ``tsvector``
+GIN index on PostgreSQL, a ``FULLTEXT`` index on MySQL and plain prefix
+matching elsewhere (SQLite in development).
+
+Words are runs of letters, digits and underscores, the way MySQL's FULLTEXT
+parser splits them: ``arm`` matches ``left-arm.jpg`` but ``mole`` does not
+match ``arm_mole.jpg``. PostgreSQL's parser also splits on underscores, so its
+index only narrows the rows and the shared word-prefix regex decides.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import connections
+from django.db.models import FloatField, Func, Q
+
+SEARCH_FIELDS = ('filename', 'result', 'cancer_type_name')
+
+# InnoDB ignores shorter words (innodb_ft_min_token_size)
+MYSQL_MIN_TOKEN_SIZE = 3
+
+
+def search_terms(query):
+    """Split a search string into word terms."""
+    return re.findall(r'\w+', query)
+
+
+def word_prefix_pattern(term):
+    """Regex matching ``term`` at the start of a word."""
+    return r'(^|\W)' + re.escape(term)
+
+
+def search_vector():
+    # Must match the index expression created by migrations/0003
+    return SearchVector(*SEARCH_FIELDS, config='simple')
+
+
+class MatchAgainst(Func):
+    """MySQL ``MATCH (...) AGAINST (... IN BOOLEAN MODE)`` relevance."""
+
+    output_field = FloatField()
+
+    def __init__(self, *expressions, query):
+        super().__init__(*expressions)
+        self.query = query
+
+    def as_mysql(self, compiler, connection):
+        columns, params = [], []
+        for expression in self.get_source_expressions():
+            sql, expression_params = compiler.compile(expression)
+            columns.append(sql)
+            params.extend(expression_params)
+        return f"MATCH ({', '.join(columns)}) AGAINST (%s IN BOOLEAN MODE)", (*params, self.query)
+
+
+def _word_prefix_match(term, prefilter=False):
+    pattern = word_prefix_pattern(term)
+    match = Q()
+    for field in SEARCH_FIELDS:
+        lookups = {f'{field}__iregex': pattern}
+        if prefilter:
+            # A LIKE narrows the rows in C before the regex runs on the survivors
+            lookups[f'{field}__icontains'] = term
+        match |= Q(**lookups)
+    return match
+
+
+def _postgresql_search(queryset, terms):
+    query = SearchQuery(' & '.join(f"'{term}':*" for term in terms), search_type='raw', config='simple')
+    queryset = queryset.alias(search=search_vector()).filter(search=query)
+    for term in terms:
+        queryset = queryset.filter(_word_prefix_match(term))
+    return queryset
+
+
+def _mysql_search(queryset, terms):
+    if any(len(term) < MYSQL_MIN_TOKEN_SIZE for term in terms):
+        return _prefix_search(queryset, terms)
+    query = ' '.join(f'+{term}*' for term in terms)
+    return queryset.alias(relevance=MatchAgainst(*SEARCH_FIELDS, query=query)).filter(relevance__gt=0)
+
+
+def _prefix_search(queryset, terms):
+    for term in terms:
+        queryset = queryset.filter(_word_prefix_match(term, prefilter=True))
+    return queryset
+
+
+SEARCH_BACKENDS = {
+    'postgresql': _postgresql_search,
+    'mysql': _mysql_search,
+}
+
+
+def search_uploads(queryset, query):
+    """Filter an ImageUpload queryset to rows matching every term of ``query``."""
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    backend = SEARCH_BACKENDS.get(connections[queryset.db].vendor, _prefix_search)
+    return backend(queryset, terms)
+
@@ -0,0 +1,357 @@
+"""
+Synthetic upload history for benchmark databases.
+
+Rows are generated a batch at a time with NumPy, following the
+distributions SkinCancerAnalysisService produces, and written with
+PostgreSQL ``COPY``, MySQL ``LOAD DATA LOCAL INFILE`` or multi-row INSERTs.
+Uploads are generated in time order with UUIDv7 keys derived from their
+``created_at``, so inserts append to the primary-key index. Image names are
+placeholders; no files are written.
+"""
+
+import io
+import os
+import tempfile
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+
+from accounts.models import User, UserProfile
+
+from .models import ANALYSIS_FACTORS_VERSION, AnalysisHistory, ImageUpload
+
+SEED_IMAGE_PREFIX = 'uploads/images/seed/'
+
+# Column order of the generated upload batches (ABCD scores stay NULL)
+UPLOAD_COLUMNS = [
+    'id', 'user_id', 'image', 'filename', 'file_size', 'image_width', 'image_height',
+    'result', 'confidence', 'risk_score', 'cancer_type', 'cancer_type_confidence',
+    'cancer_type_name', 'risk_level', 'should_consult_doctor', 'urgency_level',
+    'recommendation_message', 'aspect_ratio', 'resolution_quality', 'file_quality',
+    'analysis_factors', 'created_at', 'updated_at', 'created_day',
+]
+
+# Common camera and dermatoscope resolutions and how often they occur
+IMAGE_SIZES = np.array([
+    (640, 480), (800, 600), (1024, 768), (512, 512), (1280, 960),
+    (1920, 1080), (3024, 4032), (4032, 3024),
+])
+IMAGE_SIZE_WEIGHTS = np.array([0.08, 0.1, 0.14, 0.06, 0.14, 0.12, 0.2, 0.16])
+
+# Quality thresholds of SkinCancerAnalysisService._assess_*_quality. This
+# module copies the service's rules into arrays; uploads.tests pins each
+# table below to the service so the two cannot drift apart.
+QUALITY_LEVELS = np.array(['low', 'medium', 'high', 'very_high'])
+RESOLUTION_PIXEL_THRESHOLDS = [50000, 200000, 1000000]
+FILE_BYTES_PER_PIXEL_THRESHOLDS = [0.5, 1.0, 2.0]
+
+# Simulated ABCD components: (probability the component fires strongly,
+# its score, probability of a mild finding, its score), as in the service
+RISK_COMPONENTS = [
+    (0.2, 0.2, 0.2, 0.1),     # color
+    (0.15, 0.25, 0.15, 0.15),  # texture
+    (0.2, 0.3, 0.2, 0.15),    # border
+    (0.25, 0.2, 0.25, 0.1),   # symmetry
+    (0.3, 0.1, 0.0, 0.0),     # size
+]
+
+RESULTS = np.array(['benign', 'suspicious', 'malignant'])
+
+# AnalysisHistory columns written by create_history
+HISTORY_COLUMNS = ['user_id', 'search_query', 'filter_type', 'results_count', 'created_at']
+
+# Cancer types by ascending minimum risk score:
+# (code, lower risk bound, risk level, should consult, urgency, message)
+CANCER_TYPES = [
+    ('benign_mole', 0.0, 'none', False, 'none',
+     '✅ Benign Mole - No immediate concern, but regular skin checks are recommended'),
+    ('seborrheic_keratosis', 0.1, 'none', False, 'none',
+     '✅ Seborrheic Keratosis - No immediate concern, but regular skin checks are recommended'),
+    ('actinic_keratosis', 0.2, 'low', True, 'low',
+     '💡 SUGGESTED: Actinic Keratosis detected - Consider routine dermatologist check-up'),
+    ('basal_cell_carcinoma', 0.4, 'low', True, 'medium',
+     '🔍 RECOMMENDED: Basal Cell Carcinoma detected - Schedule dermatologist appointment within 1-2 weeks'),
+    ('squamous_cell_carcinoma', 0.6, 'medium', True, 'high',
+     '⚠️ URGENT: Squamous Cell Carcinoma detected - Schedule immediate dermatologist consultation'),
+    ('melanoma', 0.8, 'high', True, 'immediate',
+     '🚨 URGENT: Melanoma detected - Consult a dermatologist immediately'),
+    ('merkel_cell_carcinoma', 0.9, 'very_high', True, 'immediate',
+     '🚨 URGENT: Merkel Cell Carcinoma detected - Consult a dermatologist immediately'),
+]
+CANCER_TYPE_NAMES = dict(ImageUpload.CANCER_TYPE_CHOICES)
+CANCER_TYPE_BOUNDS = [bound for _, bound, *_ in CANCER_TYPES[1:]]
+CANCER_TYPE_COLUMNS = {
+    'cancer_type': np.array([row[0] for row in CANCER_TYPES]),
+    'cancer_type_name': np.array([CANCER_TYPE_NAMES[row[0]] for row in CANCER_TYPES]),
+    'risk_level': np.array([row[2] for row in CANCER_TYPES]),
+    'should_consult_doctor': np.array([row[3] for row in CANCER_TYPES]),
+    'urgency_level': np.array([row[4] for row in CANCER_TYPES]),
+    'recommendation_message': np.array([row[5] for row in CANCER_TYPES]),
+}
+
+SEARCH_TERMS = ['mole', 'spot', 'arm', 'back', 'lesion', 'melanoma', 'benign', 'left shoulder', 'face']
+FILTER_TYPES = [None, 'benign', 'suspicious', 'malignant', 'high_risk']
+
+FACTORS_JSON = f'{{"version": {ANALYSIS_FACTORS_VERSION}}}'
+
+
+def uuid7_bytes(created_ms, rng):
+    """UUIDv7 keys for millisecond timestamps, as an (n, 16) uint8 array."""
+    keys = rng.integers(0, 256, size=(len(created_ms), 16), dtype=np.uint8)
+    shifts = np.arange(40, -8, -8, dtype=np.int64)
+    keys[:, :6] = (created_ms[:, None] >> shifts) & 0xFF
+    keys[:, 6] = 0x70 | (keys[:, 6] & 0x0F)
+    keys[:, 8] = 0x80 | (keys[:, 8] & 0x3F)
+    return keys
+
+
+def risk_component(draws, strong_p, strong, mild_p, mild):
+    """Scores of one RISK_COMPONENTS entry for uniform ``draws``, like the service's _simulate_* methods."""
+    return np.where(draws > 1 - strong_p, strong, np.where(draws > 1 - strong_p - mild_p, mild, 0.0))
+
+
+def generate_uploads(rng, user_ids, start_ms, end_ms, first_number=0):
+    """
+    Generate one batch of uploads for ``user_ids`` (one row each).
+
+    Returns a dict of column name to NumPy array, in UPLOAD_COLUMNS order,
+    with ``created_at`` as epoch milliseconds.
+    """
+    count = len(user_ids)
+    created_ms = np.sort(rng.integers(start_ms, end_ms, size=count, dtype=np.int64))
+
+    sizes = IMAGE_SIZES[rng.choice(len(IMAGE_SIZES), size=count, p=IMAGE_SIZE_WEIGHTS)]
+    width, height = sizes[:, 0], sizes[:, 1]
+    pixels = width * height
+    bytes_per_pixel = rng.lognormal(mean=np.log(0.9), sigma=0.5, size=count)
+    file_size = np.maximum((pixels * bytes_per_pixel).astype(np.int64), 1024)
+    resolution = np.searchsorted(RESOLUTION_PIXEL_THRESHOLDS, pixels, side='right')
+    file_quality = np.searchsorted(FILE_BYTES_PER_PIXEL_THRESHOLDS, file_size / pixels, side='right')
+
+    # Risk score: the service's simulated ABCD components plus image quality
+    risk = np.zeros(count)
+    for component in RISK_COMPONENTS:
+        risk += risk_component(rng.random(count), *component)
+    risk += np.select([resolution == 0, resolution == 3], [0.1, -0.05], 0.0)
+    risk = np.clip(risk, 0.0, 1.0)
+
+    adjusted = risk + rng.uniform(-0.1, 0.1, size=count)
+    result = np.select([adjusted > 0.65, adjusted > 0.35], [2, 1], 0)
+    confidence = np.select(
+        [result == 2, result == 1],
+        [rng.uniform(80, 95, size=count), rng.uniform(70, 89, size=count)],
+        rng.uniform(75, 99, size=count),
+    )
+    confidence += np.select([resolution == 0, resolution == 3], [-10.0, 5.0], 0.0)
+    confidence = np.round(np.clip(confidence, 65, 95), 1)
+
+    cancer_type = np.searchsorted(CANCER_TYPE_BOUNDS, risk, side='left')
+    type_confidence = np.clip(risk * 100, 65, 95) + rng.uniform(-5, 5, size=count)
+    type_confidence = np.round(np.clip(type_confidence, 60, 95), 1)
+
+    numbers = np.arange(first_number, first_number + count)
+    batch = {
+        'id': uuid7_bytes(created_ms, rng),
+        'user_id': user_ids,
+        'image': None,  # filled from the ids by the writers
+        'filename': np.char.add(np.char.add('IMG_', np.char.zfill(numbers.astype(str), 8)), '.jpg'),
+        'file_size': file_size,
+        'image_width': width,
+        'image_height': height,
+        'result': RESULTS[result],
+        'confidence': confidence,
+        'risk_score': risk,
+        'cancer_type_confidence': type_confidence,
+        'aspect_ratio': width / height,
+        'resolution_quality': QUALITY_LEVELS[resolution],
+        'file_quality': QUALITY_LEVELS[file_quality],
+        'created_at': created_ms,
+    }
+    for column, values in CANCER_TYPE_COLUMNS.items():
+        batch[column] = values[cancer_type]
+    return batch
+
+
+def _key_bytes(batch):
+    # Not .view('S16'): NumPy byte strings drop trailing NUL bytes
+    data = np.ascontiguousarray(batch['id']).tobytes()
+    return [data[offset:offset + 16] for offset in range(0, len(data), 16)]
+
+
+def _text_rows(batch, vendor):
+    """
+    Render a batch as tab-separated lines for COPY / LOAD DATA.
+
+    Every text value comes from the fixed tables above or is generated
+    without tabs, newlines or backslashes, so no escaping is needed.
+    """
+    ids = [key.hex() for key in _key_bytes(batch)]
+    stamps = np.datetime_as_string(batch['created_at'].astype('datetime64[ms]'), unit='ms')
+    if vendor == 'postgresql':
+        stamps = np.char.add(stamps, '+00')
+    stamps = stamps.tolist()
+    days = np.datetime_as_string(batch['created_at'].astype('datetime64[ms]'), unit='D').tolist()
+    columns = {
+        'id': ids,
+        'image': [f'{SEED_IMAGE_PREFIX}{key}.jpg' for key in ids],
+        'should_consult_doctor': np.where(batch['should_consult_doctor'], '1', '0').tolist(),
+        'analysis_factors': [FACTORS_JSON] * len(ids),
+        'created_at': stamps,
+        'updated_at': stamps,
+        'created_day': days,
+    }
+    values = [
+        columns[name] if name in columns else batch[name].astype(str).tolist()
+        for name in UPLOAD_COLUMNS
+    ]
+    return ''.join('\t'.join(row) + '\n' for row in zip(*values))
+
+
+def _copy_uploads(connection, batch):
+    quote = connection.ops.quote_name
+    sql = (f'COPY {quote(ImageUpload._meta.db_table)} '
+           f"({', '.join(quote(column) for column in UPLOAD_COLUMNS)}) FROM STDIN")
+    data = _text_rows(batch, connection.vendor)
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, 'copy_expert'):  # psycopg2
+            raw.copy_expert(sql, io.StringIO(data))
+        else:  # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(data)
+
+
+def _load_data_uploads(connection, batch):
+    quote = connection.ops.quote_name
+    targets = ['@id' if column == 'id' else quote(column) for column in UPLOAD_COLUMNS]
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.tsv', delete=False) as handle:
+        handle.write(_text_rows(batch, connection.vendor))
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {quote(ImageUpload._meta.db_table)} "
+                f"CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' "
+                f"({', '.join(targets)}) SET {quote('id')} = UNHEX(@id)",
+                [handle.name],
+            )
+    finally:
+        os.unlink(handle.name)
+
+
+def _insert_uploads(connection, batch):
+    """
+    Parameterised INSERT through executemany(), without model instances.
+
+    bulk_create() would stamp created_at through auto_now_add and, on
+    SQLite, splits batches into statements of a few dozen rows.
+    """
+    ops = connection.ops
+    pk_field = ImageUpload._meta.pk
+    ids = [uuid.UUID(bytes=key) for key in _key_bytes(batch)]
+    created = [
+        datetime.fromtimestamp(ms / 1000, tz=dt_timezone.utc)
+        for ms in batch['created_at'].tolist()
+    ]
+    stamps = [ops.adapt_datetimefield_value(stamp) for stamp in created]
+    columns = {
+        'id': [pk_field.get_db_prep_value(pk, connection) for pk in ids],
+        'image': [f'{SEED_IMAGE_PREFIX}{pk.hex}.jpg' for pk in ids],
+        'analysis_factors': [FACTORS_JSON] * len(ids),
+        'created_at': stamps,
+        'updated_at': stamps,
+        'created_day': [ops.adapt_datefield_value(stamp.date()) for stamp in created],
+    }
+    values = [columns[name] if name in columns else batch[name].tolist() for name in UPLOAD_COLUMNS]
+    sql = (f'INSERT INTO {ops.quote_name(ImageUpload._meta.db_table)} '
+           f"({', '.join(ops.quote_name(column) for column in UPLOAD_COLUMNS)}) "
+           f"VALUES ({', '.join(['%s'] * len(UPLOAD_COLUMNS))})")
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, list(zip(*values)))
+
+
+UPLOAD_WRITERS = {
+    'copy': ('postgresql', _copy_uploads),
+    'load-data': ('mysql', _load_data_uploads),
+    'insert': (None, _insert_uploads),
+}
+
+
+def default_method(connection):
+    """Fastest writer the database supports."""
+    if connection.vendor == 'postgresql':
+        return 'copy'
+    if connection.vendor == 'mysql' and connection.settings_dict.get('OPTIONS', {}).get('local_infile'):
+        return 'load-data'
+    return 'insert'
+
+
+def write_uploads(connection, batch, method):
+    vendor, writer = UPLOAD_WRITERS[method]
+    if vendor is not None and connection.vendor != vendor:
+        raise ValueError(f'{method} needs {vendor}, not {connection.vendor}')
+    with transaction.atomic(using=connection.alias):
+        writer(connection, batch)
+
+
+def create_users(count, prefix, using, batch_size=5000):
+    """Create ``count`` verified users with UTC profiles; return their ids."""
+    run = uuid.uuid4().hex[:8]
+    password = make_password(None)
+    users = [
+        User(
+            username=f'{prefix}-{run}-{index}', email=f'{prefix}-{run}-{index}@example.com',
+            first_name='Seed', last_name=f'User {index}', is_verified=True, password=password,
+        )
+        for index in range(count)
+    ]
+    User.objects.using(using).bulk_create(users, batch_size=batch_size)
+    user_ids = list(
+        User.objects.using(using).filter(username__startswith=f'{prefix}-{run}-')
+        .order_by('id').values_list('id', flat=True)
+    )
+    UserProfile.objects.using(using).bulk_create(
+        [UserProfile(user_id=user_id) for user_id in user_ids], batch_size=batch_size
+    )
+    return np.array(user_ids)
+
+
+def create_history(rng, user_ids, per_user, start_ms, end_ms, using, batch_size=5000):
+    """Create ``per_user`` search history rows for every user."""
+    owners = np.repeat(user_ids, per_user)
+    count = len(owners)
+    if not count:
+        return 0
+    queries = rng.choice(len(SEARCH_TERMS), size=count)
+    filters = rng.choice(len(FILTER_TYPES), size=count)
+    results = rng.poisson(6, size=count)
+    stamps = rng.integers(start_ms, end_ms, size=count, dtype=np.int64)
+    connection = connections[using]
+    ops = connection.ops
+    created = [
+        ops.adapt_datetimefield_value(datetime.fromtimestamp(ms / 1000, tz=dt_timezone.utc))
+        for ms in stamps.tolist()
+    ]
+    rows = list(zip(
+        owners.tolist(), [SEARCH_TERMS[query] for query in queries.tolist()],
+        [FILTER_TYPES[index] for index in filters.tolist()], results.tolist(), created,
+    ))
+    # Parameterised executemany() like _insert_uploads; bulk_create() would stamp created_at with now()
+    sql = (f'INSERT INTO {ops.quote_name(AnalysisHistory._meta.db_table)} '
+           f"({', '.join(ops.quote_name(column) for column in HISTORY_COLUMNS)}) "
+           f"VALUES ({', '.join(['%s'] * len(HISTORY_COLUMNS))})")
+    for start in range(0, count, batch_size):
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.executemany(sql, rows[start:start + batch_size])
+    return count
+
+
+def analyze_tables(connection):
+    """Refresh planner statistics after a large load."""
+    tables = [ImageUpload._meta.db_table, AnalysisHistory._meta.db_table]
+    with connection.cursor() as cursor:
+        for table in tables:
+            keyword = 'ANALYZE TABLE' if connection.vendor == 'mysql' else 'ANALYZE'
+            cursor.execute(f'{keyword} {connection.ops.quote_name(table)}')
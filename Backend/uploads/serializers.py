@@ -1,5 +1,10 @@
-from rest_framework import serializers
-from .models import ImageUpload, AnalysisHistory
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+from django.utils.encoding import filepath_to_uri
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from .models import ImageUpload, AnalysisHistory, analysis_factors_payload, doctor_recommendation
 from accounts.serializers import UserSerializer
 
 
@@ -9,6 +14,7 @@ class ImageUploadSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     image_url = serializers.ReadOnlyField()
     confidence_percentage = serializers.ReadOnlyField()
+    analysis_factors = serializers.SerializerMethodField()
     doctor_recommendation = serializers.SerializerMethodField()
     
     class Meta:
@@ -18,6 +24,8 @@ class ImageUploadSerializer(serializers.ModelSerializer):
             'image_width', 'image_height', 'result', 'confidence', 'confidence_percentage',
             'risk_score', 'cancer_type', 'cancer_type_confidence', 'cancer_type_name', 'risk_level',
             'should_consult_doctor', 'urgency_level', 'recommendation_message',
+            'aspect_ratio', 'resolution_quality', 'file_quality',
+            'asymmetry_score', 'border_score', 'color_score', 'diameter_score',
             'analysis_factors', 'created_at', 'updated_at', 'doctor_recommendation'
         ]
         read_only_fields = [
@@ -25,9 +33,12 @@ class ImageUploadSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
     
+    def get_analysis_factors(self, obj):
+        return obj.get_analysis_factors()
+    
     def get_doctor_recommendation(self, obj):
         """Get doctor recommendation for the upload."""
-        return obj.get_doctor_recommendation()
+        return doctor_recommendation(obj.result, obj.confidence)
 
 
 class ImageUploadCreateSerializer(serializers.ModelSerializer):
@@ -77,4 +88,138 @@ class ImageUploadListSerializer(serializers.ModelSerializer):
     
     def get_doctor_recommendation(self, obj):
         """Get doctor recommendation for the upload."""
-        return obj.get_doctor_recommendation()
+        return doctor_recommendation(obj.result, obj.confidence)
+
+
+class ImageUploadRowSerializer:
+    """
+    Read-only fast path for upload list and detail responses.
+
+    Builds representations straight from ``values_list()`` tuples instead of
+    model instances and per-field ``to_representation`` calls. The media URL
+    prefix is resolved once per serializer. Output matches
+    ImageUploadListSerializer and ImageUploadSerializer exactly.
+    """
+    
+    # Columns ImageUploadListSerializer's fields read, skipping
+    # analysis_factors, recommendation_message and the other unused columns
+    list_columns = [
+        'id', 'image', 'filename', 'result', 'confidence',
+        'cancer_type', 'cancer_type_name', 'cancer_type_confidence', 'risk_level',
+        'should_consult_doctor', 'urgency_level', 'created_at'
+    ]
+    detail_columns = [
+        'id', 'image', 'filename', 'file_size', 'image_width', 'image_height',
+        'result', 'confidence', 'risk_score', 'cancer_type', 'cancer_type_confidence',
+        'cancer_type_name', 'risk_level', 'should_consult_doctor', 'urgency_level',
+        'recommendation_message', 'aspect_ratio', 'resolution_quality', 'file_quality',
+        'asymmetry_score', 'border_score', 'color_score', 'diameter_score',
+        'analysis_factors', 'created_at', 'updated_at'
+    ]
+    
+    def __init__(self, context=None):
+        self.request = (context or {}).get('request')
+        self.storage = ImageUpload._meta.get_field('image').storage
+        # FileSystemStorage.url() is base_url + quoted name; join it directly
+        self.media_prefix = self.storage.base_url if self.storage.__class__ is FileSystemStorage else None
+        # DRF's ISO 8601 output, with the current time zone looked up once
+        self.datetime_field = serializers.DateTimeField()
+        if settings.USE_TZ and api_settings.DATETIME_FORMAT == ISO_8601:
+            self.timezone = timezone.get_current_timezone()
+        else:
+            self.timezone = None
+    
+    def image_url(self, name):
+        """Return the media URL for a stored file name, like ImageUpload.image_url."""
+        if not name:
+            return None
+        if self.media_prefix is None or '/.' in f'/{name}':
+            return self.storage.url(name)
+        return self.media_prefix + filepath_to_uri(name).lstrip('/')
+    
+    def format_datetime(self, value):
+        """Format a datetime like serializers.DateTimeField."""
+        if self.timezone is None or not value:
+            return self.datetime_field.to_representation(value)
+        if timezone.is_aware(value):
+            value = value.astimezone(self.timezone)
+        else:
+            value = timezone.make_aware(value, self.timezone)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    
+    def list_data(self, rows):
+        """Serialize ``values_list(*list_columns)`` rows."""
+        format_datetime = self.format_datetime
+        image_url = self.image_url
+        return [
+            {
+                'id': str(pk),
+                'image_url': image_url(image),
+                'filename': filename,
+                'result': result,
+                'confidence_percentage': f'{confidence:.1f}%',
+                'cancer_type': cancer_type,
+                'cancer_type_name': cancer_type_name,
+                'cancer_type_confidence': float(cancer_type_confidence),
+                'risk_level': risk_level,
+                'should_consult_doctor': should_consult_doctor,
+                'urgency_level': urgency_level,
+                'created_at': format_datetime(created_at),
+                'doctor_recommendation': doctor_recommendation(result, confidence),
+            }
+            for (pk, image, filename, result, confidence, cancer_type, cancer_type_name,
+                 cancer_type_confidence, risk_level, should_consult_doctor, urgency_level,
+                 created_at) in rows
+        ]
+    
+    def detail_data(self, row, user):
+        """Serialize one ``values_list(*detail_columns)`` row owned by ``user``."""
+        (pk, image, filename, file_size, image_width, image_height, result, confidence,
+         risk_score, cancer_type, cancer_type_confidence, cancer_type_name, risk_level,
+         should_consult_doctor, urgency_level, recommendation_message, aspect_ratio,
+         resolution_quality, file_quality, asymmetry_score, border_score, color_score,
+         diameter_score, analysis_factors, created_at, updated_at) = row
+        
+        image_url = self.image_url(image)
+        absolute_image_url = image_url
+        if image_url and self.request is not None:
+            absolute_image_url = self.request.build_absolute_uri(image_url)
+        
+        return {
+            'id': str(pk),
+            'user': UserSerializer(user).data,
+            'image': absolute_image_url,
+            'image_url': image_url,
+            'filename': filename,
+            'file_size': int(file_size),
+            'image_width': int(image_width),
+            'image_height': int(image_height),
+            'result': result,
+            'confidence': float(confidence),
+            'confidence_percentage': f'{confidence:.1f}%',
+            'risk_score': float(risk_score),
+            'cancer_type': cancer_type,
+            'cancer_type_confidence': float(cancer_type_confidence),
+            'cancer_type_name': cancer_type_name,
+            'risk_level': risk_level,
+            'should_consult_doctor': should_consult_doctor,
+            'urgency_level': urgency_level,
+            'recommendation_message': recommendation_message,
+            'aspect_ratio': float(aspect_ratio),
+            'resolution_quality': resolution_quality,
+            'file_quality': file_quality,
+            'asymmetry_score': asymmetry_score,
+            'border_score': border_score,
+            'color_score': color_score,
+            'diameter_score': diameter_score,
+            'analysis_factors': analysis_factors_payload(
+                filename, file_size, image_width, image_height,
+                aspect_ratio, resolution_quality, file_quality, analysis_factors,
+            ),
+            'created_at': self.format_datetime(created_at),
+            'updated_at': self.format_datetime(updated_at),
+            'doctor_recommendation': doctor_recommendation(result, confidence),
+        }
@@ -0,0 +1,81 @@
+"""
+Synthetic lesion image generation.
+Produces lesion-like test images for load tests and benchmarks.
+"""
+
+import io
+
+import numpy as np
+from PIL import Image
+
+
+# format key -> (PIL format, content type, file extension)
+IMAGE_FORMATS = {
+    'jpeg': ('JPEG', 'image/jpeg', 'jpg'),
+    'png': ('PNG', 'image/png', 'png'),
+    'tiff': ('TIFF', 'image/tiff', 'tiff'),
+    'bmp': ('BMP', 'image/bmp', 'bmp'),
+}
+
+
+def generate_lesion_array(size, rng=None):
+    """
+    Generate an RGB array resembling a pigmented skin lesion.
+
+    Args:
+        size: Width and height of the square image in pixels
+        rng: Optional numpy Generator for reproducible output
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (size, size, 3)
+    """
+    rng = rng or np.random.default_rng()
+
+    # Skin-tone background with mild per-pixel noise
+    skin = np.array([224, 172, 140]) + rng.integers(-25, 25, size=3)
+    image = np.empty((size, size, 3), dtype=np.float32)
+    image[:] = skin
+    image += rng.normal(0, 6, size=(size, size, 1))
+
+    # Irregular lesion: an ellipse whose radius wobbles with the angle
+    yy, xx = np.mgrid[0:size, 0:size].astype(np.float32)
+    cx, cy = size * rng.uniform(0.4, 0.6, size=2)
+    dx, dy = xx - cx, yy - cy
+    angle = np.arctan2(dy, dx)
+    base_radius = size * rng.uniform(0.15, 0.3)
+    wobble = sum(
+        rng.uniform(0.02, 0.12) * np.sin(k * angle + rng.uniform(0, 2 * np.pi))
+        for k in range(2, 6)
+    )
+    radius = base_radius * (1 + wobble) * rng.uniform(0.7, 1.0)
+    distance = np.hypot(dx, dy * rng.uniform(0.8, 1.25)) / radius
+
+    # Darker, variegated pigment inside the border with a soft edge
+    pigment = np.array([90, 55, 40]) + rng.integers(-30, 30, size=3)
+    mask = np.clip((1.1 - distance) * 4, 0, 1)[..., None]
+    variegation = rng.normal(0, 12, size=(size, size, 1)) * mask
+    image = image * (1 - mask) + (pigment + variegation) * mask
+
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def generate_lesion_image(size=512, fmt='jpeg', seed=None):
+    """
+    Generate an encoded synthetic lesion image.
+
+    Args:
+        size: Width and height of the square image in pixels
+        fmt: One of the keys of IMAGE_FORMATS
+        seed: Optional seed for reproducible output
+
+    Returns:
+        tuple: (image bytes, content type, file extension)
+    """
+    pil_format, content_type, extension = IMAGE_FORMATS[fmt]
+    array = generate_lesion_array(size, np.random.default_rng(seed))
+
+    buffer = io.BytesIO()
+    save_kwargs = {'quality': 90} if pil_format == 'JPEG' else {}
+    Image.fromarray(array, 'RGB').save(buffer, format=pil_format, **save_kwargs)
+
+    return buffer.getvalue(), content_type, extension
@@ -0,0 +1,642 @@
+import csv
+import gzip
+import json
+import os
+import runpy
+import tempfile
+import uuid
+import zlib
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.backends.mysql.operations import DatabaseOperations as MySQLOperations
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts.models import User, UserProfile
+from skincancer_backend import lazy_imports, settings as settings_module
+from skincancer_backend.db_router import ReplicaRouter, pin_to_primary, read_from_replica
+from skincancer_backend.ids import uuid7
+from . import partitioning, seeding
+from .analysis_service import SkinCancerAnalysisService
+from .export import EXPORT_FIELDS
+from .management.commands.loadtest import Command as LoadTestCommand
+from .models import (
+    ANALYSIS_FACTORS_VERSION, DOCTOR_RECOMMENDATIONS, AnalysisHistory, ImageUpload, doctor_recommendation,
+    risk_by_quality,
+)
+from .serializers import ImageUploadListSerializer, ImageUploadRowSerializer, ImageUploadSerializer
+from .synthetic import generate_lesion_image
+
+
+def make_user(email, **extra):
+    user = User.objects.create_user(username=email, email=email, password='pass12345', **extra)
+    UserProfile.objects.create(user=user)
+    return user
+
+
+def make_uploads(user, count):
+    return ImageUpload.objects.bulk_create(
+        ImageUpload(
+            user=user,
+            image=f'uploads/images/lesion_{index}.jpg',
+            filename=f'lesion_{index}.jpg',
+            file_size=1024,
+            image_width=64,
+            image_height=64,
+            result='benign',
+            confidence=90.0,
+            risk_score=0.1,
+            should_consult_doctor=False,
+            urgency_level='low',
+            recommendation_message='Routine monitoring.',
+        )
+        for index in range(count)
+    )
+
+
+class NestedUserQueryCountTests(TestCase):
+    """Listing uploads, with or without their owner, must not add a query per row."""
+
+    def setUp(self):
+        self.user = make_user('owner@example.com', is_staff=True, is_superuser=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def count_queries(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url, params).status_code, 200)
+        return len(queries)
+
+    def test_list_view_queries_stay_flat(self):
+        url = reverse('upload-list')
+        make_uploads(self.user, 2)
+
+        few = self.count_queries(url)
+        searched = self.count_queries(url, search='lesion')
+        make_uploads(self.user, 18)
+        self.assertEqual(self.count_queries(url), few)
+        self.assertEqual(self.count_queries(url, search='lesion'), searched)
+
+    def test_list_view_selects_only_the_list_columns(self):
+        make_uploads(self.user, 3)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('upload-list'))
+        self.assertEqual(response.status_code, 200)
+        # The ETag version, the page count and the page itself
+        self.assertEqual(len(queries), 3)
+        page_sql = queries[-1]['sql']
+        for column in ImageUploadRowSerializer.list_columns:
+            self.assertIn(f'"{column}"', page_sql)
+        for column in ('analysis_factors', 'recommendation_message', 'file_size'):
+            self.assertNotIn(f'"{column}"', page_sql)
+
+    def test_detail_view_reads_one_row_and_the_owner_profile(self):
+        upload, = make_uploads(self.user, 1)
+        # Authenticate as a freshly loaded user, as token authentication does
+        self.client.force_authenticate(User.objects.get(pk=self.user.pk))
+        # The upload row, then the requesting user's profile for the nested user
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('upload-detail', kwargs={'pk': upload.pk}))
+        self.assertEqual(response.data['user']['email'], self.user.email)
+
+    def test_admin_changelist_queries_stay_flat(self):
+        self.client.force_login(self.user)
+        for name in ('admin:uploads_imageupload_changelist', 'admin:uploads_analysishistory_changelist'):
+            with self.subTest(name):
+                url = reverse(name)
+                make_uploads(self.user, 2)
+                AnalysisHistory.objects.create(user=self.user, search_query='mole')
+
+                few = self.count_queries(url)
+                for index in range(10):
+                    other = make_user(f'other{index}@{name}.example.com')
+                    make_uploads(other, 1)
+                    AnalysisHistory.objects.create(user=other, search_query='mole')
+                self.assertEqual(self.count_queries(url), few)
+
+
+class UploadSearchTests(TestCase):
+    """Search matches every term as a word prefix across the searchable fields."""
+
+    def setUp(self):
+        self.user = make_user('owner@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        uploads = make_uploads(self.user, 3)
+        ImageUpload.objects.filter(pk=uploads[0].pk).update(filename='left-arm_mole.png')
+        ImageUpload.objects.filter(pk=uploads[1].pk).update(result='malignant', cancer_type_name='Melanoma')
+
+    def search(self, query):
+        response = self.client.get(reverse('upload-list'), {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return sorted(item['filename'] for item in response.data['results'])
+
+    def test_word_prefix_matches(self):
+        self.assertEqual(self.search('ARM_M'), ['left-arm_mole.png'])
+        self.assertEqual(self.search('png'), ['left-arm_mole.png'])
+        self.assertEqual(self.search('melan'), ['lesion_1.jpg'])
+
+    def test_underscores_join_words_like_mysql_fulltext(self):
+        # Hyphens and dots separate words; underscores do not
+        self.assertEqual(self.search('arm'), ['left-arm_mole.png'])
+        self.assertEqual(self.search('mole'), [])
+        self.assertEqual(self.search('_mole'), [])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.search('lesion benign'), ['lesion_2.jpg'])
+        self.assertEqual(self.search('lesion_1 malignant'), ['lesion_1.jpg'])
+
+    def test_infix_and_empty_terms_do_not_match(self):
+        self.assertEqual(self.search('ole'), [])
+        self.assertEqual(self.search('%%'), [])
+
+
+@override_settings(DATABASE_REPLICAS=['replica_0'], REPLICA_PIN_SECONDS=60)
+class ReplicaRoutingTests(TestCase):
+    """Decorated read views use a replica unless the user recently wrote."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('owner@example.com')
+        self.router = ReplicaRouter()
+
+    def route(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        return read_from_replica(lambda request: self.router.db_for_read(ImageUpload))(request)
+
+    def test_reads_go_to_replica_only_inside_decorated_views(self):
+        self.assertEqual(self.route(), 'replica_0')
+        self.assertEqual(self.router.db_for_read(ImageUpload), 'default')
+        self.assertEqual(self.router.db_for_write(ImageUpload), 'default')
+
+    def test_writes_pin_the_user_to_the_primary(self):
+        pin_to_primary(self.user)
+        self.assertEqual(self.route(), 'default')
+
+    def test_replicas_need_a_shared_cache_for_pins(self):
+        def replicas(redis_url):
+            env = {'DATABASE_REPLICA_URLS': 'sqlite:////tmp/replica.sqlite3', 'REDIS_URL': redis_url}
+            with mock.patch.dict(os.environ, env):
+                return runpy.run_path(settings_module.__file__)['DATABASE_REPLICAS']
+
+        self.assertEqual(replicas('redis://localhost:6379/0'), ['replica_0'])
+        self.assertEqual(replicas(''), [])
+
+
+class TimeOrderedKeyTests(TestCase):
+    """Uploads get version 7 keys that sort by creation time."""
+
+    def test_uuid7_layout_and_order(self):
+        keys = [uuid7() for _ in range(1000)]
+        self.assertTrue(all(key.version == 7 and key.variant == uuid.RFC_4122 for key in keys))
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(set(keys)), len(keys))
+
+    def test_binary_column_values_round_trip(self):
+        key = uuid7()
+        field = ImageUpload._meta.pk
+        self.assertEqual(field.from_db_value(key.bytes, None, connection), key)
+        self.assertEqual(field.from_db_value(memoryview(key.bytes), None, connection), key)
+
+    def test_mysql_converters_read_binary_keys(self):
+        key = uuid7()
+        mysql = mock.Mock(vendor='mysql')
+        mysql.ops = MySQLOperations(mysql)
+        column = ImageUpload._meta.pk.get_col(ImageUpload._meta.db_table)
+        self.assertEqual(column.output_field.db_type(mysql), 'binary(16)')
+        self.assertEqual(column.output_field.get_db_prep_value(key, mysql), key.bytes)
+
+        # The converter chain the SQL compiler builds for the column
+        value = key.bytes
+        for converter in mysql.ops.get_db_converters(column) + column.get_db_converters(mysql):
+            value = converter(value, column, mysql)
+        self.assertEqual(value, key)
+
+    def test_detail_url_resolves_new_keys(self):
+        user = make_user('owner@example.com')
+        upload = make_uploads(user, 1)[0]
+        self.assertEqual(upload.pk.version, 7)
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(reverse('upload-detail', args=[upload.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], str(upload.pk))
+
+
+class PartitioningTests(TestCase):
+    """Monthly partition bookkeeping; the DDL itself only runs on PostgreSQL."""
+
+    def test_month_arithmetic_and_names(self):
+        self.assertEqual(partitioning.add_months(date(2025, 11, 1), 3), date(2026, 2, 1))
+        self.assertEqual(partitioning.add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+        aware = datetime(2026, 3, 31, 23, 30, tzinfo=dt_timezone(timedelta(hours=-2)))
+        self.assertEqual(partitioning.month_start(aware), date(2026, 4, 1))
+        name = partitioning.partition_name(date(2026, 4, 1))
+        self.assertEqual(name, 'image_uploads_p2026_04')
+        self.assertEqual(partitioning.partition_month(name), date(2026, 4, 1))
+        self.assertIsNone(partitioning.partition_month('image_uploads_default'))
+
+    def test_other_databases_keep_a_plain_table(self):
+        self.assertFalse(partitioning.is_partitioned(connection))
+        self.assertEqual(partitioning.create_partitions(connection=connection), [])
+        out = StringIO()
+        call_command('partition_uploads', 'convert', stdout=out)
+        self.assertIn('stays a plain table', out.getvalue())
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir())
+class AnalysisFactorColumnTests(TestCase):
+    """Stable analysis factors are stored in columns; the JSON keeps versioned extras."""
+
+    def setUp(self):
+        self.user = make_user('owner@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_upload_stores_typed_factors(self):
+        content, content_type, extension = generate_lesion_image(64, 'png', seed=1)
+        image = SimpleUploadedFile(f'mole.{extension}', content, content_type=content_type)
+        response = self.client.post(reverse('upload-create'), {'image': image}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.addCleanup(ImageUpload.objects.get(pk=response.data['id']).image.delete, save=False)
+
+        upload = ImageUpload.objects.get(pk=response.data['id'])
+        self.assertEqual((upload.resolution_quality, upload.aspect_ratio), ('low', 1.0))
+        self.assertEqual(upload.analysis_factors, {'version': ANALYSIS_FACTORS_VERSION})
+        detail = self.client.get(reverse('upload-detail', args=[upload.pk])).json()
+        self.assertEqual(detail['analysis_factors'], {
+            'image_size': 64 * 64,
+            'filename': f'mole.{extension}',
+            'file_size': upload.file_size,
+            'aspect_ratio': 1.0,
+            'resolution_quality': 'low',
+            'file_quality': upload.file_quality,
+        })
+        self.assertEqual(detail, ImageUploadSerializer(upload, context={'request': response.wsgi_request}).data | {
+            'user': detail['user'],
+        })
+
+    def test_cohorts_are_grouped_in_sql(self):
+        uploads = make_uploads(self.user, 3)
+        ImageUpload.objects.filter(pk=uploads[0].pk).update(resolution_quality='high', risk_score=0.5)
+        ImageUpload.objects.exclude(pk=uploads[0].pk).update(resolution_quality='low', risk_score=0.2)
+        with CaptureQueriesContext(connection) as queries:
+            cohorts = list(risk_by_quality(ImageUpload.objects.filter(user=self.user)))
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(cohorts, [
+            {'resolution_quality': 'high', 'uploads': 1, 'avg_risk_score': 0.5},
+            {'resolution_quality': 'low', 'uploads': 2, 'avg_risk_score': 0.2},
+        ])
+
+
+class SeedUploadsTests(TestCase):
+    """seed_uploads writes consistent, time-ordered rows without touching disk."""
+
+    def test_seed_small_dataset(self):
+        with self.assertRaises(CommandError):
+            call_command('seed_uploads', method='copy', stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, '--per-user must be positive'):
+            call_command('seed_uploads', users=2, per_user=0, stdout=StringIO())
+        self.assertFalse(User.objects.filter(username__startswith='seed-').exists())
+        call_command('seed_uploads', users=3, per_user=40, history_per_user=2, batch_size=50, seed=7,
+                     stdout=StringIO())
+
+        users = User.objects.filter(username__startswith='seed-')
+        self.assertEqual(users.count(), 3)
+        self.assertEqual(UserProfile.objects.filter(user__in=users).count(), 3)
+        self.assertFalse(users[0].has_usable_password())
+        uploads = list(ImageUpload.objects.filter(user__in=users).order_by('pk'))
+        self.assertEqual(len(uploads), 120)
+        self.assertEqual(AnalysisHistory.objects.filter(user__in=users).count(), 6)
+
+        # Keys follow created_at, which was kept rather than stamped with now()
+        self.assertEqual(uploads, sorted(uploads, key=lambda upload: upload.created_at))
+        self.assertGreater(uploads[-1].created_at - uploads[0].created_at, timedelta(days=30))
+        for upload in uploads:
+            self.assertEqual(upload.created_day, upload.created_at.date())
+            self.assertTrue(upload.image.name.startswith('uploads/images/seed/'))
+            self.assertEqual(upload.cancer_type_name, dict(ImageUpload.CANCER_TYPE_CHOICES)[upload.cancer_type])
+            self.assertTrue(65 <= upload.confidence <= 95)
+
+        # History keeps its generated timestamps too
+        history = sorted(AnalysisHistory.objects.filter(user__in=users).values_list('created_at', flat=True))
+        self.assertGreater(history[-1] - history[0], timedelta(days=1))
+
+
+class SeedingMatchesServiceTests(TestCase):
+    """The seeding tables copy SkinCancerAnalysisService's rules and must change with it."""
+
+    def setUp(self):
+        self.service = SkinCancerAnalysisService()
+        # A filename without the keywords the service looks for, like the seeded IMG_00000001.jpg
+        self.service.analysis_factors = {'filename': 'img_00000001.jpg'}
+
+    def test_quality_thresholds(self):
+        for pixels in [1, *(limit + step for limit in seeding.RESOLUTION_PIXEL_THRESHOLDS for step in (-1, 0, 1))]:
+            level = seeding.QUALITY_LEVELS[np.searchsorted(seeding.RESOLUTION_PIXEL_THRESHOLDS, pixels, side='right')]
+            self.assertEqual(level, self.service._assess_resolution_quality(pixels, 1), pixels)
+        for ratio in [0.0, *(limit + step for limit in seeding.FILE_BYTES_PER_PIXEL_THRESHOLDS
+                             for step in (-0.01, 0, 0.01))]:
+            level = seeding.QUALITY_LEVELS[np.searchsorted(seeding.FILE_BYTES_PER_PIXEL_THRESHOLDS, ratio, side='right')]
+            self.assertEqual(level, self.service._assess_file_quality(ratio * 1000, 1000, 1), ratio)
+
+    def test_risk_components(self):
+        simulations = [
+            self.service._simulate_color_analysis, self.service._simulate_texture_analysis,
+            self.service._simulate_border_analysis, self.service._simulate_symmetry_analysis,
+            self.service._simulate_size_analysis,
+        ]
+        self.assertEqual(len(simulations), len(seeding.RISK_COMPONENTS))
+        draws = (np.arange(200) + 0.5) / 200
+        for simulate, component in zip(simulations, seeding.RISK_COMPONENTS):
+            expected = []
+            for draw in draws:
+                with mock.patch('random.random', return_value=draw):
+                    expected.append(simulate())
+            self.assertEqual(seeding.risk_component(draws, *component).tolist(), expected, simulate.__name__)
+
+    def test_cancer_types_and_recommendations(self):
+        bounds = seeding.CANCER_TYPE_BOUNDS
+        for risk in [*((np.arange(100) + 0.5) / 100), *bounds]:
+            index = np.searchsorted(bounds, risk, side='left')
+            seeded = {column: values[index] for column, values in seeding.CANCER_TYPE_COLUMNS.items()}
+            detected = self.service._detect_cancer_type(risk)
+            recommendation = self.service._get_medical_recommendations('benign', 90, detected)
+            self.assertEqual(
+                (seeded['cancer_type'], seeded['cancer_type_name'], seeded['risk_level']),
+                (detected['type'], detected['name'], detected['risk_level']), risk,
+            )
+            self.assertEqual(
+                (seeded['should_consult_doctor'], seeded['urgency_level'], seeded['recommendation_message']),
+                (recommendation['should_consult'], recommendation['urgency'], recommendation['message']), risk,
+            )
+
+
+class LocalDayTests(TestCase):
+    """created_day is the local date of created_at, resolved once per owner on bulk inserts."""
+
+    def test_bulk_create_looks_up_each_owner_once(self):
+        users = [make_user('tokyo@example.com'), make_user('utc@example.com')]
+        UserProfile.objects.filter(user=users[0]).update(timezone='Asia/Tokyo')
+        users.append(User.objects.create_user(username='none@example.com', email='none@example.com', password='x'))
+
+        def insert(count):
+            uploads = [
+                ImageUpload(user_id=user.pk, image='a.jpg', filename='a.jpg', file_size=1, image_width=1,
+                            image_height=1, result='benign', confidence=90.0, risk_score=0.1,
+                            recommendation_message='')
+                for _ in range(count) for user in users
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                ImageUpload.objects.bulk_create(uploads)
+            return len(queries), uploads
+
+        few, _ = insert(1)
+        many, uploads = insert(10)
+        self.assertEqual(many, few)
+        for upload in uploads[:3]:
+            zone = 'Asia/Tokyo' if upload.user_id == users[0].pk else 'UTC'
+            self.assertEqual(upload.created_day, timezone.localtime(upload.created_at, ZoneInfo(zone)).date())
+
+
+class ListCachingAndCompressionTests(TestCase):
+    """The upload list revalidates with ETags; large list and export bodies are compressed."""
+
+    def setUp(self):
+        self.user = make_user('owner@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.uploads = make_uploads(self.user, 20)
+
+    def test_list_not_modified(self):
+        url = reverse('upload-list')
+        etag = self.client.get(url, {'search': 'lesion'})['ETag']
+        response = self.client.get(url, {'search': 'lesion'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(AnalysisHistory.objects.filter(user=self.user).count(), 1)
+
+        self.assertEqual(self.client.get(url, {'page': 1}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.uploads[0].save()
+        self.assertEqual(self.client.get(url, {'search': 'lesion'}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_is_compressed(self):
+        plain = self.client.get(reverse('upload-list'))
+        self.assertFalse(plain.has_header('Content-Encoding'))
+
+        response = self.client.get(reverse('upload-list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        with mock.patch.object(lazy_imports, 'is_installed', return_value=True), \
+                mock.patch.object(lazy_imports, 'brotli', return_value=FakeBrotli):
+            response = self.client.get(reverse('upload-list'), HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(FakeBrotli.decompress(response.content), plain.content)
+
+    def test_streamed_export_is_compressed(self):
+        response = self.client.get(reverse('upload-export'), {'format': 'ndjson'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(b''.join(response.streaming_content)).splitlines()
+        self.assertEqual(len(lines), 20)
+
+        response = self.client.get(reverse('upload-export'), {'images': '1'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class UploadExportTests(TestCase):
+    """Exports carry every EXPORT_FIELDS column with the values the detail API returns."""
+
+    def setUp(self):
+        self.user = make_user('owner@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        first, second = make_uploads(self.user, 2)
+        ImageUpload.objects.filter(pk=first.pk).update(
+            filename='Left arm, "mole" é.jpg', result='malignant', confidence=72.25, risk_score=0.875,
+            cancer_type='melanoma', cancer_type_name='Melanoma', cancer_type_confidence=64.5,
+            should_consult_doctor=True, asymmetry_score=0.5, analysis_factors={'version': 2, 'color_variance': 1.5},
+            created_at=datetime(2024, 1, 31, 23, 30, 0, 123456, tzinfo=dt_timezone.utc),
+        )
+        ImageUpload.objects.filter(pk=second.pk).update(created_at=datetime(2024, 2, 1, tzinfo=dt_timezone.utc))
+        self.details = [
+            self.client.get(reverse('upload-detail', kwargs={'pk': upload.pk})).data for upload in (first, second)
+        ]
+
+    def export(self, export_format):
+        response = self.client.get(reverse('upload-export'), {'format': export_format})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_csv_round_trip(self):
+        reader = csv.reader(StringIO(self.export('csv').decode('utf-8')))
+        self.assertEqual(next(reader), EXPORT_FIELDS)
+        rows = [dict(zip(EXPORT_FIELDS, row)) for row in reader]
+        self.assertEqual([row['id'] for row in rows], [detail['id'] for detail in self.details])
+
+        row, detail = rows[0], self.details[0]
+        for field in ('image_url', 'filename', 'result', 'cancer_type', 'cancer_type_name', 'risk_level',
+                      'urgency_level', 'recommendation_message', 'resolution_quality', 'created_at', 'updated_at'):
+            self.assertEqual(row[field], detail[field], field)
+        self.assertEqual(int(row['file_size']), detail['file_size'])
+        self.assertEqual(float(row['confidence']), detail['confidence'])
+        self.assertEqual(float(row['cancer_type_confidence']), detail['cancer_type_confidence'])
+        self.assertEqual(float(row['asymmetry_score']), detail['asymmetry_score'])
+        self.assertEqual(row['should_consult_doctor'], 'True')
+        self.assertEqual(row['border_score'], '')
+        factors = json.loads(row['analysis_factors'])
+        self.assertEqual(factors, detail['analysis_factors'])
+        self.assertEqual(factors['color_variance'], 1.5)
+        self.assertNotIn('version', factors)
+        self.assertEqual(row['created_at'], '2024-01-31T23:30:00.123456Z')
+
+    @skipUnless(lazy_imports.is_installed('pyarrow'), 'pyarrow is not installed')
+    def test_parquet_round_trip(self):
+        pyarrow = lazy_imports.pyarrow()
+        table = pyarrow.parquet.read_table(BytesIO(self.export('parquet')))
+        self.assertEqual(table.column_names, EXPORT_FIELDS)
+        types = {field.name: field.type for field in table.schema}
+        self.assertEqual(types['file_size'], pyarrow.int64())
+        self.assertEqual(types['image_width'], pyarrow.int32())
+        self.assertEqual(types['confidence'], pyarrow.float64())
+        self.assertEqual(types['should_consult_doctor'], pyarrow.bool_())
+        self.assertEqual(types['created_at'], pyarrow.string())
+
+        row, detail = table.to_pylist()[0], self.details[0]
+        for field in EXPORT_FIELDS:
+            if field != 'analysis_factors':
+                self.assertEqual(row[field], detail[field], field)
+        self.assertIsNone(row['border_score'])
+        factors = json.loads(row['analysis_factors'])
+        self.assertEqual(factors, detail['analysis_factors'])
+        self.assertEqual(factors['color_variance'], 1.5)
+        self.assertNotIn('version', factors)
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get(reverse('upload-export'), {'format': 'xlsx'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('csv', response.data['error'])
+
+
+class FakeBrotli:
+    """zlib standing in for the optional brotli package."""
+
+    class Compressor:
+        def __init__(self, quality):
+            self._compressor = zlib.compressobj()
+
+        def process(self, data):
+            return self._compressor.compress(data)
+
+        def flush(self):
+            return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        def finish(self):
+            return self._compressor.flush()
+
+    @staticmethod
+    def compress(data, quality):
+        return zlib.compress(data)
+
+    decompress = staticmethod(zlib.decompress)
+
+
+class LoadTestReportTests(TestCase):
+
+    def test_throttled_responses_are_not_errors(self):
+        options = {key: None for key in (
+            'base_url', 'users', 'concurrency', 'duration', 'mix', 'image_size', 'image_format', 'image_pool', 'seed'
+        )}
+        samples = {'list': [(0.01, 200), (0.02, 429), (0.03, 500), (0.04, 429)]}
+        report = LoadTestCommand()._build_report(samples, 1.0, options)
+        self.assertEqual((report['overall']['errors'], report['overall']['throttled']), (1, 2))
+
+
+class BenchmarkCommandTests(TestCase):
+
+    def test_call_command_writes_baseline(self):
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = f'{tmp}/analysis.json'
+            call_command('benchmark', 'analysis', repeat=1, sizes=[64], formats=['png'], baseline=baseline,
+                         stdout=out, stderr=StringIO())
+            with open(baseline) as fh:
+                self.assertIn('decode/png/64', json.load(fh))
+        self.assertIn('Baseline written to', out.getvalue())
+
+
+class DoctorRecommendationTests(TestCase):
+
+    def test_rows_share_one_read_only_recommendation(self):
+        recommendation = doctor_recommendation('benign', 95)
+        self.assertIs(doctor_recommendation('benign', 99), recommendation)
+        with self.assertRaises(TypeError):
+            recommendation['message'] = 'changed'
+        with self.assertRaises(TypeError):
+            DOCTOR_RECOMMENDATIONS[('malignant', 'high')]['message'] = 'changed'
+
+    def test_shared_recommendation_renders_as_an_object(self):
+        rendered = json.loads(JSONRenderer().render({'doctor_recommendation': doctor_recommendation('malignant', 90)}))
+        self.assertEqual(rendered['doctor_recommendation'], dict(DOCTOR_RECOMMENDATIONS[('malignant', 'high')]))
+
+
+class RowSerializerTests(TestCase):
+    """The values_list fast path renders the same JSON bytes as the DRF serializers."""
+
+    def setUp(self):
+        self.user = make_user('owner@example.com')
+        uploads = make_uploads(self.user, 3)
+        ImageUpload.objects.filter(pk=uploads[0].pk).update(
+            image='uploads/images/2024/01/left arm (mole) é.jpg', filename='Left Arm (mole) é.JPG',
+            result='malignant', confidence=72.25, risk_score=0.875, cancer_type='melanoma',
+            cancer_type_name='Melanoma', cancer_type_confidence=64.5, risk_level='high',
+            should_consult_doctor=True, urgency_level='high', aspect_ratio=1.3333333333333333,
+            resolution_quality='low', file_quality='high', asymmetry_score=0.5, border_score=0.25,
+            analysis_factors={'version': ANALYSIS_FACTORS_VERSION, 'color_variance': 12.75},
+            created_at=datetime(2024, 1, 31, 23, 30, 0, 123456, tzinfo=dt_timezone.utc),
+        )
+        ImageUpload.objects.filter(pk=uploads[1].pk).update(
+            image='', analysis_factors={}, created_at=datetime(2024, 7, 1, 12, 0, tzinfo=dt_timezone.utc),
+        )
+        self.queryset = ImageUpload.objects.filter(user=self.user).order_by('created_at')
+        self.request = RequestFactory().get('/api/uploads/', HTTP_HOST='testserver')
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def assert_same_bytes(self):
+        expected = ImageUploadListSerializer(self.queryset, many=True, context={'request': self.request}).data
+        rows = self.queryset.values_list(*ImageUploadRowSerializer.list_columns)
+        actual = ImageUploadRowSerializer(context={'request': self.request}).list_data(rows)
+        self.assertEqual(self.render(actual), self.render(expected))
+
+        for upload in self.queryset.select_related('user__profile'):
+            expected = ImageUploadSerializer(upload, context={'request': self.request}).data
+            row = ImageUpload.objects.values_list(*ImageUploadRowSerializer.detail_columns).get(pk=upload.pk)
+            actual = ImageUploadRowSerializer(context={'request': self.request}).detail_data(row, self.user)
+            self.assertEqual(self.render(actual), self.render(expected))
+
+    def test_output_matches_model_serializers(self):
+        self.assert_same_bytes()
+        detail = ImageUploadSerializer(self.queryset.first(), context={'request': self.request}).data
+        self.assertEqual(detail['created_at'], '2024-01-31T23:30:00.123456Z')
+        self.assertEqual(
+            detail['image_url'], '/media/uploads/images/2024/01/left%20arm%20(mole)%20%C3%A9.jpg',
+        )
+
+    def test_output_matches_in_other_time_zones(self):
+        with timezone.override('America/New_York'):
+            self.assert_same_bytes()
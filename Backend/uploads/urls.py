@@ -1,10 +1,17 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.ASYNC_ANALYSIS_VIEWS:
+    from .async_views import upload_statistics
+else:
+    upload_statistics = views.upload_statistics
+
 urlpatterns = [
     path('', views.ImageUploadCreateView.as_view(), name='upload-create'),
     path('list/', views.ImageUploadListView.as_view(), name='upload-list'),
+    path('export/', views.ImageUploadExportView.as_view(), name='upload-export'),
     path('<uuid:pk>/', views.ImageUploadDetailView.as_view(), name='upload-detail'),
-    path('statistics/', views.upload_statistics, name='upload-statistics'),
+    path('statistics/', upload_statistics, name='upload-statistics'),
     path('clear-history/', views.clear_upload_history, name='clear-history'),
 ]
@@ -1,21 +1,34 @@
 from rest_framework import generics, status, permissions, filters
+from rest_framework.generics import get_object_or_404
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.negotiation import BaseContentNegotiation
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django.db.models import Avg, Q
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from PIL import Image
+from django.utils.decorators import method_decorator
 import os
 import random
 
+from skincancer_backend.compression import compress_response
+from skincancer_backend.conditional import etag_from_version, queryset_version
+from skincancer_backend.db_router import pin_to_primary, read_from_replica
+from skincancer_backend.lazy_imports import pil_image
+from skincancer_backend.throttling import IPRateThrottle, UserRateThrottle
+
 from .models import ImageUpload, AnalysisHistory
 from .serializers import (
     ImageUploadSerializer, 
     ImageUploadCreateSerializer, 
     ImageUploadListSerializer,
+    ImageUploadRowSerializer,
     AnalysisHistorySerializer
 )
 from .analysis_service import SkinCancerAnalysisService
+from .export import EXPORT_FORMATS, available_formats, stream_export, stream_export_zip
+from .search import search_uploads
 
 
 class ImageUploadCreateView(generics.CreateAPIView):
@@ -23,6 +36,8 @@ class ImageUploadCreateView(generics.CreateAPIView):
     
     serializer_class = ImageUploadCreateSerializer
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [UserRateThrottle, IPRateThrottle]
+    throttle_scope = 'upload'
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -32,7 +47,7 @@ class ImageUploadCreateView(generics.CreateAPIView):
         
         # Process image
         try:
-            with Image.open(image_file) as img:
+            with pil_image().open(image_file) as img:
                 width, height = img.size
                 file_size = image_file.size
                 filename = image_file.name
@@ -63,22 +78,38 @@ class ImageUploadCreateView(generics.CreateAPIView):
             should_consult_doctor=analysis_result['should_consult_doctor'],
             urgency_level=analysis_result['urgency_level'],
             recommendation_message=analysis_result['recommendation_message'],
+            aspect_ratio=analysis_result['aspect_ratio'],
+            resolution_quality=analysis_result['resolution_quality'],
+            file_quality=analysis_result['file_quality'],
+            asymmetry_score=analysis_result.get('asymmetry_score'),
+            border_score=analysis_result.get('border_score'),
+            color_score=analysis_result.get('color_score'),
+            diameter_score=analysis_result.get('diameter_score'),
             analysis_factors=analysis_result['analysis_factors']
         )
+        pin_to_primary(request.user)
         
         # Return full upload data
         response_serializer = ImageUploadSerializer(upload)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
 
+def upload_list_version(request):
+    """Changes when the user's uploads or the requested page, filters or ordering do."""
+    return (
+        request.build_absolute_uri(),
+        queryset_version(ImageUpload.objects.filter(user=request.user)),
+    )
+
+
+@method_decorator(compress_response, name='dispatch')
 class ImageUploadListView(generics.ListAPIView):
     """View for listing user's image uploads with search and filtering."""
     
     serializer_class = ImageUploadListSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['result', 'urgency_level', 'should_consult_doctor', 'cancer_type', 'risk_level']
-    search_fields = ['filename', 'result', 'cancer_type_name']
     ordering_fields = ['created_at', 'confidence', 'risk_score', 'cancer_type_confidence']
     ordering = ['-created_at']
     
@@ -92,11 +123,7 @@ class ImageUploadListView(generics.ListAPIView):
         
         # Apply search filter
         if search_query:
-            queryset = queryset.filter(
-                Q(filename__icontains=search_query) |
-                Q(result__icontains=search_query) |
-                Q(cancer_type_name__icontains=search_query)
-            )
+            queryset = search_uploads(queryset, search_query)
         
         # Apply result type filter
         if filter_type and filter_type != 'all':
@@ -117,6 +144,23 @@ class ImageUploadListView(generics.ListAPIView):
             )
         
         return queryset
+    
+    @method_decorator(read_from_replica)
+    @method_decorator(etag_from_version(upload_list_version))
+    def list(self, request, *args, **kwargs):
+        """
+        List uploads through the values_list() fast path.
+        
+        A revalidated page (304) skips the query, so it is not logged as a search.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values_list(*ImageUploadRowSerializer.list_columns)
+        serializer = ImageUploadRowSerializer(context=self.get_serializer_context())
+        
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.list_data(page))
+        return Response(serializer.list_data(rows))
 
 
 class ImageUploadDetailView(generics.RetrieveDestroyAPIView):
@@ -127,10 +171,81 @@ class ImageUploadDetailView(generics.RetrieveDestroyAPIView):
     
     def get_queryset(self):
         return ImageUpload.objects.filter(user=self.request.user)
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve an upload through the values_list() fast path."""
+        rows = self.filter_queryset(self.get_queryset()).values_list(*ImageUploadRowSerializer.detail_columns)
+        row = get_object_or_404(rows, **{self.lookup_field: self.kwargs[self.lookup_field]})
+        serializer = ImageUploadRowSerializer(context=self.get_serializer_context())
+        # The queryset is restricted to the requesting user, who is the owner
+        return Response(serializer.detail_data(row, request.user))
+    
+    def perform_destroy(self, instance):
+        instance.delete()
+        pin_to_primary(self.request.user)
+
+
+class ExportContentNegotiation(BaseContentNegotiation):
+    """
+    Always render errors with the first renderer.
+
+    The export view reads ``format`` itself to pick a file format, so it must
+    not be treated as DRF's renderer override.
+    """
+    
+    def select_parser(self, request, parsers):
+        return parsers[0] if parsers else None
+    
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+@method_decorator(compress_response, name='dispatch')
+class ImageUploadExportView(APIView):
+    """Stream the user's full upload history as CSV, NDJSON or Parquet."""
+    
+    permission_classes = [permissions.IsAuthenticated]
+    content_negotiation_class = ExportContentNegotiation
+    
+    def get(self, request):
+        export_format = request.query_params.get('format', 'csv')
+        if export_format not in available_formats():
+            return Response({
+                'error': f"Unsupported format. Choose one of: {', '.join(available_formats())}."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = ImageUpload.objects.filter(user=request.user).order_by('created_at', 'id')
+        row_serializer = ImageUploadRowSerializer(context={'request': request})
+        basename = f"analysis-history-{timezone.now():%Y%m%d}"
+        
+        if request.query_params.get('images') in ('1', 'true'):
+            content = stream_export_zip(queryset, export_format, row_serializer, basename)
+            content_type, filename = 'application/zip', f'{basename}.zip'
+        else:
+            content = stream_export(queryset, export_format, row_serializer)
+            content_type, filename = EXPORT_FORMATS[export_format][0], f'{basename}.{export_format}'
+        
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+def build_upload_statistics(total_uploads, benign_count, suspicious_count, malignant_count, avg_confidence, recent_uploads):
+    """Build the upload statistics payload from precomputed aggregates."""
+    return {
+        'total_uploads': total_uploads,
+        'benign_count': benign_count,
+        'suspicious_count': suspicious_count,
+        'malignant_count': malignant_count,
+        'average_confidence': round(avg_confidence, 1),
+        'recent_uploads': recent_uploads,
+        'high_risk_uploads': suspicious_count + malignant_count
+    }
 
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@read_from_replica
 def upload_statistics(request):
     """Get upload statistics for the user."""
     
@@ -142,22 +257,16 @@ def upload_statistics(request):
     malignant_count = user_uploads.filter(result='malignant').count()
     
     avg_confidence = user_uploads.aggregate(
-        avg_confidence=models.Avg('confidence')
+        avg_confidence=Avg('confidence')
     )['avg_confidence'] or 0
     
     recent_uploads = user_uploads.filter(
         created_at__gte=timezone.now() - timezone.timedelta(days=30)
     ).count()
     
-    return Response({
-        'total_uploads': total_uploads,
-        'benign_count': benign_count,
-        'suspicious_count': suspicious_count,
-        'malignant_count': malignant_count,
-        'average_confidence': round(avg_confidence, 1),
-        'recent_uploads': recent_uploads,
-        'high_risk_uploads': suspicious_count + malignant_count
-    })
+    return Response(build_upload_statistics(
+        total_uploads, benign_count, suspicious_count, malignant_count, avg_confidence, recent_uploads
+    ))
 
 
 @api_view(['DELETE'])
@@ -168,6 +277,7 @@ def clear_upload_history(request):
     if request.method == 'DELETE':
         deleted_count = ImageUpload.objects.filter(user=request.user).count()
         ImageUpload.objects.filter(user=request.user).delete()
+        pin_to_primary(request.user)
         
         return Response({
             'message': f'Successfully deleted {deleted_count} uploads.',